@@ -13,7 +13,9 @@ Coordinates the full extraction pipeline:
 
 import asyncio
 import logging
+import time
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
@@ -32,6 +34,23 @@ from ..quality.confidence_scorer import ConfidenceScorer
 
 logger = logging.getLogger(__name__)
 
+# Stage timings are exported through the API's metrics registry when available
+try:
+    from services.metrics import PIPELINE_STAGE_SECONDS
+except ImportError:
+    PIPELINE_STAGE_SECONDS = None
+
+
+@contextmanager
+def _stage_timer(stage: str):
+    """Record the duration of a pipeline stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if PIPELINE_STAGE_SECONDS is not None:
+            PIPELINE_STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
 
 class PipelineOrchestrator:
     """
@@ -141,7 +160,8 @@ class PipelineOrchestrator:
 
         # Store results if DB available
         if self.db is not None:
-            await self._store_results(records)
+            with _stage_timer("store"):
+                await self._store_results(records)
 
         job.completed_at = datetime.utcnow()
         job.status = (
@@ -176,35 +196,40 @@ class PipelineOrchestrator:
         record = StockDataRecord(symbol=symbol, company_name="")
 
         # Step 1: Extract from all sources
-        for extractor in self._extractors:
-            if sources and extractor.get_source_name() not in sources:
-                continue
-            try:
-                extraction = await extractor.extract(symbol, record)
-                record.extraction_history.append(extraction)
-                logger.debug(
-                    f"{symbol} [{extractor.get_source_name()}]: "
-                    f"{len(extraction.fields_extracted)} fields extracted"
-                )
-            except Exception as e:
-                logger.warning(
-                    f"{symbol} [{extractor.get_source_name()}] extraction error: {e}"
-                )
+        with _stage_timer("extract"):
+            for extractor in self._extractors:
+                if sources and extractor.get_source_name() not in sources:
+                    continue
+                try:
+                    extraction = await extractor.extract(symbol, record)
+                    record.extraction_history.append(extraction)
+                    logger.debug(
+                        f"{symbol} [{extractor.get_source_name()}]: "
+                        f"{len(extraction.fields_extracted)} fields extracted"
+                    )
+                except Exception as e:
+                    logger.warning(
+                        f"{symbol} [{extractor.get_source_name()}] extraction error: {e}"
+                    )
 
         # Step 2: Clean and normalize
-        cleaned_count = self.cleaner.clean_record(record)
+        with _stage_timer("clean"):
+            cleaned_count = self.cleaner.clean_record(record)
         logger.debug(f"{symbol}: cleaned {cleaned_count} fields")
 
         # Step 3: Calculate derived fields
-        calc_fields = self.calculation_engine.calculate_all(record)
+        with _stage_timer("calculate"):
+            calc_fields = self.calculation_engine.calculate_all(record)
         logger.debug(f"{symbol}: calculated {len(calc_fields)} derived fields")
 
         # Step 4: Calculate technical indicators
-        tech_fields = self.technical_calculator.calculate_all(record)
+        with _stage_timer("technicals"):
+            tech_fields = self.technical_calculator.calculate_all(record)
         logger.debug(f"{symbol}: calculated {len(tech_fields)} technical indicators")
 
         # Step 5: Validate against scoring rules
-        validation = self.validation_engine.validate_all(record)
+        with _stage_timer("validate"):
+            validation = self.validation_engine.validate_all(record)
         record.qualitative_metadata["validation_result"] = {
             "is_investable": validation["is_investable"],
             "deal_breakers_triggered": len(validation["triggered_deal_breakers"]),
@@ -214,7 +239,8 @@ class PipelineOrchestrator:
         }
 
         # Step 6: Score quality/confidence
-        quality = self.confidence_scorer.score(record)
+        with _stage_timer("quality"):
+            quality = self.confidence_scorer.score(record)
         record.qualitative_metadata["quality_report"] = {
             "completeness": quality.completeness_score,
             "freshness": quality.freshness_score,
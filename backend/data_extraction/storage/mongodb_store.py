@@ -22,6 +22,10 @@ from ..models.extraction_models import (
 
 logger = logging.getLogger(__name__)
 
+# Audit collections are purged by TTL indexes on their BSON-date `logged_at` field
+EXTRACTION_LOG_TTL_SECONDS = 90 * 24 * 3600
+QUALITY_REPORT_TTL_SECONDS = 180 * 24 * 3600
+
 
 class MongoDBStore:
     """
@@ -61,11 +65,17 @@ class MongoDBStore:
         await self.extraction_log.create_index(
             [("symbol", 1), ("source", 1), ("started_at", -1)]
         )
+        await self.extraction_log.create_index(
+            "logged_at", expireAfterSeconds=EXTRACTION_LOG_TTL_SECONDS
+        )
 
         # Quality reports
         await self.quality_reports.create_index(
             [("symbol", 1), ("generated_at", -1)]
         )
+        await self.quality_reports.create_index(
+            "logged_at", expireAfterSeconds=QUALITY_REPORT_TTL_SECONDS
+        )
 
         # Pipeline jobs
         await self.pipeline_jobs.create_index("job_id", unique=True)
@@ -207,6 +217,7 @@ class MongoDBStore:
                 "duration_ms": record.duration_ms,
                 "error_message": record.error_message,
                 "retry_count": record.retry_count,
+                "logged_at": datetime.utcnow(),
             }
             result = await self.extraction_log.insert_one(doc)
             return result.acknowledged
@@ -249,6 +260,7 @@ class MongoDBStore:
                 "missing_critical_fields": report.missing_critical_fields,
                 "stale_fields": report.stale_fields,
                 "field_coverage_by_category": report.field_coverage_by_category,
+                "logged_at": datetime.utcnow(),
             }
             result = await self.quality_reports.insert_one(doc)
             return result.acknowledged
@@ -24,18 +24,94 @@ class TradeType(str, Enum):
     SELL = "sell"
 
 
+class OptimizationObjective(str, Enum):
+    """Metric a parameter sweep ranks by"""
+    SHARPE = "sharpe"
+    SORTINO = "sortino"
+    CALMAR = "calmar"
+    RETURN = "return"
+    DRAWDOWN = "drawdown"
+
+
+class SearchMethod(str, Enum):
+    """How a parameter sweep picks combinations"""
+    GRID = "grid"
+    RANDOM = "random"
+
+
+class MonteCarloMethod(str, Enum):
+    """What a Monte Carlo run resamples"""
+    TRADES = "trades"
+    BLOCK_BOOTSTRAP = "block_bootstrap"
+
+
+class WalkForwardConfig(BaseModel):
+    """Rolling in-sample optimization / out-of-sample evaluation windows"""
+    in_sample_bars: int = Field(default=252, ge=20, description="Bars each optimization window covers")
+    out_of_sample_bars: int = Field(default=63, ge=1, description="Bars traded with each window's best parameters")
+    objective: OptimizationObjective = Field(default=OptimizationObjective.SHARPE, description="Metric the in-sample windows optimize")
+    
+    # Candidate parameters, as for an optimization sweep
+    parameter_grid: Dict[str, List[float]] = Field(default_factory=dict, description="Parameter values to try")
+    search: SearchMethod = Field(default=SearchMethod.GRID, description="Grid or random search")
+    samples: int = Field(default=200, ge=1, description="Combinations to try in a random search")
+    seed: Optional[int] = Field(None, description="Random search seed")
+
+
+class MonteCarloConfig(BaseModel):
+    """Resampled paths of a backtest's returns, for confidence intervals"""
+    simulations: int = Field(default=1000, ge=100, le=20000, description="Number of resampled paths")
+    method: MonteCarloMethod = Field(default=MonteCarloMethod.BLOCK_BOOTSTRAP, description="Resample closed-trade returns or blocks of daily returns")
+    block_size: int = Field(default=20, ge=1, description="Consecutive daily returns per bootstrap block")
+    seed: Optional[int] = Field(None, description="Random seed, for reproducible bands")
+
+
 class BacktestConfig(BaseModel):
     """Configuration for running a backtest"""
     symbol: str = Field(..., description="Stock symbol to backtest")
     strategy: StrategyType = Field(..., description="Strategy to use")
     start_date: Optional[str] = Field(None, description="Start date (YYYY-MM-DD)")
     end_date: Optional[str] = Field(None, description="End date (YYYY-MM-DD)")
-    initial_capital: float = Field(default=100000, description="Starting capital in INR")
+    initial_capital: float = Field(default=100000, gt=0, description="Starting capital in INR")
+    
+    # Strategy-specific parameters
+    parameters: Dict[str, Any] = Field(default_factory=dict, description="Strategy parameters")
+    
+    # Walk-forward mode: parameters are re-optimized per window instead of fixed
+    walk_forward: Optional[WalkForwardConfig] = Field(None, description="Walk-forward analysis settings")
+    
+    # Optional robustness stage on the finished run
+    monte_carlo: Optional[MonteCarloConfig] = Field(None, description="Monte Carlo resampling settings")
+
+
+class BatchBacktestConfig(BaseModel):
+    """Configuration for running one strategy across many symbols"""
+    symbols: List[str] = Field(default_factory=list, description="Stock symbols to backtest")
+    sector: Optional[str] = Field(None, description="Backtest every stock in this sector")
+    strategy: StrategyType = Field(..., description="Strategy to use")
+    initial_capital: float = Field(default=100000, gt=0, description="Starting capital in INR, split equally across symbols")
     
     # Strategy-specific parameters
     parameters: Dict[str, Any] = Field(default_factory=dict, description="Strategy parameters")
 
 
+class OptimizeConfig(BaseModel):
+    """Configuration for a parameter-sweep optimization"""
+    symbol: str = Field(..., description="Stock symbol to backtest")
+    strategy: StrategyType = Field(..., description="Strategy to optimize")
+    initial_capital: float = Field(default=100000, gt=0, description="Starting capital in INR")
+    
+    # Values to try per parameter; parameters left out are swept over their declared range
+    parameter_grid: Dict[str, List[float]] = Field(default_factory=dict, description="Parameter values to try")
+    search: SearchMethod = Field(default=SearchMethod.GRID, description="Grid or random search")
+    samples: int = Field(default=200, ge=1, description="Combinations to try in a random search")
+    seed: Optional[int] = Field(None, description="Random search seed")
+    
+    objective: OptimizationObjective = Field(default=OptimizationObjective.SHARPE, description="Metric to rank by")
+    top_n: int = Field(default=20, ge=1, le=500, description="Rows in the ranked table")
+    heatmap_axes: Optional[List[str]] = Field(None, description="Two parameters for the heatmap (x, y)")
+
+
 class Trade(BaseModel):
     """Individual trade record"""
     date: str
@@ -63,7 +139,10 @@ class BacktestResult(BaseModel):
     
     # Risk metrics
     max_drawdown: float
+    max_drawdown_duration: int  # bars
     sharpe_ratio: float
+    sortino_ratio: float
+    calmar_ratio: float
     volatility: float
     
     # Trade statistics
@@ -74,6 +153,8 @@ class BacktestResult(BaseModel):
     avg_win: float
     avg_loss: float
     profit_factor: float
+    exposure_percent: float
+    turnover: float
     
     # Trade history
     trades: List[Trade]
@@ -85,6 +166,12 @@ class BacktestResult(BaseModel):
     start_date: str
     end_date: str
     trading_days: int
+    
+    # Walk-forward windows and their chosen parameters (walk-forward mode only)
+    walk_forward: Optional[Dict[str, Any]] = None
+    
+    # Percentile bands of the resampled paths (Monte Carlo stage only)
+    monte_carlo: Optional[Dict[str, Any]] = None
 
 
 class StrategyInfo(BaseModel):
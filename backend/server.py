@@ -1,15 +1,18 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import json
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Callable, Awaitable
 import uuid
 from datetime import datetime, timezone
 import asyncio
+import time
 
 # Configure logging early
 logging.basicConfig(
@@ -26,7 +29,30 @@ from services.mock_data import (
     get_all_stocks, generate_news_items, generate_market_overview as mock_market_overview, INDIAN_STOCKS
 )
 from services.scoring_engine import generate_analysis, generate_ml_prediction
-from services.llm_service import generate_stock_insight, summarize_news
+from services.llm_service import (
+    build_rule_based_insight, generate_batch_insights, generate_batch_insights_within_deadline,
+    generate_stock_insight_within_deadline, stream_stock_insight, summarize_news,
+)
+from services.llm_cache import init_llm_cache
+from services.pdf_renderer import PDFRenderTimeout, pdf_render_pool
+from services.pdf_cache import PDF_CACHE_ENABLED, pdf_cache, report_cache_key, snapshot_hash
+from services.report_jobs import REPORT_JOB_MAX_ITEMS, public_state, report_job_queue
+from services.metrics import (
+    registry as metrics_registry, MetricsMiddleware, PROMETHEUS_CONTENT_TYPE,
+    MARKET_CACHE_HITS, MARKET_CACHE_MISSES
+)
+from services.profiling import (
+    ProfilingMiddleware, profile_store, collapse_tree, is_profiling_enabled
+)
+from services.loop_watchdog import loop_watchdog, is_loop_watchdog_enabled
+from services.admin_auth import require_admin
+from services.lazy_imports import is_installed
+from services.state_backend import get_state_backend
+from services.news_store import news_store
+from services.admission import (
+    AdmissionController, AdmissionRejected, admission_rejected_handler, limit_concurrency, get_admission_status,
+    admission_controllers, SlotHoldingStreamingResponse
+)
 
 # Import real market data service
 try:
@@ -58,6 +84,9 @@ db_name = os.environ.get('MONGO_DB_NAME', os.environ.get('DB_NAME', 'stockpulse'
 client = AsyncIOMotorClient(mongo_url)
 db = client[db_name]
 
+# Persistent tier of the LLM response cache
+llm_cache = init_llm_cache(db)
+
 # Initialize Alerts Service
 try:
     from services.alerts_service import init_alerts_service, get_alerts_service
@@ -69,16 +98,19 @@ except ImportError as e:
     ALERTS_AVAILABLE = False
     alerts_service = None
 
-# Import Data Extraction Pipeline
+# Index bootstrapper
 try:
-    from data_extraction.pipeline.orchestrator import PipelineOrchestrator
-    from data_extraction.models.extraction_models import ExtractionStatus
-    EXTRACTION_PIPELINE_AVAILABLE = True
-    _pipeline_orchestrator = None  # Lazy initialization
+    from services.db_indexes import bootstrap_indexes
+    INDEX_BOOTSTRAP_AVAILABLE = True
 except ImportError as e:
-    logger.warning(f"Data extraction pipeline not available: {e}")
-    EXTRACTION_PIPELINE_AVAILABLE = False
-    _pipeline_orchestrator = None
+    logger.warning(f"Index bootstrapper not available: {e}")
+    INDEX_BOOTSTRAP_AVAILABLE = False
+
+# Data Extraction Pipeline (imported on first run; pulls in aiohttp and yfinance)
+EXTRACTION_PIPELINE_AVAILABLE = is_installed("data_extraction", "aiohttp")
+if not EXTRACTION_PIPELINE_AVAILABLE:
+    logger.warning("Data extraction pipeline not available: aiohttp not installed")
+_pipeline_orchestrator = None  # Lazy initialization
 
 # Configuration
 USE_REAL_DATA = os.environ.get('USE_REAL_DATA', 'true').lower() == 'true'
@@ -86,6 +118,9 @@ USE_REAL_DATA = os.environ.get('USE_REAL_DATA', 'true').lower() == 'true'
 # Create the main app
 app = FastAPI(title="Stock Analysis Platform API", version="1.0.0")
 
+# Overloaded expensive endpoints answer 429 with Retry-After
+app.add_exception_handler(AdmissionRejected, admission_rejected_handler)
+
 # Create router with /api prefix
 api_router = APIRouter(prefix="/api")
 
@@ -94,12 +129,15 @@ logger.info(f"Real data available: {REAL_DATA_AVAILABLE}")
 logger.info(f"Use real data: {USE_REAL_DATA}")
 logger.info(f"Data source: {'Real (Yahoo Finance)' if REAL_DATA_AVAILABLE and USE_REAL_DATA else 'Mock Data'}")
 
-# Cache for stock data
+# Cache for stock data. The snapshot lives in the shared state backend so all
+# workers serve the same one; each process keeps a decoded copy per generation.
 _stock_cache = {}
-_cache_timestamp = None
-_real_data_cache = {}
-_real_cache_timestamp = None
+_stock_cache_generation = None
+# Analyses of snapshot stocks, valid for one snapshot generation
+_snapshot_analyses: Dict[str, dict] = {}
+_snapshot_analyses_generation = None
 CACHE_TTL = 300  # 5 minutes for mock data
+NEWS_REFRESH_SECONDS = int(os.environ.get('NEWS_REFRESH_SECONDS', '300'))
 REAL_CACHE_TTL = 60  # 1 minute for real data
 
 
@@ -158,16 +196,60 @@ def _calculate_technicals(history: list, quote: dict) -> dict:
     }
 
 # Helper functions
-def get_cached_stocks():
-    global _stock_cache, _cache_timestamp
-    now = datetime.now(timezone.utc)
+async def get_cached_stocks():
+    global _stock_cache, _stock_cache_generation
+    state = get_state_backend()
+    
+    generation = await state.get("stock_snapshot:generation")
+    if generation is not None and generation == _stock_cache_generation:
+        MARKET_CACHE_HITS.inc(cache="stock_snapshot")
+        return _stock_cache
+    
+    if generation is not None:
+        snapshot = await state.get(f"stock_snapshot:data:{generation}")
+        if snapshot is not None:
+            MARKET_CACHE_HITS.inc(cache="stock_snapshot")
+            _stock_cache, _stock_cache_generation = snapshot, generation
+            return _stock_cache
+    
+    MARKET_CACHE_MISSES.inc(cache="stock_snapshot")
+    snapshot = {s["symbol"]: s for s in get_all_stocks()}
+    generation = uuid.uuid4().hex
+    # Data is written before the generation is published; if another worker
+    # published first, adopt its snapshot so every worker agrees
+    await state.set(f"stock_snapshot:data:{generation}", snapshot, ttl=CACHE_TTL * 2)
+    if await state.set_if_absent("stock_snapshot:generation", generation, ttl=CACHE_TTL):
+        # Published: the generation this worker last used is superseded
+        if _stock_cache_generation is not None:
+            await state.delete(f"stock_snapshot:data:{_stock_cache_generation}")
+    else:
+        winner = await state.get("stock_snapshot:generation")
+        winner_snapshot = await state.get(f"stock_snapshot:data:{winner}") if winner else None
+        if winner_snapshot is not None:
+            # Nobody will read this worker's unpublished copy
+            await state.delete(f"stock_snapshot:data:{generation}")
+            snapshot, generation = winner_snapshot, winner
+    
+    _stock_cache, _stock_cache_generation = snapshot, generation
+    return _stock_cache
+
+
+def get_snapshot_analysis(stock: dict) -> dict:
+    """
+    generate_analysis for a stock from the cached snapshot, memoized per snapshot.
     
-    if _cache_timestamp is None or (now - _cache_timestamp).seconds > CACHE_TTL:
-        stocks = get_all_stocks()
-        _stock_cache = {s["symbol"]: s for s in stocks}
-        _cache_timestamp = now
+    Scoring adds random jitter to mock inputs; reusing one analysis per
+    snapshot keeps LLM prompts built from it identical, so they hit the LLM cache.
+    """
+    global _snapshot_analyses, _snapshot_analyses_generation
+    if _snapshot_analyses_generation != _stock_cache_generation:
+        _snapshot_analyses = {}
+        _snapshot_analyses_generation = _stock_cache_generation
     
-    return _stock_cache
+    symbol = stock["symbol"]
+    if symbol not in _snapshot_analyses:
+        _snapshot_analyses[symbol] = generate_analysis(stock)
+    return _snapshot_analyses[symbol]
 
 
 # ==================== HEALTH CHECK ====================
@@ -208,7 +290,7 @@ async def get_stocks(
     limit: int = Query(default=50, le=100)
 ):
     """Get list of stocks with optional filtering"""
-    stocks = list(get_cached_stocks().values())
+    stocks = list((await get_cached_stocks()).values())
     
     if sector:
         stocks = [s for s in stocks if s["sector"].lower() == sector.lower()]
@@ -265,7 +347,7 @@ async def get_stock(symbol: str):
             logger.error(f"Real data failed for {symbol}, falling back to mock: {e}")
     
     # Fallback to mock data
-    stocks = get_cached_stocks()
+    stocks = await get_cached_stocks()
     
     if symbol not in stocks:
         raise HTTPException(status_code=404, detail=f"Stock {symbol} not found")
@@ -280,7 +362,7 @@ async def get_stock(symbol: str):
 @api_router.get("/stocks/{symbol}/analysis")
 async def get_stock_analysis(symbol: str):
     """Get detailed analysis for a stock"""
-    stocks = get_cached_stocks()
+    stocks = await get_cached_stocks()
     symbol = symbol.upper()
     
     if symbol not in stocks:
@@ -299,32 +381,80 @@ async def get_stock_analysis(symbol: str):
     }
 
 
-@api_router.post("/stocks/{symbol}/llm-insight")
+@api_router.post("/stocks/{symbol}/llm-insight", dependencies=[Depends(limit_concurrency("llm"))])
 async def get_llm_insight(symbol: str, request: LLMInsightRequest):
     """Get AI-powered insight for a stock"""
-    stocks = get_cached_stocks()
+    stocks = await get_cached_stocks()
     symbol = symbol.upper()
     
     if symbol not in stocks:
         raise HTTPException(status_code=404, detail=f"Stock {symbol} not found")
     
     stock_data = stocks[symbol].copy()
-    stock_data["analysis"] = generate_analysis(stock_data)
+    stock_data["analysis"] = get_snapshot_analysis(stock_data)
     
-    insight = await generate_stock_insight(stock_data, request.analysis_type)
+    insight, source = await generate_stock_insight_within_deadline(stock_data, request.analysis_type)
     
     return {
         "symbol": symbol,
         "analysis_type": request.analysis_type,
-        "insight": insight
+        "insight": insight,
+        "insight_source": source,
     }
 
 
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@api_router.get("/stocks/{symbol}/llm-insight/stream")
+async def stream_llm_insight(symbol: str, analysis_type: str = "full"):
+    """
+    Stream an AI insight as Server-Sent Events.
+    
+    Emits "token" events ({"text": ...}) as the model generates, then a "done"
+    event, or an "error" event if generation fails. Concurrent requests for
+    the same insight share one upstream call, cancelled once every client
+    has disconnected.
+    """
+    stocks = await get_cached_stocks()
+    symbol = symbol.upper()
+    
+    if symbol not in stocks:
+        raise HTTPException(status_code=404, detail=f"Stock {symbol} not found")
+    
+    stock_data = stocks[symbol].copy()
+    stock_data["analysis"] = get_snapshot_analysis(stock_data)
+    
+    # Admission is checked before the stream opens so overload is still a 429
+    controller = admission_controllers["llm"]
+    await controller.acquire()
+    
+    async def events():
+        # A comment line first, so the client gets its first byte immediately
+        yield ": stream open\n\n"
+        try:
+            async for chunk in stream_stock_insight(stock_data, analysis_type):
+                yield _sse_event("token", {"text": chunk})
+            yield _sse_event("done", {"symbol": symbol, "analysis_type": analysis_type})
+        except Exception as e:
+            logger.error(f"LLM insight stream failed for {symbol}: {e}")
+            yield _sse_event("error", {"detail": "Unable to generate AI insights at this time."})
+    
+    return SlotHoldingStreamingResponse(
+        controller,
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ==================== SCREENER ====================
 @api_router.post("/screener")
 async def screen_stocks(request: ScreenerRequest):
     """Screen stocks based on multiple criteria"""
-    stocks = list(get_cached_stocks().values())
+    stocks = list((await get_cached_stocks()).values())
     results = []
     
     for stock in stocks:
@@ -452,7 +582,7 @@ async def get_watchlist():
     watchlist = await db.watchlist.find({}, {"_id": 0}).to_list(100)
     
     # Enrich with current data
-    stocks = get_cached_stocks()
+    stocks = await get_cached_stocks()
     enriched = []
     
     for item in watchlist:
@@ -531,7 +661,7 @@ async def get_portfolio():
             "sector_allocation": [],
         }
     
-    stocks = get_cached_stocks()
+    stocks = await get_cached_stocks()
     enriched_holdings = []
     total_invested = 0
     current_value = 0
@@ -635,35 +765,47 @@ async def update_portfolio_holding(symbol: str, updates: Dict[str, Any]):
 
 
 # ==================== NEWS ====================
+def refresh_news_store():
+    """Pull the news feed into the store when it is older than NEWS_REFRESH_SECONDS"""
+    last = news_store.last_ingested_at
+    if last is None or (datetime.now() - last).total_seconds() > NEWS_REFRESH_SECONDS:
+        news_store.ingest(generate_news_items())
+
+
 @api_router.get("/news")
 async def get_news(
+    response: Response,
     symbol: Optional[str] = None,
     sentiment: Optional[str] = None,
-    limit: int = Query(default=20, le=50)
+    limit: int = Query(default=20, le=50),
+    cursor: Optional[str] = None,
 ):
-    """Get market news with sentiment"""
-    news = generate_news_items()
+    """Get market news with sentiment, newest first; pass X-Next-Cursor back as cursor for the next page"""
+    refresh_news_store()
     
-    if symbol:
-        news = [n for n in news if symbol.upper() in n.get("related_stocks", [])]
-    if sentiment:
-        news = [n for n in news if n.get("sentiment", "").upper() == sentiment.upper()]
+    try:
+        news, next_cursor = news_store.query(symbol, sentiment, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return news[:limit]
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return news
 
 
 @api_router.get("/news/summary")
 async def get_news_summary():
     """Get AI-generated news summary"""
-    news = generate_news_items()
-    summary = await summarize_news(news[:10])
+    refresh_news_store()
+    summary = await summarize_news(news_store.latest(10))
+    counts = news_store.sentiment_counts()
     
     return {
         "summary": summary,
-        "news_count": len(news),
-        "positive_count": len([n for n in news if n["sentiment"] == "POSITIVE"]),
-        "negative_count": len([n for n in news if n["sentiment"] == "NEGATIVE"]),
-        "neutral_count": len([n for n in news if n["sentiment"] == "NEUTRAL"]),
+        "news_count": len(news_store),
+        "positive_count": counts["POSITIVE"],
+        "negative_count": counts["NEGATIVE"],
+        "neutral_count": counts["NEUTRAL"],
     }
 
 
@@ -673,10 +815,24 @@ class ReportRequest(BaseModel):
     symbols: List[str] = []
 
 
-@api_router.post("/reports/generate")
+def portfolio_health_summary(portfolio: Dict[str, Any]) -> Dict[str, Any]:
+    """Portfolio health report data"""
+    return {
+        "portfolio": portfolio,
+        "diversification_score": len(set(h.get("sector", "") for h in portfolio.get("holdings", []))) * 10,
+        "risk_assessment": "MODERATE" if portfolio.get("total_profit_loss_percent", 0) > 0 else "HIGH",
+        "recommendations": [
+            "Consider diversifying across more sectors",
+            "Review holdings with negative returns",
+            "Set stop-loss levels for high-risk positions"
+        ]
+    }
+
+
+@api_router.post("/reports/generate", dependencies=[Depends(limit_concurrency("reports"))])
 async def generate_report(request: ReportRequest):
     """Generate analysis report"""
-    stocks = get_cached_stocks()
+    stocks = await get_cached_stocks()
     
     if request.report_type == "single_stock":
         if not request.symbols:
@@ -687,9 +843,9 @@ async def generate_report(request: ReportRequest):
             raise HTTPException(status_code=404, detail="Stock not found")
         
         stock = stocks[symbol].copy()
-        stock["analysis"] = generate_analysis(stock)
+        stock["analysis"] = get_snapshot_analysis(stock)
         stock["ml_prediction"] = generate_ml_prediction(stock)
-        stock["llm_insight"] = await generate_stock_insight(stock, "full")
+        stock["llm_insight"], stock["llm_insight_source"] = await generate_stock_insight_within_deadline(stock)
         
         return {
             "report_type": "single_stock",
@@ -706,9 +862,13 @@ async def generate_report(request: ReportRequest):
             sym = sym.upper()
             if sym in stocks:
                 stock = stocks[sym].copy()
-                stock["analysis"] = generate_analysis(stock)
+                stock["analysis"] = get_snapshot_analysis(stock)
                 comparison_data.append(stock)
         
+        insights = await generate_batch_insights(comparison_data)
+        for stock in comparison_data:
+            stock["llm_insight"] = insights.get(stock["symbol"])
+        
         return {
             "report_type": "comparison",
             "generated_at": datetime.now(timezone.utc).isoformat(),
@@ -716,18 +876,7 @@ async def generate_report(request: ReportRequest):
         }
     
     elif request.report_type == "portfolio_health":
-        portfolio = await get_portfolio()
-        
-        health_data = {
-            "portfolio": portfolio,
-            "diversification_score": len(set(h.get("sector", "") for h in portfolio.get("holdings", []))) * 10,
-            "risk_assessment": "MODERATE" if portfolio.get("total_profit_loss_percent", 0) > 0 else "HIGH",
-            "recommendations": [
-                "Consider diversifying across more sectors",
-                "Review holdings with negative returns",
-                "Set stop-loss levels for high-risk positions"
-            ]
-        }
+        health_data = portfolio_health_summary(await get_portfolio())
         
         return {
             "report_type": "portfolio_health",
@@ -738,95 +887,287 @@ async def generate_report(request: ReportRequest):
     raise HTTPException(status_code=400, detail="Invalid report type")
 
 
-# PDF Export endpoint
-try:
-    from services.pdf_service import (
-        generate_single_stock_pdf, generate_comparison_pdf, 
-        generate_portfolio_health_pdf, is_pdf_available
+# PDF Export endpoint (reportlab is imported with pdf_service on first export)
+PDF_EXPORT_AVAILABLE = is_installed("reportlab")
+
+
+def _pdf_filename(report_type: str, symbols: List[str]) -> str:
+    day = datetime.now().strftime('%Y%m%d')
+    if report_type == "single_stock":
+        return f"{symbols[0]}_report_{day}.pdf"
+    if report_type == "comparison":
+        return f"comparison_{'_'.join(symbols[:3])}_{day}.pdf"
+    return f"portfolio_health_{day}.pdf"
+
+
+async def _pdf_report_inputs(request: ReportRequest) -> Tuple[List[str], Any]:
+    """
+    Validate a PDF report request and collect the data it is rendered from.
+    
+    Returns (symbols, inputs) where inputs are the raw snapshot stocks or
+    the portfolio; analysis and LLM insights are derived later, on a cache miss.
+    """
+    if request.report_type == "single_stock":
+        if not request.symbols:
+            raise HTTPException(status_code=400, detail="Symbol required")
+        
+        stocks = await get_cached_stocks()
+        symbol = request.symbols[0].upper()
+        if symbol not in stocks:
+            raise HTTPException(status_code=404, detail="Stock not found")
+        return [symbol], stocks[symbol]
+    
+    if request.report_type == "comparison":
+        if len(request.symbols) < 2:
+            raise HTTPException(status_code=400, detail="At least 2 symbols required")
+        
+        stocks = await get_cached_stocks()
+        symbols = [sym.upper() for sym in request.symbols[:5] if sym.upper() in stocks]
+        return symbols, [stocks[sym] for sym in symbols]
+    
+    if request.report_type == "portfolio_health":
+        return [], await get_portfolio()
+    
+    raise HTTPException(status_code=400, detail="Invalid report type")
+
+
+async def _within_llm_slot(
+    admission: Optional[AdmissionController], call: Callable[[], Awaitable[Any]], fallback: Callable[[], Any]
+) -> Any:
+    """call() holding a slot of admission when one is given; fallback() if the slot is refused"""
+    if admission is None:
+        return await call()
+    try:
+        async with admission.slot():
+            return await call()
+    except AdmissionRejected:
+        return fallback()
+
+
+async def _analysed_with_insights(
+    stocks: List[Dict[str, Any]], llm_admission: Optional[AdmissionController] = None
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Copies of stocks with snapshot analysis and batched LLM insights.
+    
+    Returns (stocks, cacheable); insights that fell back or failed are not
+    worth keeping for the day, as with single-stock reports.
+    """
+    analysed = []
+    for stock in stocks:
+        stock = stock.copy()
+        stock["analysis"] = get_snapshot_analysis(stock)
+        analysed.append(stock)
+    
+    insights, source = await _within_llm_slot(
+        llm_admission,
+        lambda: generate_batch_insights_within_deadline(analysed),
+        lambda: ({stock["symbol"]: build_rule_based_insight(stock) for stock in analysed}, "rule_based"),
     )
-    from fastapi.responses import Response
-    PDF_EXPORT_AVAILABLE = is_pdf_available()
-except ImportError:
-    PDF_EXPORT_AVAILABLE = False
+    for stock in analysed:
+        stock["llm_insight"] = insights.get(stock["symbol"])
+    return analysed, source == "llm" or not os.environ.get("EMERGENT_LLM_KEY")
+
+
+async def _render_pdf_report(
+    report_type: str, inputs: Any, llm_admission: Optional[AdmissionController] = None
+) -> Tuple[bytes, bool]:
+    """
+    Render a PDF from _pdf_report_inputs output; returns (pdf_bytes, cacheable).
+    
+    With llm_admission, LLM calls hold one of its slots, and a refused slot
+    gets the rule-based insight instead.
+    """
+    cacheable = True
+    
+    if report_type == "single_stock":
+        stock = inputs.copy()
+        stock["analysis"] = get_snapshot_analysis(stock)
+        stock["ml_prediction"] = generate_ml_prediction(stock)
+        stock["llm_insight"], stock["llm_insight_source"] = await _within_llm_slot(
+            llm_admission,
+            lambda: generate_stock_insight_within_deadline(stock),
+            lambda: (build_rule_based_insight(stock), "rule_based"),
+        )
+        # A deadline fallback is not kept for the day; the next download picks up the LLM answer
+        cacheable = stock["llm_insight_source"] == "llm" or not os.environ.get("EMERGENT_LLM_KEY")
+        pdf_bytes = await pdf_render_pool.render("single_stock", stock)
+    
+    elif report_type == "comparison":
+        comparison_data, cacheable = await _analysed_with_insights(inputs, llm_admission)
+        pdf_bytes = await pdf_render_pool.render("comparison", comparison_data)
+    
+    else:
+        health_data = portfolio_health_summary(inputs)
+        stocks = await get_cached_stocks()
+        held = [stocks[h["symbol"]] for h in inputs.get("holdings", []) if h.get("symbol") in stocks]
+        if held:
+            # One batched call covers every holding instead of a call per stock
+            held, cacheable = await _analysed_with_insights(held, llm_admission)
+            health_data["insights"] = {stock["symbol"]: stock["llm_insight"] for stock in held}
+        pdf_bytes = await pdf_render_pool.render("portfolio_health", health_data)
+    
+    return pdf_bytes, cacheable
 
 
-@api_router.post("/reports/generate-pdf")
-async def generate_pdf_report(request: ReportRequest):
-    """Generate PDF report for download"""
+@api_router.post("/reports/generate-pdf", dependencies=[Depends(limit_concurrency("pdf"))])
+async def generate_pdf_report(request: ReportRequest, http_request: Request):
+    """
+    Generate PDF report for download.
+    
+    Reports are cached by content (report type, symbols, input data hash and
+    date) and served from disk with Content-Length and an ETag; a matching
+    If-None-Match gets 304 Not Modified.
+    """
     if not PDF_EXPORT_AVAILABLE:
         raise HTTPException(status_code=503, detail="PDF generation not available. Install reportlab.")
     
-    stocks = get_cached_stocks()
-    
     try:
-        if request.report_type == "single_stock":
-            if not request.symbols:
-                raise HTTPException(status_code=400, detail="Symbol required")
-            
-            symbol = request.symbols[0].upper()
-            if symbol not in stocks:
-                raise HTTPException(status_code=404, detail="Stock not found")
-            
-            stock = stocks[symbol].copy()
-            stock["analysis"] = generate_analysis(stock)
-            stock["ml_prediction"] = generate_ml_prediction(stock)
-            stock["llm_insight"] = await generate_stock_insight(stock, "full")
-            
-            pdf_bytes = generate_single_stock_pdf(stock)
-            filename = f"{symbol}_report_{datetime.now().strftime('%Y%m%d')}.pdf"
-        
-        elif request.report_type == "comparison":
-            if len(request.symbols) < 2:
-                raise HTTPException(status_code=400, detail="At least 2 symbols required")
-            
-            comparison_data = []
-            for sym in request.symbols[:5]:
-                sym = sym.upper()
-                if sym in stocks:
-                    stock = stocks[sym].copy()
-                    stock["analysis"] = generate_analysis(stock)
-                    comparison_data.append(stock)
-            
-            pdf_bytes = generate_comparison_pdf(comparison_data)
-            filename = f"comparison_{'_'.join(request.symbols[:3])}_{datetime.now().strftime('%Y%m%d')}.pdf"
-        
-        elif request.report_type == "portfolio_health":
-            portfolio = await get_portfolio()
-            health_data = {
-                "portfolio": portfolio,
-                "diversification_score": len(set(h.get("sector", "") for h in portfolio.get("holdings", []))) * 10,
-                "risk_assessment": "MODERATE" if portfolio.get("total_profit_loss_percent", 0) > 0 else "HIGH",
-                "recommendations": [
-                    "Consider diversifying across more sectors",
-                    "Review holdings with negative returns",
-                    "Set stop-loss levels for high-risk positions"
-                ]
-            }
-            
-            pdf_bytes = generate_portfolio_health_pdf(health_data)
-            filename = f"portfolio_health_{datetime.now().strftime('%Y%m%d')}.pdf"
-        
-        else:
-            raise HTTPException(status_code=400, detail="Invalid report type")
-        
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}"
-            }
-        )
+        symbols, inputs = await _pdf_report_inputs(request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"PDF generation error: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate PDF: {str(e)}")
+    
+    key = report_cache_key(request.report_type, symbols, snapshot_hash(inputs))
+    headers = {
+        "Content-Disposition": f"attachment; filename={_pdf_filename(request.report_type, symbols)}",
+        "ETag": f'"{key}"',
+        "Cache-Control": "private, max-age=0, must-revalidate",
+    }
+    
+    if PDF_CACHE_ENABLED:
+        cached_path = pdf_cache.get(key)
+        if cached_path is not None:
+            if http_request.headers.get("if-none-match") == headers["ETag"]:
+                return Response(status_code=304, headers={"ETag": headers["ETag"]})
+            return FileResponse(cached_path, media_type="application/pdf", headers=headers)
     
+    try:
+        pdf_bytes, cacheable = await _render_pdf_report(request.report_type, inputs)
+    except PDFRenderTimeout as e:
+        logger.error(f"PDF generation timed out: {e}")
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         logger.error(f"PDF generation error: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate PDF: {str(e)}")
+    
+    if cacheable:
+        await _store_pdf_report(key, pdf_bytes)
+    
+    return Response(content=pdf_bytes, media_type="application/pdf", headers=headers)
+
+
+async def _store_pdf_report(key: str, pdf_bytes: bytes):
+    if not PDF_CACHE_ENABLED:
+        return
+    try:
+        await asyncio.to_thread(pdf_cache.put, key, pdf_bytes)
+    except OSError as e:
+        logger.warning(f"Could not cache PDF report: {e}")
+
+
+async def build_pdf_report(
+    request: ReportRequest, llm_admission: Optional[AdmissionController] = None
+) -> Tuple[str, bytes]:
+    """(file name, PDF bytes) for a report request, from the PDF cache when possible"""
+    symbols, inputs = await _pdf_report_inputs(request)
+    filename = _pdf_filename(request.report_type, symbols)
+    key = report_cache_key(request.report_type, symbols, snapshot_hash(inputs))
+    
+    if PDF_CACHE_ENABLED:
+        cached_path = pdf_cache.get(key)
+        if cached_path is not None:
+            return filename, await asyncio.to_thread(cached_path.read_bytes)
+    
+    pdf_bytes, cacheable = await _render_pdf_report(request.report_type, inputs, llm_admission)
+    if cacheable:
+        await _store_pdf_report(key, pdf_bytes)
+    return filename, pdf_bytes
+
+
+# ==================== REPORT JOBS ====================
+class ReportJobRequest(BaseModel):
+    """Reports to render in the background; a bundle adds a report per watchlist or portfolio stock"""
+    reports: List[ReportRequest] = []
+    bundle: Optional[str] = Field(None, pattern="^(watchlist|portfolio)$")
+
+
+async def _bundle_reports(bundle: str) -> List[ReportRequest]:
+    if bundle == "watchlist":
+        items = await db.watchlist.find({}, {"_id": 0, "symbol": 1}).to_list(REPORT_JOB_MAX_ITEMS + 1)
+        return [ReportRequest(report_type="single_stock", symbols=[i["symbol"]]) for i in items]
+    
+    holdings = await db.portfolio.find({}, {"_id": 0, "symbol": 1}).to_list(REPORT_JOB_MAX_ITEMS + 1)
+    symbols = sorted({h["symbol"] for h in holdings})
+    return [ReportRequest(report_type="portfolio_health")] + [
+        ReportRequest(report_type="single_stock", symbols=[symbol]) for symbol in symbols
+    ]
+
+
+@api_router.post("/reports/jobs", status_code=202)
+async def submit_report_job(request: ReportJobRequest):
+    """
+    Queue PDF reports for background rendering.
+    
+    Returns a job id at once; poll GET /reports/jobs/{job_id} for progress
+    and download the ZIP from /reports/jobs/{job_id}/download, which
+    streams each PDF as soon as it is rendered.
+    """
+    if not PDF_EXPORT_AVAILABLE:
+        raise HTTPException(status_code=503, detail="PDF generation not available. Install reportlab.")
+    
+    reports = list(request.reports)
+    if request.bundle:
+        reports.extend(await _bundle_reports(request.bundle))
+    
+    # Job insights share the interactive LLM limit instead of bypassing it
+    renders = [
+        (f"{report.report_type}:{','.join(report.symbols)}" if report.symbols else report.report_type,
+         lambda report=report: build_pdf_report(report, admission_controllers["llm"]))
+        for report in reports
+    ]
+    try:
+        job = await report_job_queue.submit(renders, name=request.bundle or "reports")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        **job.to_dict(include_items=False),
+        "status_url": f"/api/reports/jobs/{job.job_id}",
+        "download_url": f"/api/reports/jobs/{job.job_id}/download",
+    }
+
+
+@api_router.get("/reports/jobs/{job_id}")
+async def get_report_job(job_id: str):
+    """Progress of a report job and the status of each report"""
+    state = await report_job_queue.get_state(job_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return public_state(state)
+
+
+@api_router.get("/reports/jobs/{job_id}/download")
+async def download_report_job(job_id: str):
+    """ZIP of the job's PDFs, streamed as they complete and closed with a manifest.json"""
+    state = await report_job_queue.get_state(job_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    
+    return StreamingResponse(
+        report_job_queue.stream_zip(job_id),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={state['name']}_{job_id[:8]}.zip"},
+    )
 
 
 # ==================== SECTORS ====================
 @api_router.get("/sectors")
 async def get_sectors():
     """Get list of sectors with stock counts"""
-    stocks = list(get_cached_stocks().values())
+    stocks = list((await get_cached_stocks()).values())
     sectors = {}
     
     for stock in stocks:
@@ -843,7 +1184,7 @@ async def get_sectors():
 @api_router.get("/search")
 async def search_stocks(q: str = Query(..., min_length=1)):
     """Search stocks by symbol or name"""
-    stocks = list(get_cached_stocks().values())
+    stocks = list((await get_cached_stocks()).values())
     q = q.upper()
     
     results = [
@@ -858,9 +1199,14 @@ async def search_stocks(q: str = Query(..., min_length=1)):
 # ==================== BACKTESTING ====================
 try:
     from services.backtesting_service import (
-        run_backtest, get_available_strategies, get_strategy_info
+        run_backtest_in_pool, get_available_strategies, get_strategy_info, select_date_range
     )
-    from models.backtest_models import BacktestConfig, StrategyType
+    from services.backtest_cache import backtest_cache
+    from services.backtest_format import MIN_CHART_POINTS, format_backtest_result, format_curve
+    from services.backtest_optimizer import build_combinations, run_sweep
+    from services.backtest_pool import BACKTEST_ABORTED, BACKTEST_RUN_SECONDS, BacktestTimeout, backtest_pool
+    from services.batch_backtest import BACKTEST_BATCH_MAX_SYMBOLS, run_batch_backtest
+    from models.backtest_models import BacktestConfig, BatchBacktestConfig, OptimizeConfig, StrategyType
     BACKTEST_AVAILABLE = True
 except ImportError as e:
     logger.warning(f"Backtesting service not available: {e}")
@@ -895,55 +1241,255 @@ async def get_strategy(strategy_id: str):
     return strategy.model_dump()
 
 
-@api_router.post("/backtest/run")
-async def run_backtest_endpoint(config: BacktestConfig):
-    """Run a backtest with the specified configuration"""
+def _to_price_bars(history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "date": h["date"].strftime("%Y-%m-%d") if hasattr(h["date"], "strftime") else h["date"],
+            "open": h.get("open", h.get("close", 0)),
+            "high": h.get("high", h.get("close", 0)),
+            "low": h.get("low", h.get("close", 0)),
+            "close": h.get("close", 0),
+            "volume": h.get("volume", 0)
+        }
+        for h in history
+    ]
+
+
+def _history_period(start_date: Optional[str]) -> str:
+    """Shortest history download period reaching back to start_date"""
+    if not start_date:
+        return "2y"
+    try:
+        years = (datetime.now() - datetime.strptime(start_date, "%Y-%m-%d")).days / 365
+    except ValueError:
+        return "2y"
+    for period, limit in (("2y", 2), ("5y", 5), ("10y", 10)):
+        if years <= limit:
+            return period
+    return "max"
+
+
+async def _load_price_history(symbol: str, stock: Dict[str, Any], period: str = "2y") -> List[Dict[str, Any]]:
+    """Daily bars for a backtest, falling back to generated history"""
+    return (await _load_price_histories([symbol], {symbol: stock}, period))[symbol]
+
+
+async def _load_price_histories(
+    symbols: List[str], stocks: Dict[str, Dict[str, Any]], period: str = "2y"
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Daily bars per symbol, downloaded in bulk, with generated history for any gaps"""
+    histories = {}
+    if REAL_DATA_AVAILABLE and USE_REAL_DATA:
+        from services.market_data_service import get_bulk_historical_data
+        downloaded = await get_bulk_historical_data(symbols, period=period)
+        histories = {symbol: _to_price_bars(history) for symbol, history in downloaded.items() if history}
+    
+    # Fallback to mock data if needed; seeded per symbol and day so reruns see the same bars
+    missing = [symbol for symbol in symbols if symbol not in histories]
+    if missing:
+        from services.mock_data import generate_price_history
+        today = datetime.now().strftime("%Y-%m-%d")
+        for symbol in missing:
+            histories[symbol] = generate_price_history(
+                stocks[symbol]["current_price"], days=500, seed=f"{symbol}:{today}"
+            )
+    
+    return histories
+
+
+async def _run_backtest_work(request: Request, work, mode: str, poll_interval: float = 0.25):
+    """
+    Await backtest work from the pool, abandoning it if the client goes away.
+    
+    Cancellation drops the work's pool tasks that have not started; the pool
+    timeout bounds the ones that have. Timeouts become 504s.
+    """
+    task = asyncio.ensure_future(work)
+    started = time.perf_counter()
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                break
+            if await request.is_disconnected():
+                task.cancel()
+                BACKTEST_ABORTED.inc(mode=mode, reason="disconnected")
+                logger.info(f"Client disconnected; cancelled {mode} backtest")
+                raise HTTPException(status_code=499, detail="Client closed request")
+        result = task.result()
+    except BacktestTimeout as e:
+        BACKTEST_ABORTED.inc(mode=mode, reason="timeout")
+        raise HTTPException(status_code=504, detail=str(e))
+    finally:
+        task.cancel()
+    BACKTEST_RUN_SECONDS.observe(time.perf_counter() - started, mode=mode)
+    return result
+
+
+@api_router.post("/backtest/run", dependencies=[Depends(limit_concurrency("backtest"))])
+async def run_backtest_endpoint(
+    config: BacktestConfig,
+    request: Request,
+    points: Optional[int] = Query(default=None, ge=MIN_CHART_POINTS, le=10000),
+    format: str = Query(default="rows", pattern="^(rows|columnar)$"),
+):
+    """
+    Run a backtest with the specified configuration.
+    
+    The backtest runs in the worker pool under its timeout (504 past it) and
+    is cancelled if the client disconnects. Results are cached by
+    configuration and price-series content; the X-Backtest-Cache header
+    says whether this one was served from the cache.
+    
+    `points` downsamples the equity curve (LTTB) for charting, and
+    format=columnar returns the curve and trades as parallel arrays.
+    """
     if not BACKTEST_AVAILABLE:
         raise HTTPException(status_code=503, detail="Backtesting service not available")
     
     symbol = config.symbol.upper()
-    stocks = get_cached_stocks()
+    stocks = await get_cached_stocks()
     
     if symbol not in stocks:
         raise HTTPException(status_code=404, detail="Stock not found")
     
-    # Get price history
     try:
-        if REAL_DATA_AVAILABLE and USE_REAL_DATA:
-            from services.market_data_service import get_historical_data
-            history = await get_historical_data(symbol, period="2y")
-            if history:
-                price_history = [
-                    {
-                        "date": h["date"].strftime("%Y-%m-%d") if hasattr(h["date"], "strftime") else h["date"],
-                        "open": h.get("open", h.get("close", 0)),
-                        "high": h.get("high", h.get("close", 0)),
-                        "low": h.get("low", h.get("close", 0)),
-                        "close": h.get("close", 0),
-                        "volume": h.get("volume", 0)
-                    }
-                    for h in history
-                ]
-            else:
-                price_history = None
-        else:
-            price_history = None
+        price_history = await _load_price_history(symbol, stocks[symbol], _history_period(config.start_date))
+        price_history = select_date_range(price_history, config.start_date, config.end_date)
         
-        # Fallback to mock data if needed
-        if not price_history:
-            from services.mock_data import generate_price_history
-            price_history = generate_price_history(symbol, days=500)
-        
-        # Run the backtest
-        result = await run_backtest(config, price_history)
-        
-        return result.model_dump()
+        # Run the backtest, unless this configuration already ran on these bars
+        result, cached = await _run_backtest_work(
+            request,
+            backtest_cache.get_or_run(
+                config, price_history, lambda: run_backtest_in_pool(config, price_history, backtest_pool)
+            ),
+            mode="walk_forward" if config.walk_forward else "single",
+        )
+        # Already JSON-ready: skip FastAPI's encoder, which dominates on long curves
+        return JSONResponse(
+            content=format_backtest_result(result, points, columnar=format == "columnar"),
+            headers={"X-Backtest-Cache": "hit" if cached else "miss"},
+        )
     
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Backtest error: {e}")
         raise HTTPException(status_code=500, detail=f"Backtest failed: {str(e)}")
 
 
+@api_router.post("/backtest/batch", dependencies=[Depends(limit_concurrency("backtest"))])
+async def run_batch_backtest_endpoint(
+    config: BatchBacktestConfig,
+    request: Request,
+    points: Optional[int] = Query(default=None, ge=MIN_CHART_POINTS, le=10000),
+    format: str = Query(default="rows", pattern="^(rows|columnar)$"),
+):
+    """
+    Run one strategy across a symbol list or a sector.
+    
+    Returns per-symbol metrics, an equally weighted portfolio curve and
+    cross-sectional statistics; unknown symbols and symbols without price
+    history are listed under "skipped".
+    Runs in the worker pool under its timeout and stops if the client disconnects.
+    `points` and `format` shape the portfolio curve as for /backtest/run.
+    """
+    if not BACKTEST_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Backtesting service not available")
+    
+    stocks = await get_cached_stocks()
+    if config.sector:
+        symbols = [s for s, stock in stocks.items() if stock["sector"].lower() == config.sector.lower()]
+    else:
+        symbols = list(dict.fromkeys(s.upper() for s in config.symbols))
+    if not symbols:
+        raise HTTPException(status_code=400, detail="No symbols to backtest: give symbols or a known sector")
+    
+    skipped = [s for s in symbols if s not in stocks]
+    symbols = [s for s in symbols if s in stocks]
+    if not symbols:
+        raise HTTPException(status_code=404, detail="None of the requested stocks were found")
+    if len(symbols) > BACKTEST_BATCH_MAX_SYMBOLS:
+        raise HTTPException(
+            status_code=400, detail=f"A batch backtest is limited to {BACKTEST_BATCH_MAX_SYMBOLS} symbols"
+        )
+    
+    try:
+        histories = await _load_price_histories(symbols, stocks)
+        result = await _run_backtest_work(
+            request, run_batch_backtest(config, histories, pool=backtest_pool), mode="batch"
+        )
+        portfolio = result["portfolio"]
+        portfolio["equity_curve"] = format_curve(portfolio["equity_curve"], points, columnar=format == "columnar")
+        return JSONResponse(content={**result, "skipped": skipped + result["skipped"]})
+    
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Batch backtest error: {e}")
+        raise HTTPException(status_code=500, detail=f"Batch backtest failed: {str(e)}")
+
+
+@api_router.post("/backtest/optimize")
+async def optimize_backtest(config: OptimizeConfig):
+    """
+    Sweep a strategy's parameters and rank the combinations, as Server-Sent Events.
+    
+    Emits "progress" events ({completed, total, best}) as chunks of
+    combinations finish in the backtest worker pool, then one "result" event
+    with the ranked table and a heatmap matrix, or an "error" event.
+    Closing the connection cancels the combinations not yet started.
+    """
+    if not BACKTEST_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Backtesting service not available")
+    
+    symbol = config.symbol.upper()
+    stocks = await get_cached_stocks()
+    
+    if symbol not in stocks:
+        raise HTTPException(status_code=404, detail="Stock not found")
+    
+    try:
+        combos = build_combinations(config)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    price_history = await _load_price_history(symbol, stocks[symbol])
+    closes = [p["close"] for p in price_history]
+    
+    # Admission is checked before the stream opens so overload is still a 429
+    controller = admission_controllers["backtest"]
+    await controller.acquire()
+    
+    async def events():
+        yield ": stream open\n\n"
+        try:
+            async for event, data in run_sweep(closes, config, combos, pool=backtest_pool):
+                if event == "result":
+                    data = {
+                        "symbol": symbol,
+                        "start_date": price_history[0]["date"],
+                        "end_date": price_history[-1]["date"],
+                        "trading_days": len(price_history),
+                        **data,
+                    }
+                yield _sse_event(event, data)
+        except Exception as e:
+            logger.error(f"Backtest optimization failed for {symbol}: {e}")
+            yield _sse_event("error", {"detail": f"Optimization failed: {str(e)}"})
+    
+    return SlotHoldingStreamingResponse(
+        controller,
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ==================== ALERTS ====================
 @api_router.get("/alerts")
 async def get_alerts(
@@ -979,7 +1525,7 @@ async def create_alert(alert_data: AlertCreate):
         raise HTTPException(status_code=503, detail="Alerts service not available")
     
     # Get stock name if available
-    stocks = get_cached_stocks()
+    stocks = await get_cached_stocks()
     stock = stocks.get(alert_data.symbol.upper())
     stock_name = stock.get("name") if stock else None
     
@@ -1043,7 +1589,7 @@ async def get_recent_notifications(limit: int = Query(default=20, le=50)):
     if not ALERTS_AVAILABLE:
         raise HTTPException(status_code=503, detail="Alerts service not available")
     
-    notifications = alerts_service.get_recent_notifications(limit)
+    notifications = await alerts_service.get_recent_notifications(limit)
     return [n.model_dump() for n in notifications]
 
 
@@ -1076,7 +1622,7 @@ async def manually_check_alerts():
     
     if not prices:
         # Fallback to cached stock data
-        stocks = get_cached_stocks()
+        stocks = await get_cached_stocks()
         for symbol in symbols:
             if symbol in stocks:
                 prices[symbol] = {
@@ -1093,6 +1639,80 @@ async def manually_check_alerts():
     }
 
 
+# ==================== ADMIN: PROFILING ====================
+# Every /admin route requires the X-Admin-Token header (see services.admin_auth)
+@api_router.get("/admin/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """List stored request profiles, newest first"""
+    if not is_profiling_enabled():
+        raise HTTPException(status_code=503, detail="Profiling not enabled. Set PROFILING_ENABLED=true.")
+    
+    return profile_store.list()
+
+
+@api_router.get("/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def download_profile(profile_id: str, format: str = Query(default="json", pattern="^(json|collapsed)$")):
+    """Download a stored profile as a JSON call tree or collapsed stacks"""
+    if not is_profiling_enabled():
+        raise HTTPException(status_code=503, detail="Profiling not enabled. Set PROFILING_ENABLED=true.")
+    
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    if format == "collapsed":
+        return Response(
+            content=collapse_tree(profile["tree"]),
+            media_type="text/plain",
+            headers={"Content-Disposition": f"attachment; filename={profile_id}.folded"}
+        )
+    
+    return profile
+
+
+@api_router.get("/admin/loop-blocks", dependencies=[Depends(require_admin)])
+async def get_loop_blocks(limit: int = Query(default=20, le=100)):
+    """Recent event-loop stalls with the offending function and its stack"""
+    if not is_loop_watchdog_enabled():
+        raise HTTPException(status_code=503, detail="Loop watchdog not enabled")
+    
+    return {
+        "threshold_ms": loop_watchdog.threshold * 1000,
+        "offenders": loop_watchdog.get_offender_summary(),
+        "recent": loop_watchdog.get_recent_blocks(limit),
+    }
+
+
+@api_router.get("/admin/llm-cache", dependencies=[Depends(require_admin)])
+async def get_llm_cache_stats():
+    """LLM response cache lookups and hit rate per operation"""
+    return {"ttl_seconds": llm_cache.ttl, "operations": llm_cache.get_stats()}
+
+
+@api_router.get("/admin/pdf-render", dependencies=[Depends(require_admin)])
+async def get_pdf_render_status():
+    """PDF render worker pool size, timeout and counters, and PDF cache usage"""
+    return {
+        **pdf_render_pool.get_status(),
+        "cache": pdf_cache.get_status(),
+        "jobs": report_job_queue.get_status(),
+    }
+
+
+@api_router.get("/admin/backtest", dependencies=[Depends(require_admin)])
+async def get_backtest_status():
+    """Backtest worker pool size, timeout, queue and counters, and result cache hit rates"""
+    if not BACKTEST_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Backtesting service not available")
+    return {**backtest_pool.get_status(), "cache": backtest_cache.get_stats()}
+
+
+@api_router.get("/admin/admission", dependencies=[Depends(require_admin)])
+async def get_admission():
+    """Concurrency limits, running and queued requests per expensive endpoint class"""
+    return get_admission_status()
+
+
 # ==================== DATA EXTRACTION PIPELINE ====================
 
 class ExtractionRequest(BaseModel):
@@ -1131,7 +1751,11 @@ async def get_extraction_status():
     }
 
 
-@api_router.post("/extraction/run", response_model=ExtractionResponse)
+@api_router.post(
+    "/extraction/run",
+    response_model=ExtractionResponse,
+    dependencies=[Depends(limit_concurrency("extraction"))],
+)
 async def run_extraction(request: ExtractionRequest):
     """
     Run the data extraction pipeline for specified symbols.
@@ -1155,6 +1779,7 @@ async def run_extraction(request: ExtractionRequest):
     try:
         # Initialize orchestrator if needed
         if _pipeline_orchestrator is None:
+            from data_extraction.pipeline.orchestrator import PipelineOrchestrator
             _pipeline_orchestrator = PipelineOrchestrator(db=db)
         
         # Run the pipeline
@@ -1232,8 +1857,24 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Content-Disposition", "X-Backtest-Cache"],
 )
 
+# Opt-in request profiling; not installed at all unless enabled
+if is_profiling_enabled():
+    app.add_middleware(ProfilingMiddleware)
+    logger.info("Request profiling enabled")
+
+# Per-route latency and status metrics (outermost, so it times the whole stack)
+app.add_middleware(MetricsMiddleware)
+
+
+# ==================== METRICS ====================
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics in text exposition format"""
+    return Response(content=metrics_registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 
 # ==================== WEBSOCKET ====================
 @app.websocket("/ws/prices")
@@ -1286,10 +1927,33 @@ async def startup_event():
     """Start background services on app startup"""
     logger.info("Starting StockPulse API...")
     
+    if INDEX_BOOTSTRAP_AVAILABLE:
+        try:
+            await bootstrap_indexes(db)
+        except Exception as e:
+            logger.error(f"Index bootstrap failed: {e}")
+    
+    if is_loop_watchdog_enabled():
+        await loop_watchdog.start()
+    
     if WEBSOCKET_AVAILABLE:
         await price_broadcaster.start()
         logger.info("Price broadcaster started")
     
+    if PDF_EXPORT_AVAILABLE:
+        try:
+            workers = await pdf_render_pool.start()
+            logger.info(f"PDF render pool warmed ({workers} workers)")
+        except Exception as e:
+            logger.error(f"PDF render pool failed to start: {e}")
+    
+    if BACKTEST_AVAILABLE:
+        try:
+            workers = await backtest_pool.start()
+            logger.info(f"Backtest pool started ({workers} workers)")
+        except Exception as e:
+            logger.error(f"Backtest pool failed to start: {e}")
+    
     logger.info("StockPulse API ready!")
 
 
@@ -1302,5 +1966,13 @@ async def shutdown_event():
         await price_broadcaster.stop()
         logger.info("Price broadcaster stopped")
     
+    if is_loop_watchdog_enabled():
+        await loop_watchdog.stop()
+    
+    await report_job_queue.shutdown()
+    pdf_render_pool.shutdown()
+    if BACKTEST_AVAILABLE:
+        backtest_pool.shutdown()
+    await get_state_backend().close()
     client.close()
     logger.info("Database connection closed")
@@ -0,0 +1,31 @@
+"""
+Admin Access for StockPulse
+Shared-token check for the /api/admin endpoints and operator-only request
+controls such as forcing a request profile
+"""
+
+import hmac
+import os
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+# Operators send this in the X-Admin-Token header; admin endpoints are disabled while it is unset
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+ADMIN_TOKEN_HEADER = b"x-admin-token"
+
+
+def is_admin_token(token: Optional[str], expected: Optional[str] = None) -> bool:
+    """Whether token matches the admin token (default ADMIN_TOKEN); never true when none is configured"""
+    expected = ADMIN_TOKEN if expected is None else expected
+    if not expected or token is None:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), expected.encode("utf-8"))
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """FastAPI dependency admitting only requests that carry the admin token"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=503, detail="Admin endpoints disabled. Set ADMIN_TOKEN.")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
@@ -0,0 +1,227 @@
+"""
+Admission Control for StockPulse
+Per-endpoint-class concurrency limits with bounded, time-limited wait queues
+so expensive work (LLM calls, reports, PDFs, backtests, extraction) cannot
+crowd out cheap requests
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_QUEUE_DEPTH = registry.gauge(
+    "stockpulse_admission_queue_depth",
+    "Requests waiting for a slot, by endpoint class",
+    ("endpoint_class",),
+)
+ADMISSION_IN_FLIGHT = registry.gauge(
+    "stockpulse_admission_in_flight",
+    "Requests holding a slot, by endpoint class",
+    ("endpoint_class",),
+)
+ADMISSION_WAIT_SECONDS = registry.histogram(
+    "stockpulse_admission_wait_seconds",
+    "Time admitted requests spent queued for a slot",
+    ("endpoint_class",),
+)
+ADMISSION_REJECTED = registry.counter(
+    "stockpulse_admission_rejected_total",
+    "Requests rejected with 429, by endpoint class and reason (queue_full, timeout)",
+    ("endpoint_class", "reason"),
+)
+
+# endpoint class -> (max concurrent, max queued, max queue wait in seconds)
+# Override per class with ADMISSION_<CLASS>_CONCURRENCY / _QUEUE / _TIMEOUT_S
+DEFAULT_LIMITS = {
+    "llm": (4, 16, 10.0),
+    "reports": (4, 16, 15.0),
+    "pdf": (4, 16, 30.0),
+    "backtest": (2, 8, 30.0),
+    "extraction": (1, 2, 5.0),
+}
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; rendered as 429 with Retry-After"""
+
+    def __init__(self, endpoint_class: str, reason: str, retry_after: int):
+        super().__init__(f"{endpoint_class} overloaded ({reason})")
+        self.endpoint_class = endpoint_class
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Concurrency semaphore plus a bounded wait queue for one endpoint class.
+
+    Up to max_concurrent requests run at once and up to max_queue more wait,
+    each for at most queue_timeout seconds. Anything beyond that is rejected
+    immediately rather than piling up behind the slow work.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.waiting = 0
+        self.in_flight = 0
+        # Moving average of how long a slot is held, for Retry-After estimates
+        self._avg_service_seconds = 1.0
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free, from queue length and service time"""
+        rounds = (self.waiting + 1) / self.max_concurrent
+        return max(1, min(60, math.ceil(rounds * self._avg_service_seconds)))
+
+    def _reject(self, reason: str):
+        ADMISSION_REJECTED.inc(endpoint_class=self.name, reason=reason)
+        logger.warning(
+            f"Rejected {self.name} request ({reason}): "
+            f"{self.in_flight} running, {self.waiting} queued"
+        )
+        raise AdmissionRejected(self.name, reason, self.retry_after())
+
+    async def _wait_for_permit(self):
+        """Take a semaphore permit, raising asyncio.TimeoutError after queue_timeout"""
+        if hasattr(asyncio, "timeout"):
+            async with asyncio.timeout(self.queue_timeout):
+                await self._semaphore.acquire()
+            return
+        # Before Python 3.11, wait_for can time out after acquire() already
+        # took the permit; hand it back or the slot is lost for good
+        waiter = asyncio.ensure_future(self._semaphore.acquire())
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                self._semaphore.release()
+            raise
+
+    async def acquire(self):
+        if self.in_flight + self.waiting >= self.max_concurrent + self.max_queue:
+            self._reject("queue_full")
+
+        self.waiting += 1
+        ADMISSION_QUEUE_DEPTH.set(self.waiting, endpoint_class=self.name)
+        start = time.perf_counter()
+        try:
+            await self._wait_for_permit()
+        except asyncio.TimeoutError:
+            self._reject("timeout")
+        finally:
+            self.waiting -= 1
+            ADMISSION_QUEUE_DEPTH.set(self.waiting, endpoint_class=self.name)
+
+        ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - start, endpoint_class=self.name)
+        self.in_flight += 1
+        ADMISSION_IN_FLIGHT.set(self.in_flight, endpoint_class=self.name)
+
+    def release(self, service_seconds: float):
+        self.in_flight -= 1
+        ADMISSION_IN_FLIGHT.set(self.in_flight, endpoint_class=self.name)
+        self._avg_service_seconds = 0.8 * self._avg_service_seconds + 0.2 * service_seconds
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a slot for the enclosed block"""
+        await self.acquire()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - start)
+
+    def get_status(self) -> Dict[str, float]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "queue_timeout_s": self.queue_timeout,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+        }
+
+
+def _load_controllers() -> Dict[str, AdmissionController]:
+    controllers = {}
+    for name, (concurrency, queue, timeout) in DEFAULT_LIMITS.items():
+        prefix = f"ADMISSION_{name.upper()}"
+        controllers[name] = AdmissionController(
+            name,
+            max_concurrent=int(os.environ.get(f"{prefix}_CONCURRENCY", concurrency)),
+            max_queue=int(os.environ.get(f"{prefix}_QUEUE", queue)),
+            queue_timeout=float(os.environ.get(f"{prefix}_TIMEOUT_S", timeout)),
+        )
+    return controllers
+
+
+# Global controllers, one per endpoint class
+admission_controllers = _load_controllers()
+
+
+def limit_concurrency(endpoint_class: str):
+    """
+    FastAPI dependency holding a slot of the given class while the endpoint runs.
+
+    Usage: @api_router.post(..., dependencies=[Depends(limit_concurrency("pdf"))])
+    """
+    controller = admission_controllers[endpoint_class]
+
+    async def dependency():
+        async with controller.slot():
+            yield
+
+    return dependency
+
+
+class SlotHoldingStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that keeps an already acquired slot until the stream ends.
+
+    A dependency's slot is released before the body is sent, which for a
+    stream is before the expensive part; acquire in the endpoint instead and
+    hand the controller to this response.
+    """
+
+    def __init__(self, controller: AdmissionController, content, **kwargs):
+        super().__init__(content, **kwargs)
+        self.controller = controller
+        self._start = time.perf_counter()
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.controller.release(time.perf_counter() - self._start)
+
+
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected) -> JSONResponse:
+    """Exception handler rendering AdmissionRejected as 429 Too Many Requests"""
+    return JSONResponse(
+        status_code=429,
+        content={
+            "detail": f"Too many concurrent {exc.endpoint_class} requests, retry later",
+            "reason": exc.reason,
+        },
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def get_admission_status() -> Dict[str, Dict[str, float]]:
+    """Current limits and occupancy of every endpoint class"""
+    return {name: c.get_status() for name, c in admission_controllers.items()}
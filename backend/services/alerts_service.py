@@ -14,9 +14,15 @@ from models.alert_models import (
     Alert, AlertCreate, AlertUpdate, AlertCondition, 
     AlertStatus, AlertPriority, AlertNotification, AlertSummary
 )
+from services.metrics import ALERT_CHECK_SECONDS
+from services.state_backend import get_state_backend
 
 logger = logging.getLogger(__name__)
 
+# Shared notification history (state backend list), newest entries kept
+NOTIFICATIONS_KEY = "alerts:notifications"
+NOTIFICATION_HISTORY_SIZE = 500
+
 
 class AlertsService:
     """Service for managing price alerts"""
@@ -26,7 +32,6 @@ class AlertsService:
         self.collection = db.alerts
         self._check_task: Optional[asyncio.Task] = None
         self._running = False
-        self._notifications: List[AlertNotification] = []
         self._check_interval = 30  # seconds
     
     async def create_alert(self, alert_data: AlertCreate, stock_name: Optional[str] = None) -> Alert:
@@ -156,8 +161,11 @@ class AlertsService:
             {"$set": update_data}
         )
         
-        # Store notification
-        self._notifications.append(notification)
+        # Store notification in the shared history so every worker sees it
+        await get_state_backend().list_push(
+            NOTIFICATIONS_KEY, notification.model_dump(mode="json"),
+            max_length=NOTIFICATION_HISTORY_SIZE,
+        )
         
         logger.info(f"Alert {alert.id} triggered at price {current_price}")
         
@@ -187,6 +195,14 @@ class AlertsService:
         previous_prices: Optional[Dict[str, float]] = None
     ) -> List[AlertNotification]:
         """Check all active alerts against current prices"""
+        with ALERT_CHECK_SECONDS.time():
+            return await self._check_alert_conditions(prices, previous_prices)
+    
+    async def _check_alert_conditions(
+        self, 
+        prices: Dict[str, Dict],
+        previous_prices: Optional[Dict[str, float]] = None
+    ) -> List[AlertNotification]:
         notifications = []
         
         active_alerts = await self.get_all_alerts(status=AlertStatus.ACTIVE)
@@ -295,13 +311,14 @@ class AlertsService:
             alerts_by_symbol=by_symbol,
         )
     
-    def get_recent_notifications(self, limit: int = 20) -> List[AlertNotification]:
+    async def get_recent_notifications(self, limit: int = 20) -> List[AlertNotification]:
         """Get recent notifications"""
-        return self._notifications[-limit:]
+        entries = await get_state_backend().list_range(NOTIFICATIONS_KEY, limit)
+        return [AlertNotification(**entry) for entry in entries]
     
-    def clear_notifications(self):
+    async def clear_notifications(self):
         """Clear stored notifications"""
-        self._notifications = []
+        await get_state_backend().delete(NOTIFICATIONS_KEY)
     
     # Background task for checking alerts
     async def start_background_checker(self, price_fetcher):
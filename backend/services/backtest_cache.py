@@ -0,0 +1,135 @@
+"""
+Backtest Result Cache for StockPulse
+Backtest results keyed by symbol, strategy, normalized parameters, capital,
+date range and a hash of the price series they ran on, shared through the
+state backend with single-flight computation
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from models.backtest_models import BacktestConfig
+from services.backtesting_service import normalize_parameters
+from services.metrics import registry
+from services.state_backend import fetch_shared, get_state_backend
+
+logger = logging.getLogger(__name__)
+
+BACKTEST_CACHE_ENABLED = os.environ.get("BACKTEST_CACHE_ENABLED", "true").lower() == "true"
+BACKTEST_CACHE_TTL_SECONDS = int(os.environ.get("BACKTEST_CACHE_TTL_SECONDS", "3600"))
+
+BACKTEST_CACHE_LOOKUPS = registry.counter(
+    "stockpulse_backtest_cache_lookups_total",
+    "Backtest result cache lookups by result (hit, coalesced, miss)",
+    ("result",),
+)
+
+
+def price_series_hash(price_history: List[Dict]) -> str:
+    """
+    Content hash of the bars a backtest runs on.
+
+    Covers every date and close, so a series extended by new bars (or with
+    a revised close) hashes differently and misses the cache.
+    """
+    digest = hashlib.sha256()
+    digest.update("\n".join(str(bar["date"]) for bar in price_history).encode("utf-8"))
+    digest.update(np.array([bar["close"] for bar in price_history], dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+def backtest_cache_key(config: BacktestConfig, data_hash: str) -> str:
+    """Content address of a backtest result"""
+    payload = json.dumps(
+        {
+            "symbol": config.symbol.upper(),
+            "strategy": config.strategy.value,
+            "parameters": normalize_parameters(config.strategy, config.parameters),
+            "initial_capital": float(config.initial_capital),
+            "start_date": config.start_date,
+            "end_date": config.end_date,
+            "walk_forward": config.walk_forward.model_dump(mode="json") if config.walk_forward else None,
+            "monte_carlo": config.monte_carlo.model_dump(mode="json") if config.monte_carlo else None,
+            "data": data_hash,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BacktestResultCache:
+    """
+    Backtest results in the shared state backend.
+
+    Entries are content-addressed, so nothing is invalidated explicitly:
+    new bars change the price-series hash and the next request computes a
+    fresh result, while the stale entry expires with its TTL. Identical
+    concurrent requests share one computation, which is cancelled if every
+    one of them gives up.
+    """
+
+    def __init__(self, ttl_seconds: int = BACKTEST_CACHE_TTL_SECONDS):
+        self.ttl = ttl_seconds
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+
+    @staticmethod
+    def _key(key: str) -> str:
+        return f"backtest:{key}"
+
+    async def get_or_run(
+        self,
+        config: BacktestConfig,
+        price_history: List[Dict],
+        run: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Tuple[Dict[str, Any], bool]:
+        """(result, served from cache) for config over price_history; run computes it on a miss"""
+        if not BACKTEST_CACHE_ENABLED:
+            return await run(), False
+
+        key = self._key(backtest_cache_key(config, price_series_hash(price_history)))
+        cached = await get_state_backend().get(key)
+        if cached is not None:
+            BACKTEST_CACHE_LOOKUPS.inc(result="hit")
+            return cached, True
+
+        task = self._inflight.get(key)
+        if task is not None:
+            BACKTEST_CACHE_LOOKUPS.inc(result="coalesced")
+            return await self._wait(key, task), True
+
+        BACKTEST_CACHE_LOOKUPS.inc(result="miss")
+        task = asyncio.ensure_future(fetch_shared(key, self.ttl, run))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await self._wait(key, task), False
+
+    async def _wait(self, key: str, task: asyncio.Task) -> Dict[str, Any]:
+        # The shared computation outlives any one caller, but not all of them
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[key] == 1:
+                task.cancel()
+            raise
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    def get_stats(self) -> Dict[str, float]:
+        counts = {result: count for (result,), count in BACKTEST_CACHE_LOOKUPS.items()}
+        total = sum(counts.values())
+        counts["hit_rate"] = round((total - counts.get("miss", 0)) / total, 4) if total else 0.0
+        return counts
+
+
+# Global instance
+backtest_cache = BacktestResultCache()
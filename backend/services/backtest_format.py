@@ -0,0 +1,87 @@
+"""
+Backtest Response Format for StockPulse
+Largest-Triangle-Three-Buckets downsampling of equity curves for charting,
+and a columnar layout that ships curves and trades as parallel arrays
+instead of one object per row
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from models.backtest_models import Trade
+
+# Fewer points than this cannot keep both ends and a shape between them
+MIN_CHART_POINTS = 3
+
+
+def lttb_indices(values: np.ndarray, target: int) -> np.ndarray:
+    """
+    Indices of the target points that best preserve the curve's shape.
+
+    The first and last points are always kept; every bucket in between
+    contributes the point forming the largest triangle with the point kept
+    from the previous bucket and the average of the next one.
+    """
+    n = len(values)
+    if target >= n or target < MIN_CHART_POINTS:
+        return np.arange(n)
+
+    values = np.asarray(values, dtype=float)
+    # target - 2 buckets over the interior points, then the last point alone
+    edges = np.append(np.linspace(1, n - 1, target - 1).astype(int), n)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(np.arange(n, dtype=float), edges[:-1]) / counts
+    mean_y = np.add.reduceat(values, edges[:-1]) / counts
+
+    selected = np.empty(target, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(target - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        x = np.arange(start, end)
+        # Twice the triangle area; the factor does not change the argmax
+        area = np.abs(
+            (previous - mean_x[bucket + 1]) * (values[start:end] - values[previous])
+            - (previous - x) * (mean_y[bucket + 1] - values[previous])
+        )
+        previous = start + int(area.argmax())
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample_curve(curve: List[Dict[str, Any]], points: Optional[int], key: str = "value") -> List[Dict[str, Any]]:
+    """curve reduced to about `points` rows by LTTB on curve[i][key]"""
+    if not points or points >= len(curve):
+        return curve
+    keep = lttb_indices(np.array([row[key] for row in curve], dtype=float), points)
+    return [curve[i] for i in keep.tolist()]
+
+
+def to_columns(rows: List[Dict[str, Any]], fields: Sequence[str]) -> Dict[str, List[Any]]:
+    """Parallel arrays, one per field, from a list of row dicts"""
+    return {field: [row[field] for row in rows] for field in fields}
+
+
+def format_backtest_result(
+    result: Dict[str, Any], points: Optional[int] = None, columnar: bool = False
+) -> Dict[str, Any]:
+    """
+    A JSON-ready backtest result with its equity curve downsampled to
+    `points` and, when columnar, the curve and trades as parallel arrays.
+    Metrics always come from the full-resolution run.
+    """
+    curve = downsample_curve(result["equity_curve"], points)
+    if not columnar:
+        return {**result, "equity_curve": curve}
+    return {
+        **result,
+        "equity_curve": to_columns(curve, ("date", "value", "price")),
+        "trades": to_columns(result["trades"], list(Trade.model_fields)),
+    }
+
+
+def format_curve(curve: List[Dict[str, Any]], points: Optional[int] = None, columnar: bool = False):
+    """A {date, value} curve downsampled and optionally as parallel arrays"""
+    curve = downsample_curve(curve, points)
+    return to_columns(curve, ("date", "value")) if columnar else curve
@@ -0,0 +1,272 @@
+"""
+Backtest Optimizer for StockPulse
+Parameter sweeps (grid or random search) over a strategy's declared
+parameter ranges, fanned out over the backtest worker pool, ranked by an
+objective and summarized as a heatmap
+"""
+
+import asyncio
+import itertools
+import logging
+import math
+import os
+import random
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models.backtest_models import OptimizationObjective, OptimizeConfig, SearchMethod, StrategyType
+from services.backtest_pool import (
+    BACKTEST_TIMEOUTS, BacktestPool, BacktestTimeout, SharedArray, SharedArraySpec, attach_shared_array, backtest_pool,
+)
+from services.backtesting_service import STRATEGIES, STRATEGY_SIGNALS, simulate_positions, simulation_metrics
+
+logger = logging.getLogger(__name__)
+
+BACKTEST_OPTIMIZE_MAX_COMBINATIONS = int(os.environ.get("BACKTEST_OPTIMIZE_MAX_COMBINATIONS", "2000"))
+# Values per parameter when a grid is derived from the declared min/max range
+GRID_STEPS = 6
+# Upper bound on combinations per worker task; smaller chunks mean finer progress
+MAX_CHUNK_SIZE = 50
+
+# objective -> (metric key, higher is better)
+OBJECTIVES = {
+    OptimizationObjective.SHARPE: ("sharpe_ratio", True),
+    OptimizationObjective.SORTINO: ("sortino_ratio", True),
+    OptimizationObjective.CALMAR: ("calmar_ratio", True),
+    OptimizationObjective.RETURN: ("total_return_percent", True),
+    OptimizationObjective.DRAWDOWN: ("max_drawdown", False),
+}
+
+
+# ==================== Combinations ====================
+
+def _cast(spec: Dict[str, Any], value: float):
+    return int(round(value)) if spec["type"] == "int" else round(float(value), 4)
+
+
+def range_values(spec: Dict[str, Any], steps: int = GRID_STEPS) -> List[float]:
+    """Evenly spaced values across a declared parameter range"""
+    values = np.linspace(spec["min"], spec["max"], steps)
+    return sorted({_cast(spec, v) for v in values})
+
+
+def is_valid_combination(strategy: StrategyType, params: Dict[str, Any]) -> bool:
+    """Rejects combinations the strategy cannot trade meaningfully"""
+    if any(params[name] < 1 for name in params if name.endswith("period")):
+        return False
+    if strategy == StrategyType.SMA_CROSSOVER:
+        return params["short_period"] < params["long_period"]
+    if strategy == StrategyType.MACD:
+        return params["fast_period"] < params["slow_period"]
+    if strategy == StrategyType.RSI:
+        return params["oversold"] < params["overbought"]
+    return True
+
+
+def _parameter_specs(config: OptimizeConfig) -> Dict[str, Dict[str, Any]]:
+    specs = {spec["name"]: spec for spec in STRATEGIES[config.strategy].parameters}
+    unknown = set(config.parameter_grid) - set(specs)
+    if unknown:
+        raise ValueError(f"Unknown parameters for {config.strategy.value}: {', '.join(sorted(unknown))}")
+    for name, values in config.parameter_grid.items():
+        if not values:
+            raise ValueError(f"No values given for {name}")
+    return specs
+
+
+def grid_combinations(config: OptimizeConfig) -> List[Dict[str, Any]]:
+    """Every combination of the requested (or range-derived) parameter values"""
+    specs = _parameter_specs(config)
+    axes = [
+        sorted({_cast(spec, v) for v in config.parameter_grid[name]}) if name in config.parameter_grid
+        else range_values(spec)
+        for name, spec in specs.items()
+    ]
+    size = math.prod(len(values) for values in axes)
+    if size > BACKTEST_OPTIMIZE_MAX_COMBINATIONS:
+        raise ValueError(
+            f"Grid has {size} combinations; the limit is {BACKTEST_OPTIMIZE_MAX_COMBINATIONS} "
+            f"(narrow the grid or use random search)"
+        )
+    combos = [dict(zip(specs, values)) for values in itertools.product(*axes)]
+    return [params for params in combos if is_valid_combination(config.strategy, params)]
+
+
+def random_combinations(config: OptimizeConfig) -> List[Dict[str, Any]]:
+    """Up to config.samples distinct combinations drawn from the grid values or the declared ranges"""
+    specs = _parameter_specs(config)
+    samples = min(config.samples, BACKTEST_OPTIMIZE_MAX_COMBINATIONS)
+    rng = random.Random(config.seed)
+
+    def draw(name: str, spec: Dict[str, Any]):
+        if name in config.parameter_grid:
+            return _cast(spec, rng.choice(config.parameter_grid[name]))
+        if spec["type"] == "int":
+            return rng.randint(spec["min"], spec["max"])
+        return round(rng.uniform(spec["min"], spec["max"]), 2)
+
+    seen, combos = set(), []
+    for _ in range(samples * 20):
+        params = {name: draw(name, spec) for name, spec in specs.items()}
+        key = tuple(params.values())
+        if key in seen or not is_valid_combination(config.strategy, params):
+            continue
+        seen.add(key)
+        combos.append(params)
+        if len(combos) == samples:
+            break
+    return combos
+
+
+def build_combinations(config: OptimizeConfig) -> List[Dict[str, Any]]:
+    """Combinations a sweep evaluates; raises ValueError for an unusable request"""
+    if config.search == SearchMethod.RANDOM:
+        combos = random_combinations(config)
+    else:
+        combos = grid_combinations(config)
+    if not combos:
+        raise ValueError("No valid parameter combinations to evaluate")
+
+    if config.heatmap_axes is not None:
+        names = [spec["name"] for spec in STRATEGIES[config.strategy].parameters]
+        if len(config.heatmap_axes) != 2 or any(axis not in names for axis in config.heatmap_axes):
+            raise ValueError(f"heatmap_axes must name two of: {', '.join(names)}")
+    return combos
+
+
+# ==================== Evaluation (worker side) ====================
+
+def evaluate_combinations(
+    closes_spec: SharedArraySpec, strategy: str, combos: List[Dict[str, Any]], initial_capital: float
+) -> List[Dict[str, Any]]:
+    """Worker entry point: metrics for each combination over the shared close-price array"""
+    closes = attach_shared_array(closes_spec)
+    signal_fn = STRATEGY_SIGNALS[StrategyType(strategy)]
+    rows = []
+    for params in combos:
+        signals = signal_fn(closes, **params)
+        sim = simulate_positions(closes, signals.entries, signals.exits, initial_capital)
+        rows.append({"parameters": params, **simulation_metrics(sim, initial_capital)})
+    return rows
+
+
+# ==================== Ranking ====================
+
+def rank_results(rows: List[Dict[str, Any]], objective: OptimizationObjective, top_n: int) -> List[Dict[str, Any]]:
+    """Best top_n rows by the objective, ties broken by return"""
+    key, higher_is_better = OBJECTIVES[objective]
+    sign = -1 if higher_is_better else 1
+    ordered = sorted(rows, key=lambda row: (sign * row[key], -row["total_return_percent"]))
+    return [
+        {"rank": i + 1, "objective_value": row[key], **row}
+        for i, row in enumerate(ordered[:top_n])
+    ]
+
+
+def build_heatmap(
+    rows: List[Dict[str, Any]],
+    objective: OptimizationObjective,
+    parameter_names: List[str],
+    axes: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Objective over two parameters, for a heatmap chart.
+
+    values[i][j] is the best objective among runs with y = y_values[i] and
+    x = x_values[j] (other parameters free), or None where nothing ran. By
+    default the axes are the first two parameters that vary; with only one
+    varying parameter the matrix has a single row and y is None.
+    """
+    key, higher_is_better = OBJECTIVES[objective]
+    if axes is None:
+        varying = [name for name in parameter_names if len({row["parameters"][name] for row in rows}) > 1]
+        x = (varying or parameter_names)[0]
+        y = varying[1] if len(varying) > 1 else None
+    else:
+        x, y = axes
+
+    best: Dict[Tuple[Any, Any], float] = {}
+    for row in rows:
+        cell = (row["parameters"][x], row["parameters"][y] if y else None)
+        value = row[key]
+        if cell not in best or (value > best[cell] if higher_is_better else value < best[cell]):
+            best[cell] = value
+
+    x_values = sorted({cell[0] for cell in best})
+    y_values = sorted({cell[1] for cell in best}) if y else [None]
+    return {
+        "x": x,
+        "y": y,
+        "x_values": x_values,
+        "y_values": y_values,
+        "values": [[best.get((xv, yv)) for xv in x_values] for yv in y_values],
+    }
+
+
+# ==================== Sweep ====================
+
+async def run_sweep(
+    closes,
+    config: OptimizeConfig,
+    combos: List[Dict[str, Any]],
+    pool: BacktestPool = backtest_pool,
+    chunk_size: Optional[int] = None,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Evaluate combos over the pool, yielding ("progress", ...) as chunks finish
+    and a final ("result", ...) with the ranked table and heatmap.
+
+    The close prices are published once in shared memory for every worker.
+    The whole sweep runs under the pool's timeout; closing the generator
+    early cancels the chunks not yet started.
+    """
+    total = len(combos)
+    chunk_size = chunk_size or max(1, min(MAX_CHUNK_SIZE, math.ceil(total / (pool.workers * 4))))
+    rows: List[Dict[str, Any]] = []
+    start = time.perf_counter()
+
+    with SharedArray(np.asarray(closes, dtype=float)) as shared:
+        pending = {
+            pool.submit(
+                evaluate_combinations, shared.spec, config.strategy.value,
+                combos[i:i + chunk_size], config.initial_capital,
+            )
+            for i in range(0, total, chunk_size)
+        }
+        deadline = time.monotonic() + pool.timeout
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=deadline - time.monotonic(), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    BACKTEST_TIMEOUTS.inc()
+                    pool.restart()
+                    raise BacktestTimeout(f"Optimization exceeded {pool.timeout:.0f}s")
+                for future in done:
+                    rows.extend(future.result())
+                best = rank_results(rows, config.objective, 1)
+                yield "progress", {
+                    "completed": len(rows),
+                    "total": total,
+                    "best": best[0] if best else None,
+                }
+        finally:
+            for future in pending:
+                future.cancel()
+
+    duration = time.perf_counter() - start
+    logger.info(f"Swept {total} {config.strategy.value} combinations in {duration:.2f}s")
+    parameter_names = [spec["name"] for spec in STRATEGIES[config.strategy].parameters]
+    yield "result", {
+        "strategy": config.strategy.value,
+        "objective": config.objective.value,
+        "search": config.search.value,
+        "evaluated": total,
+        "duration_seconds": round(duration, 3),
+        "parameters": parameter_names,
+        "ranked": rank_results(rows, config.objective, config.top_n),
+        "heatmap": build_heatmap(rows, config.objective, parameter_names, config.heatmap_axes),
+    }
@@ -0,0 +1,232 @@
+"""
+Backtest Worker Pool for StockPulse
+Process pool for CPU-bound backtest work, with a hard timeout, queue depth
+and duration metrics; price arrays reach the workers through shared memory
+instead of being pickled into every task
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+BACKTEST_WORKERS = int(os.environ.get("BACKTEST_WORKERS", str(min(4, os.cpu_count() or 1))))
+BACKTEST_TIMEOUT_SECONDS = float(os.environ.get("BACKTEST_TIMEOUT_SECONDS", "60"))
+
+BACKTEST_POOL_IN_FLIGHT = registry.gauge(
+    "stockpulse_backtest_pool_in_flight",
+    "Backtest pool tasks submitted and not yet finished",
+)
+BACKTEST_POOL_QUEUE_DEPTH = registry.gauge(
+    "stockpulse_backtest_pool_queue_depth",
+    "Backtest pool tasks waiting for a free worker",
+)
+BACKTEST_TASK_SECONDS = registry.histogram(
+    "stockpulse_backtest_task_duration_seconds",
+    "Time from submitting a backtest pool task to its result, including queueing",
+    ("task",),
+)
+BACKTEST_RUN_SECONDS = registry.histogram(
+    "stockpulse_backtest_run_duration_seconds",
+    "End-to-end backtest request time by mode (single, walk_forward, batch), excluding aborted runs",
+    ("mode",),
+)
+BACKTEST_ABORTED = registry.counter(
+    "stockpulse_backtest_aborted_total",
+    "Backtest requests abandoned, by mode and reason (timeout, disconnected)",
+    ("mode", "reason"),
+)
+BACKTEST_TIMEOUTS = registry.counter(
+    "stockpulse_backtest_timeouts_total",
+    "Backtest work abandoned at the pool timeout (each one restarts the pool)",
+)
+
+# (shared memory block name, shape, dtype) of an array published to the workers
+SharedArraySpec = Tuple[str, Tuple[int, ...], str]
+
+# Blocks each worker keeps attached, most recently used last
+_MAX_ATTACHED = 8
+_attached: "OrderedDict[str, Tuple[SharedMemory, np.ndarray]]" = OrderedDict()
+
+
+class SharedArray:
+    """
+    A read-only NumPy array published in a shared memory block.
+
+    Use as a context manager around the tasks that read it; the block is
+    unlinked on exit. Tasks receive `spec` and call attach_shared_array.
+    """
+
+    def __init__(self, values):
+        array = np.ascontiguousarray(values)
+        self._shm = SharedMemory(create=True, size=max(1, array.nbytes))
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=self._shm.buf)
+        view[...] = array
+        del view
+        self.spec: SharedArraySpec = (self._shm.name, array.shape, array.dtype.str)
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self) -> "SharedArray":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_shared_array(spec: SharedArraySpec) -> np.ndarray:
+    """Worker side: the array behind spec, attached once per worker and reused"""
+    name, shape, dtype = spec
+    if name in _attached:
+        _attached.move_to_end(name)
+        return _attached[name][1]
+
+    # Spawned workers share the server's resource tracker, so attaching
+    # re-registers a block that is already tracked, and only the publisher unlinks it
+    shm = SharedMemory(name=name)
+    array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    array.flags.writeable = False
+    _attached[name] = (shm, array)
+
+    while len(_attached) > _MAX_ATTACHED:
+        _, (old_shm, old_array) = _attached.popitem(last=False)
+        del old_array
+        try:
+            old_shm.close()
+        except BufferError:
+            # A view of it is still alive; the mapping goes when the worker exits
+            pass
+    return array
+
+
+class BacktestTimeout(TimeoutError):
+    """Backtest work did not finish within the pool's timeout"""
+
+
+class BacktestPool:
+    """
+    Process pool for backtests and parameter sweeps.
+    
+    Workers are spawned on first use (or by start()), so they never inherit
+    the server's threads or event loop, and each keeps its shared-memory
+    attachments between tasks. Work that overruns the timeout cannot be
+    interrupted inside a worker, so the pool is torn down and rebuilt;
+    other tasks in flight at that moment fail with BrokenProcessPool.
+    """
+    
+    def __init__(self, workers: int = BACKTEST_WORKERS, timeout: float = BACKTEST_TIMEOUT_SECONDS):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.in_flight = 0
+        self.tasks = 0
+        self.restarts = 0
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is not None and self._executor._broken:
+            # A worker died (killed, out of memory); replace the whole pool
+            self.restart()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"Started backtest pool with {self.workers} workers")
+        return self._executor
+    
+    def _track(self, delta: int):
+        self.in_flight += delta
+        BACKTEST_POOL_IN_FLIGHT.set(self.in_flight)
+        BACKTEST_POOL_QUEUE_DEPTH.set(max(0, self.in_flight - self.workers))
+    
+    def restart(self):
+        """Stop every worker (stuck ones included) and start afresh on next use"""
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        self.restarts += 1
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def start(self) -> int:
+        """Spawn every worker up front; returns how many answered"""
+        pids = await self.gather([self.submit(os.getpid) for _ in range(self.workers)])
+        return len(set(pids))
+    
+    def submit(self, fn: Callable, *args) -> "asyncio.Future":
+        """
+        Schedule a picklable module-level function.
+        
+        Cancelling the returned future drops the task if no worker has
+        picked it up yet.
+        """
+        self.tasks += 1
+        self._track(1)
+        task = fn.__name__
+        started = time.perf_counter()
+        future = asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        
+        def done(_):
+            self._track(-1)
+            BACKTEST_TASK_SECONDS.observe(time.perf_counter() - started, task=task)
+        
+        future.add_done_callback(done)
+        return future
+    
+    async def gather(self, futures: List["asyncio.Future"], timeout: Optional[float] = None) -> List[Any]:
+        """
+        Results of futures from submit, in order, within timeout seconds.
+        
+        On timeout the pool is restarted and BacktestTimeout raised; on
+        cancellation (or any failure) the futures not yet started are dropped.
+        """
+        timeout = timeout or self.timeout
+        try:
+            return await asyncio.wait_for(asyncio.gather(*futures), timeout)
+        except asyncio.TimeoutError:
+            BACKTEST_TIMEOUTS.inc()
+            self.restart()
+            raise BacktestTimeout(f"Backtest exceeded {timeout:.0f}s")
+        finally:
+            for future in futures:
+                future.cancel()
+    
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """Run one task under the timeout"""
+        return (await self.gather([self.submit(fn, *args)], timeout))[0]
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "timeout_seconds": self.timeout,
+            "started": self._executor is not None,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.workers),
+            "tasks": self.tasks,
+            "restarts": self.restarts,
+        }
+    
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global instance
+backtest_pool = BacktestPool()
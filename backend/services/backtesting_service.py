@@ -6,12 +6,15 @@ Provides backtesting engine with multiple trading strategies
 import logging
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, NamedTuple, Optional, Tuple
 
 from models.backtest_models import (
     BacktestConfig, BacktestResult, Trade, TradeType,
     StrategyType, StrategyInfo
 )
+from services.backtest_pool import BacktestPool
+from services.monte_carlo import monte_carlo_bands
+from services.performance_metrics import performance_metrics, round_trips
 
 logger = logging.getLogger(__name__)
 
@@ -73,55 +76,133 @@ STRATEGIES = {
 }
 
 
+# ==================== Indicator kernels ====================
+# NumPy implementations, O(n) in the series length. Warm-up bars are NaN.
+
+def sma_array(values, period: int) -> np.ndarray:
+    """Simple moving average from a cumulative sum"""
+    x = np.asarray(values, dtype=float)
+    out = np.full(len(x), np.nan)
+    if period < 1 or len(x) < period:
+        return out
+    
+    csum = np.concatenate(([0.0], np.cumsum(x)))
+    out[period - 1:] = (csum[period:] - csum[:-period]) / period
+    return out
+
+
+def rolling_std_array(values, period: int) -> np.ndarray:
+    """Population standard deviation over a rolling window (matches np.std)"""
+    x = np.asarray(values, dtype=float)
+    out = np.full(len(x), np.nan)
+    if period < 1 or len(x) < period:
+        return out
+    
+    # Centre the series first so the sums of squares do not cancel catastrophically
+    d = x - x.mean()
+    s1 = np.concatenate(([0.0], np.cumsum(d)))
+    s2 = np.concatenate(([0.0], np.cumsum(d * d)))
+    mean = (s1[period:] - s1[:-period]) / period
+    var = (s2[period:] - s2[:-period]) / period - mean * mean
+    out[period - 1:] = np.sqrt(np.maximum(var, 0.0))
+    return out
+
+
+def _ema_filter(x: np.ndarray, alpha: float, y0: float) -> np.ndarray:
+    """
+    y[t] = alpha * x[t] + (1 - alpha) * y[t - 1], with y[-1] = y0.
+    
+    Solved in closed form one block at a time: within a block
+    y[k] = beta^(k+1) * y0 + alpha * beta^k * cumsum(x[j] * beta^-j), and the
+    block length keeps beta^-k far from overflow.
+    """
+    beta = 1.0 - alpha
+    if beta <= 0.0:
+        return x.copy()
+    
+    out = np.empty_like(x)
+    block = int(min(1024, max(1, 100 / -np.log10(beta))))
+    k = np.arange(block, dtype=float)
+    growth = beta ** -k
+    decay = beta ** k
+    
+    prev = y0
+    for start in range(0, len(x), block):
+        segment = x[start:start + block]
+        m = len(segment)
+        y = decay[:m] * (alpha * np.cumsum(segment * growth[:m]) + beta * prev)
+        out[start:start + m] = y
+        prev = y[-1]
+    return out
+
+
+def ema_array(values, period: int) -> np.ndarray:
+    """Exponential moving average seeded with the SMA of the first period valid values"""
+    x = np.asarray(values, dtype=float)
+    out = np.full(len(x), np.nan)
+    valid = np.flatnonzero(~np.isnan(x))
+    if period < 1 or len(valid) < period:
+        return out
+    
+    first = valid[0]
+    seed_at = first + period - 1
+    out[seed_at] = x[first:seed_at + 1].mean()
+    out[seed_at + 1:] = _ema_filter(x[seed_at + 1:], 2 / (period + 1), out[seed_at])
+    return out
+
+
+def rsi_array(values, period: int = 14) -> np.ndarray:
+    """RSI from simple rolling averages of gains and losses over the last period changes"""
+    x = np.asarray(values, dtype=float)
+    out = np.full(len(x), np.nan)
+    if period < 1 or len(x) < period + 1:
+        return out
+    
+    change = np.diff(x)
+    avg_gain = sma_array(np.maximum(change, 0.0), period)[period - 1:]
+    avg_loss = sma_array(np.maximum(-change, 0.0), period)[period - 1:]
+    # Count losing bars exactly; a cumulative-sum average can leave 1e-13 where it should be 0
+    losers = np.concatenate(([0], np.cumsum(change < 0)))
+    no_loss = (losers[period:] - losers[:-period]) == 0
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    out[period:] = np.where(no_loss, 100.0, rsi)
+    return out
+
+
+def macd_arrays(values, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line, signal line and histogram"""
+    x = np.asarray(values, dtype=float)
+    macd = ema_array(x, fast) - ema_array(x, slow)
+    signal_line = ema_array(macd, signal)
+    return macd, signal_line, macd - signal_line
+
+
+def bollinger_arrays(values, period: int = 20, std_dev: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bollinger middle, upper and lower bands"""
+    middle = sma_array(values, period)
+    width = std_dev * rolling_std_array(values, period)
+    return middle, middle + width, middle - width
+
+
+def _to_optional_list(values: np.ndarray) -> List[Optional[float]]:
+    return [None if v != v else v for v in values.tolist()]
+
+
 def calculate_sma(prices: List[float], period: int) -> List[Optional[float]]:
     """Calculate Simple Moving Average"""
-    sma = [None] * len(prices)
-    for i in range(period - 1, len(prices)):
-        sma[i] = sum(prices[i - period + 1:i + 1]) / period
-    return sma
+    return _to_optional_list(sma_array(prices, period))
 
 
 def calculate_ema(prices: List[float], period: int) -> List[Optional[float]]:
     """Calculate Exponential Moving Average"""
-    ema = [None] * len(prices)
-    multiplier = 2 / (period + 1)
-    
-    # First EMA is SMA
-    if len(prices) >= period:
-        ema[period - 1] = sum(prices[:period]) / period
-        
-        for i in range(period, len(prices)):
-            ema[i] = (prices[i] * multiplier) + (ema[i - 1] * (1 - multiplier))
-    
-    return ema
+    return _to_optional_list(ema_array(prices, period))
 
 
 def calculate_rsi(prices: List[float], period: int = 14) -> List[Optional[float]]:
     """Calculate Relative Strength Index"""
-    rsi = [None] * len(prices)
-    
-    if len(prices) < period + 1:
-        return rsi
-    
-    gains = []
-    losses = []
-    
-    for i in range(1, len(prices)):
-        change = prices[i] - prices[i - 1]
-        gains.append(max(change, 0))
-        losses.append(abs(min(change, 0)))
-    
-    for i in range(period, len(prices)):
-        avg_gain = sum(gains[i - period:i]) / period
-        avg_loss = sum(losses[i - period:i]) / period
-        
-        if avg_loss == 0:
-            rsi[i] = 100
-        else:
-            rs = avg_gain / avg_loss
-            rsi[i] = 100 - (100 / (1 + rs))
-    
-    return rsi
+    return _to_optional_list(rsi_array(prices, period))
 
 
 def calculate_macd(
@@ -131,33 +212,8 @@ def calculate_macd(
     signal: int = 9
 ) -> Tuple[List[Optional[float]], List[Optional[float]], List[Optional[float]]]:
     """Calculate MACD, Signal, and Histogram"""
-    fast_ema = calculate_ema(prices, fast)
-    slow_ema = calculate_ema(prices, slow)
-    
-    macd = [None] * len(prices)
-    for i in range(len(prices)):
-        if fast_ema[i] is not None and slow_ema[i] is not None:
-            macd[i] = fast_ema[i] - slow_ema[i]
-    
-    # Calculate signal line (EMA of MACD)
-    macd_values = [m for m in macd if m is not None]
-    signal_line = [None] * len(prices)
-    
-    if len(macd_values) >= signal:
-        first_valid = next(i for i, m in enumerate(macd) if m is not None)
-        signal_ema = calculate_ema(macd_values, signal)
-        
-        for i, s in enumerate(signal_ema):
-            if s is not None:
-                signal_line[first_valid + i] = s
-    
-    # Calculate histogram
-    histogram = [None] * len(prices)
-    for i in range(len(prices)):
-        if macd[i] is not None and signal_line[i] is not None:
-            histogram[i] = macd[i] - signal_line[i]
-    
-    return macd, signal_line, histogram
+    macd, signal_line, histogram = macd_arrays(prices, fast, slow, signal)
+    return _to_optional_list(macd), _to_optional_list(signal_line), _to_optional_list(histogram)
 
 
 def calculate_bollinger_bands(
@@ -166,446 +222,390 @@ def calculate_bollinger_bands(
     std_dev: float = 2.0
 ) -> Tuple[List[Optional[float]], List[Optional[float]], List[Optional[float]]]:
     """Calculate Bollinger Bands (middle, upper, lower)"""
-    middle = calculate_sma(prices, period)
-    upper = [None] * len(prices)
-    lower = [None] * len(prices)
-    
-    for i in range(period - 1, len(prices)):
-        std = np.std(prices[i - period + 1:i + 1])
-        if middle[i] is not None:
-            upper[i] = middle[i] + (std_dev * std)
-            lower[i] = middle[i] - (std_dev * std)
-    
-    return middle, upper, lower
-
-
-def run_sma_crossover(
-    prices: List[Dict],
-    short_period: int = 20,
-    long_period: int = 50
-) -> List[Dict[str, Any]]:
-    """Run SMA Crossover strategy"""
-    closes = [p["close"] for p in prices]
-    short_sma = calculate_sma(closes, short_period)
-    long_sma = calculate_sma(closes, long_period)
-    
-    signals = []
-    position = 0  # 0 = no position, 1 = long
-    
-    for i in range(1, len(prices)):
-        if short_sma[i] is None or long_sma[i] is None:
-            continue
-        if short_sma[i - 1] is None or long_sma[i - 1] is None:
-            continue
-        
-        # Buy signal: short crosses above long
-        if short_sma[i - 1] <= long_sma[i - 1] and short_sma[i] > long_sma[i] and position == 0:
-            signals.append({
-                "date": prices[i]["date"],
-                "type": "buy",
-                "price": closes[i],
-                "signal": f"SMA{short_period} crossed above SMA{long_period}"
-            })
-            position = 1
-        
-        # Sell signal: short crosses below long
-        elif short_sma[i - 1] >= long_sma[i - 1] and short_sma[i] < long_sma[i] and position == 1:
-            signals.append({
-                "date": prices[i]["date"],
-                "type": "sell",
-                "price": closes[i],
-                "signal": f"SMA{short_period} crossed below SMA{long_period}"
-            })
-            position = 0
-    
-    return signals
-
-
-def run_rsi_strategy(
-    prices: List[Dict],
-    period: int = 14,
-    oversold: int = 30,
-    overbought: int = 70
-) -> List[Dict[str, Any]]:
-    """Run RSI strategy"""
-    closes = [p["close"] for p in prices]
-    rsi = calculate_rsi(closes, period)
-    
-    signals = []
-    position = 0
-    
-    for i in range(1, len(prices)):
-        if rsi[i] is None or rsi[i - 1] is None:
-            continue
-        
-        # Buy when RSI crosses above oversold
-        if rsi[i - 1] <= oversold and rsi[i] > oversold and position == 0:
-            signals.append({
-                "date": prices[i]["date"],
-                "type": "buy",
-                "price": closes[i],
-                "signal": f"RSI crossed above {oversold} (oversold)"
-            })
-            position = 1
-        
-        # Sell when RSI crosses above overbought
-        elif rsi[i - 1] <= overbought and rsi[i] > overbought and position == 1:
-            signals.append({
-                "date": prices[i]["date"],
-                "type": "sell",
-                "price": closes[i],
-                "signal": f"RSI crossed above {overbought} (overbought)"
-            })
-            position = 0
-    
-    return signals
-
-
-def run_macd_strategy(
-    prices: List[Dict],
-    fast_period: int = 12,
-    slow_period: int = 26,
-    signal_period: int = 9
-) -> List[Dict[str, Any]]:
-    """Run MACD strategy"""
-    closes = [p["close"] for p in prices]
-    macd, signal_line, histogram = calculate_macd(closes, fast_period, slow_period, signal_period)
-    
-    signals = []
-    position = 0
-    
-    for i in range(1, len(prices)):
-        if macd[i] is None or signal_line[i] is None:
-            continue
-        if macd[i - 1] is None or signal_line[i - 1] is None:
-            continue
-        
-        # Buy when MACD crosses above signal
-        if macd[i - 1] <= signal_line[i - 1] and macd[i] > signal_line[i] and position == 0:
-            signals.append({
-                "date": prices[i]["date"],
-                "type": "buy",
-                "price": closes[i],
-                "signal": "MACD crossed above signal line"
-            })
-            position = 1
-        
-        # Sell when MACD crosses below signal
-        elif macd[i - 1] >= signal_line[i - 1] and macd[i] < signal_line[i] and position == 1:
-            signals.append({
-                "date": prices[i]["date"],
-                "type": "sell",
-                "price": closes[i],
-                "signal": "MACD crossed below signal line"
-            })
-            position = 0
-    
-    return signals
+    middle, upper, lower = bollinger_arrays(prices, period, std_dev)
+    return _to_optional_list(middle), _to_optional_list(upper), _to_optional_list(lower)
+
+
+# ==================== Signals ====================
+# Each strategy maps a close-price array to boolean entry and exit arrays and
+# the text recorded on its buy and sell trades.
+
+class StrategySignals(NamedTuple):
+    entries: np.ndarray
+    exits: np.ndarray
+    buy_signal: str
+    sell_signal: str
+
+
+def _crossed_above(a: np.ndarray, b) -> np.ndarray:
+    """Bars where a moves from at or below b to above it (NaN never crosses)"""
+    b = np.broadcast_to(b, a.shape)
+    out = np.zeros(len(a), dtype=bool)
+    out[1:] = (a[:-1] <= b[:-1]) & (a[1:] > b[1:])
+    return out
+
+
+def _crossed_below(a: np.ndarray, b) -> np.ndarray:
+    """Bars where a moves from at or above b to below it (NaN never crosses)"""
+    b = np.broadcast_to(b, a.shape)
+    out = np.zeros(len(a), dtype=bool)
+    out[1:] = (a[:-1] >= b[:-1]) & (a[1:] < b[1:])
+    return out
+
+
+def sma_crossover_signals(closes: np.ndarray, short_period: int = 20, long_period: int = 50) -> StrategySignals:
+    """SMA Crossover: buy when the short SMA crosses above the long SMA, sell on the cross below"""
+    short_sma = sma_array(closes, short_period)
+    long_sma = sma_array(closes, long_period)
+    return StrategySignals(
+        _crossed_above(short_sma, long_sma),
+        _crossed_below(short_sma, long_sma),
+        f"SMA{short_period} crossed above SMA{long_period}",
+        f"SMA{short_period} crossed below SMA{long_period}",
+    )
 
 
-def run_bollinger_strategy(
-    prices: List[Dict],
-    period: int = 20,
-    std_dev: float = 2.0
-) -> List[Dict[str, Any]]:
-    """Run Bollinger Bands strategy"""
-    closes = [p["close"] for p in prices]
-    middle, upper, lower = calculate_bollinger_bands(closes, period, std_dev)
-    
-    signals = []
-    position = 0
-    
-    for i in range(1, len(prices)):
-        if lower[i] is None or upper[i] is None:
-            continue
-        
-        # Buy when price touches lower band
-        if closes[i] <= lower[i] and position == 0:
-            signals.append({
-                "date": prices[i]["date"],
-                "type": "buy",
-                "price": closes[i],
-                "signal": "Price touched lower Bollinger Band"
-            })
-            position = 1
-        
-        # Sell when price touches upper band
-        elif closes[i] >= upper[i] and position == 1:
-            signals.append({
-                "date": prices[i]["date"],
-                "type": "sell",
-                "price": closes[i],
-                "signal": "Price touched upper Bollinger Band"
-            })
-            position = 0
-    
-    return signals
+def rsi_signals(closes: np.ndarray, period: int = 14, oversold: int = 30, overbought: int = 70) -> StrategySignals:
+    """RSI: buy when RSI crosses above oversold, sell when it crosses above overbought"""
+    rsi = rsi_array(closes, period)
+    return StrategySignals(
+        _crossed_above(rsi, oversold),
+        _crossed_above(rsi, overbought),
+        f"RSI crossed above {oversold} (oversold)",
+        f"RSI crossed above {overbought} (overbought)",
+    )
 
 
-def run_momentum_strategy(
-    prices: List[Dict],
-    period: int = 14,
-    threshold: float = 2.0
-) -> List[Dict[str, Any]]:
-    """Run Momentum strategy"""
-    closes = [p["close"] for p in prices]
-    
-    signals = []
-    position = 0
-    
-    for i in range(period, len(prices)):
-        momentum = ((closes[i] - closes[i - period]) / closes[i - period]) * 100
-        prev_momentum = ((closes[i - 1] - closes[i - period - 1]) / closes[i - period - 1]) * 100
-        
-        # Buy when momentum crosses above threshold
-        if prev_momentum <= threshold and momentum > threshold and position == 0:
-            signals.append({
-                "date": prices[i]["date"],
-                "type": "buy",
-                "price": closes[i],
-                "signal": f"Momentum crossed above {threshold}%"
-            })
-            position = 1
-        
-        # Sell when momentum crosses below negative threshold
-        elif prev_momentum >= -threshold and momentum < -threshold and position == 1:
-            signals.append({
-                "date": prices[i]["date"],
-                "type": "sell",
-                "price": closes[i],
-                "signal": f"Momentum crossed below -{threshold}%"
-            })
-            position = 0
-    
-    return signals
+def macd_signals(
+    closes: np.ndarray, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9
+) -> StrategySignals:
+    """MACD: buy when the MACD line crosses above its signal line, sell on the cross below"""
+    macd, signal_line, _ = macd_arrays(closes, fast_period, slow_period, signal_period)
+    return StrategySignals(
+        _crossed_above(macd, signal_line),
+        _crossed_below(macd, signal_line),
+        "MACD crossed above signal line",
+        "MACD crossed below signal line",
+    )
 
 
-def execute_trades(
-    signals: List[Dict],
+def bollinger_signals(closes: np.ndarray, period: int = 20, std_dev: float = 2.0) -> StrategySignals:
+    """Bollinger Bands: buy when price touches the lower band, sell when it touches the upper band"""
+    _, upper, lower = bollinger_arrays(closes, period, std_dev)
+    entries = closes <= lower
+    exits = closes >= upper
+    entries[:1] = exits[:1] = False
+    return StrategySignals(
+        entries, exits,
+        "Price touched lower Bollinger Band",
+        "Price touched upper Bollinger Band",
+    )
+
+
+def momentum_signals(closes: np.ndarray, period: int = 14, threshold: float = 2.0) -> StrategySignals:
+    """Momentum: buy when period-change crosses above threshold %, sell when it crosses below -threshold %"""
+    momentum = np.full(len(closes), np.nan)
+    if len(closes) > period:
+        momentum[period:] = (closes[period:] - closes[:-period]) / closes[:-period] * 100
+    return StrategySignals(
+        _crossed_above(momentum, threshold),
+        _crossed_below(momentum, -threshold),
+        f"Momentum crossed above {threshold}%",
+        f"Momentum crossed below -{threshold}%",
+    )
+
+
+STRATEGY_SIGNALS = {
+    StrategyType.SMA_CROSSOVER: sma_crossover_signals,
+    StrategyType.RSI: rsi_signals,
+    StrategyType.MACD: macd_signals,
+    StrategyType.BOLLINGER_BANDS: bollinger_signals,
+    StrategyType.MOMENTUM: momentum_signals,
+}
+
+
+# ==================== Simulation ====================
+
+class SimulationResult(NamedTuple):
+    """Equity per bar and executed trades as parallel arrays"""
+    equity: np.ndarray
+    trade_bars: np.ndarray
+    trade_is_buy: np.ndarray
+    trade_prices: np.ndarray
+    trade_quantities: np.ndarray
+    trade_values: np.ndarray
+    trade_portfolio_values: np.ndarray
+
+
+def position_changes(entries: np.ndarray, exits: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bars where the strategy opens and closes its single long position.
+    
+    Returns (bars, is_buy): signals alternate starting with a buy. When entries
+    and exits never coincide, the position after any signal bar is simply
+    "long if it was an entry", so redundant signals are dropped in one pass.
+    """
+    both = entries & exits
+    bars = np.flatnonzero(entries | exits)
+    if not both.any():
+        is_buy = entries[bars]
+        previous = np.concatenate(([False], is_buy[:-1]))
+        keep = is_buy != previous
+        return bars[keep], is_buy[keep]
+    
+    # A bar that is both an entry and an exit flips whatever the position is
+    kept, kinds, long = [], [], False
+    for bar in bars.tolist():
+        if not long and entries[bar]:
+            kept.append(bar)
+            kinds.append(True)
+            long = True
+        elif long and exits[bar]:
+            kept.append(bar)
+            kinds.append(False)
+            long = False
+    return np.array(kept, dtype=int), np.array(kinds, dtype=bool)
+
+
+def simulate_positions(
+    closes: np.ndarray,
+    entries: np.ndarray,
+    exits: np.ndarray,
     initial_capital: float,
-    prices: List[Dict]
-) -> Tuple[List[Trade], List[Dict[str, Any]]]:
-    """Execute trades based on signals and calculate results"""
-    trades = []
-    equity_curve = []
-    
-    cash = initial_capital
-    position = 0
-    shares = 0
-    
-    price_lookup = {p["date"]: p["close"] for p in prices}
-    
-    for signal in signals:
-        price = signal["price"]
-        
-        if signal["type"] == "buy" and position == 0:
-            # Buy with all cash
-            shares = int(cash / price)
-            if shares > 0:
-                cost = shares * price
-                cash -= cost
-                position = 1
-                
-                portfolio_value = cash + (shares * price)
-                trades.append(Trade(
-                    date=signal["date"],
-                    type=TradeType.BUY,
-                    price=price,
-                    quantity=shares,
-                    value=cost,
-                    signal=signal["signal"],
-                    portfolio_value=portfolio_value
-                ))
-        
-        elif signal["type"] == "sell" and position == 1:
-            # Sell all shares
+) -> SimulationResult:
+    """
+    All-in long-only execution at the signal bar's close.
+    
+    Buys as many whole shares as cash allows (a buy that affords none is
+    skipped, and so is the sell that would close it), and marks the
+    portfolio to market on every bar.
+    """
+    bars, is_buy = position_changes(entries, exits)
+    
+    trade_bars, trade_is_buy, quantities, values, portfolio_values = [], [], [], [], []
+    cash, shares = float(initial_capital), 0
+    for bar, buy, price in zip(bars.tolist(), is_buy.tolist(), closes[bars].tolist()):
+        if buy and shares == 0:
+            quantity = int(cash / price)
+            if quantity == 0:
+                continue
+            cost = quantity * price
+            cash -= cost
+            shares = quantity
+            trade_bars.append(bar)
+            trade_is_buy.append(True)
+            quantities.append(quantity)
+            values.append(cost)
+            portfolio_values.append(cash + cost)
+        elif not buy and shares > 0:
             proceeds = shares * price
             cash += proceeds
-            position = 0
-            
-            portfolio_value = cash
-            trades.append(Trade(
-                date=signal["date"],
-                type=TradeType.SELL,
-                price=price,
-                quantity=shares,
-                value=proceeds,
-                signal=signal["signal"],
-                portfolio_value=portfolio_value
-            ))
+            trade_bars.append(bar)
+            trade_is_buy.append(False)
+            quantities.append(shares)
+            values.append(proceeds)
+            portfolio_values.append(cash)
             shares = 0
     
-    # Build equity curve
-    for p in prices:
-        current_price = p["close"]
-        if position == 1:
-            value = cash + (shares * current_price)
-        else:
-            value = cash
-        
-        equity_curve.append({
-            "date": p["date"],
-            "value": round(value, 2),
-            "price": current_price
-        })
+    trade_bars = np.array(trade_bars, dtype=int)
+    trade_is_buy = np.array(trade_is_buy, dtype=bool)
+    quantities = np.array(quantities, dtype=int)
+    values = np.array(values, dtype=float)
+    
+    # Cash and holdings are step functions that change only on trade bars
+    cash_flows = np.where(trade_is_buy, -values, values)
+    cash_levels = float(initial_capital) + np.concatenate(([0.0], np.cumsum(cash_flows)))
+    share_levels = np.concatenate(([0], np.where(trade_is_buy, quantities, 0)))
+    segment = np.searchsorted(trade_bars, np.arange(len(closes)), side="right")
+    equity = cash_levels[segment] + share_levels[segment] * closes
+    
+    return SimulationResult(
+        equity=equity,
+        trade_bars=trade_bars,
+        trade_is_buy=trade_is_buy,
+        trade_prices=closes[trade_bars],
+        trade_quantities=quantities,
+        trade_values=values,
+        trade_portfolio_values=np.array(portfolio_values, dtype=float),
+    )
+
+
+def build_trades(
+    sim: SimulationResult, signals: StrategySignals, dates: List[str]
+) -> List[Trade]:
+    """Trade models for the response, created once per executed trade"""
+    return [
+        Trade(
+            date=dates[bar],
+            type=TradeType.BUY if buy else TradeType.SELL,
+            price=price,
+            quantity=quantity,
+            value=value,
+            signal=signals.buy_signal if buy else signals.sell_signal,
+            portfolio_value=portfolio_value,
+        )
+        for bar, buy, price, quantity, value, portfolio_value in zip(
+            sim.trade_bars.tolist(), sim.trade_is_buy.tolist(), sim.trade_prices.tolist(),
+            sim.trade_quantities.tolist(), sim.trade_values.tolist(), sim.trade_portfolio_values.tolist(),
+        )
+    ]
+
+
+def simulation_metrics(sim: SimulationResult, initial_capital: float) -> Dict[str, Any]:
+    """Performance metrics of a simulated run, from its equity and trade arrays"""
+    return performance_metrics(
+        sim.equity, sim.trade_bars, sim.trade_is_buy, sim.trade_quantities, sim.trade_values, initial_capital
+    )
+
+
+def simulation_bands(sim: SimulationResult, config: BacktestConfig) -> Dict[str, Any]:
+    """
+    Monte Carlo percentile bands of a simulated run, per config.monte_carlo.
     
-    return trades, equity_curve
+    Up to a second of CPU for the largest configurations: only call it from
+    pool tasks (backtest_result, stitch_walk_forward), never on the event loop.
+    """
+    trips = round_trips(sim.trade_bars, sim.trade_is_buy, sim.trade_quantities, sim.trade_values)
+    return monte_carlo_bands(config.monte_carlo, sim.equity, trips.returns, config.initial_capital)
 
 
-def calculate_metrics(
+def build_result(
+    config: BacktestConfig,
+    params: Dict[str, Any],
+    sim: SimulationResult,
     trades: List[Trade],
-    equity_curve: List[Dict],
-    initial_capital: float,
-    trading_days: int
-) -> Dict[str, Any]:
-    """Calculate performance metrics"""
-    if not trades:
-        return {
-            "total_return": 0,
-            "total_return_percent": 0,
-            "annualized_return": 0,
-            "max_drawdown": 0,
-            "sharpe_ratio": 0,
-            "volatility": 0,
-            "total_trades": 0,
-            "winning_trades": 0,
-            "losing_trades": 0,
-            "win_rate": 0,
-            "avg_win": 0,
-            "avg_loss": 0,
-            "profit_factor": 0,
-        }
-    
-    final_value = equity_curve[-1]["value"]
-    total_return = final_value - initial_capital
-    total_return_percent = (total_return / initial_capital) * 100
-    
-    # Annualized return
-    years = trading_days / 252
-    if years > 0 and final_value > 0:
-        annualized_return = ((final_value / initial_capital) ** (1 / years) - 1) * 100
-    else:
-        annualized_return = 0
-    
-    # Max drawdown
-    peak = initial_capital
-    max_drawdown = 0
-    for point in equity_curve:
-        if point["value"] > peak:
-            peak = point["value"]
-        drawdown = (peak - point["value"]) / peak * 100
-        max_drawdown = max(max_drawdown, drawdown)
-    
-    # Daily returns for volatility and Sharpe
-    daily_returns = []
-    for i in range(1, len(equity_curve)):
-        prev_val = equity_curve[i - 1]["value"]
-        curr_val = equity_curve[i]["value"]
-        if prev_val > 0:
-            daily_returns.append((curr_val - prev_val) / prev_val)
-    
-    if daily_returns:
-        volatility = np.std(daily_returns) * np.sqrt(252) * 100
-        avg_return = np.mean(daily_returns) * 252
-        sharpe_ratio = avg_return / (volatility / 100) if volatility > 0 else 0
-    else:
-        volatility = 0
-        sharpe_ratio = 0
+    dates: List[str],
+    closes: np.ndarray,
+    **extra
+) -> BacktestResult:
+    """Response model for a simulated run and its trades"""
+    strategy_info = STRATEGIES[config.strategy]
+    equity_curve = [
+        {"date": date, "value": round(value, 2), "price": price}
+        for date, value, price in zip(dates, sim.equity.tolist(), closes.tolist())
+    ]
     
-    # Trade statistics
-    wins = []
-    losses = []
+    return BacktestResult(
+        symbol=config.symbol.upper(),
+        strategy=config.strategy,
+        strategy_name=strategy_info.name,
+        parameters=params,
+        initial_capital=config.initial_capital,
+        final_value=equity_curve[-1]["value"] if equity_curve else config.initial_capital,
+        trades=trades,
+        equity_curve=equity_curve,
+        start_date=dates[0] if dates else "",
+        end_date=dates[-1] if dates else "",
+        trading_days=len(dates),
+        **simulation_metrics(sim, config.initial_capital),
+        monte_carlo=simulation_bands(sim, config) if config.monte_carlo else None,
+        **extra
+    )
+
+
+def normalize_parameters(strategy: StrategyType, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Defaults merged with params, cast to each parameter's declared type and sorted by name"""
+    strategy_info = STRATEGIES[strategy]
+    types = {spec["name"]: spec["type"] for spec in strategy_info.parameters}
+    merged = {**strategy_info.default_params, **params}
+    for name, value in merged.items():
+        if types.get(name) == "int":
+            merged[name] = int(value)
+        elif types.get(name) == "float":
+            merged[name] = float(value)
+    return dict(sorted(merged.items()))
+
+
+def _parse_date(value: str, field: str) -> str:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"{field} must be a date in YYYY-MM-DD format, got {value!r}")
+
+
+def select_date_range(
+    price_history: List[Dict],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> List[Dict]:
+    """Bars dated within [start_date, end_date] (either bound optional, both inclusive)"""
+    if start_date is None and end_date is None:
+        return price_history
+    start = _parse_date(start_date, "start_date") if start_date else None
+    end = _parse_date(end_date, "end_date") if end_date else None
+    if start and end and start > end:
+        raise ValueError("start_date must not be after end_date")
+    
+    selected = [
+        bar for bar in price_history
+        if (start is None or bar["date"][:10] >= start) and (end is None or bar["date"][:10] <= end)
+    ]
+    if not selected:
+        raise ValueError(f"No price data between {start or 'the start'} and {end or 'the end'}")
+    return selected
+
+
+def backtest_result(config: BacktestConfig, price_history: List[Dict]) -> BacktestResult:
+    """Single backtest with fixed parameters; CPU-bound, with no awaits"""
+    price_history = select_date_range(price_history, config.start_date, config.end_date)
     
-    for i in range(0, len(trades) - 1, 2):
-        if i + 1 < len(trades):
-            buy_trade = trades[i]
-            sell_trade = trades[i + 1]
-            
-            if buy_trade.type == TradeType.BUY and sell_trade.type == TradeType.SELL:
-                pnl = sell_trade.value - buy_trade.value
-                if pnl > 0:
-                    wins.append(pnl)
-                else:
-                    losses.append(abs(pnl))
+    # Merge default params with provided params
+    params = normalize_parameters(config.strategy, config.parameters)
     
-    total_trades = len(wins) + len(losses)
-    winning_trades = len(wins)
-    losing_trades = len(losses)
-    win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-    avg_win = np.mean(wins) if wins else 0
-    avg_loss = np.mean(losses) if losses else 0
-    profit_factor = sum(wins) / sum(losses) if losses and sum(losses) > 0 else 0
+    # Generate signals and simulate positions over the close-price array
+    closes = np.array([p["close"] for p in price_history], dtype=float)
+    signals = STRATEGY_SIGNALS[config.strategy](closes, **params)
+    sim = simulate_positions(closes, signals.entries, signals.exits, config.initial_capital)
     
-    return {
-        "total_return": round(total_return, 2),
-        "total_return_percent": round(total_return_percent, 2),
-        "annualized_return": round(annualized_return, 2),
-        "max_drawdown": round(max_drawdown, 2),
-        "sharpe_ratio": round(sharpe_ratio, 2),
-        "volatility": round(volatility, 2),
-        "total_trades": total_trades,
-        "winning_trades": winning_trades,
-        "losing_trades": losing_trades,
-        "win_rate": round(win_rate, 2),
-        "avg_win": round(avg_win, 2),
-        "avg_loss": round(avg_loss, 2),
-        "profit_factor": round(profit_factor, 2),
-    }
+    dates = [p["date"] for p in price_history]
+    trades = build_trades(sim, signals, dates)
+    return build_result(config, params, sim, trades, dates, closes)
 
 
 async def run_backtest(
     config: BacktestConfig,
-    price_history: List[Dict]
+    price_history: List[Dict],
+    pool: Optional[BacktestPool] = None
 ) -> BacktestResult:
-    """Run a complete backtest"""
+    """Run a complete backtest over the bars within the config's date range"""
     
     # Get strategy info
     strategy_info = STRATEGIES.get(config.strategy)
     if not strategy_info:
         raise ValueError(f"Unknown strategy: {config.strategy}")
     
-    # Merge default params with provided params
-    params = {**strategy_info.default_params, **config.parameters}
-    
-    # Run strategy
-    if config.strategy == StrategyType.SMA_CROSSOVER:
-        signals = run_sma_crossover(price_history, **params)
-    elif config.strategy == StrategyType.RSI:
-        signals = run_rsi_strategy(price_history, **params)
-    elif config.strategy == StrategyType.MACD:
-        signals = run_macd_strategy(price_history, **params)
-    elif config.strategy == StrategyType.BOLLINGER_BANDS:
-        signals = run_bollinger_strategy(price_history, **params)
-    elif config.strategy == StrategyType.MOMENTUM:
-        signals = run_momentum_strategy(price_history, **params)
-    else:
-        signals = []
-    
-    # Execute trades
-    trades, equity_curve = execute_trades(signals, config.initial_capital, price_history)
+    if config.walk_forward is not None:
+        # Imported here: walk-forward builds on the optimizer, which imports this module
+        from services.walk_forward import run_walk_forward
+        price_history = select_date_range(price_history, config.start_date, config.end_date)
+        return await run_walk_forward(config, price_history, pool=pool)
     
-    # Calculate metrics
-    metrics = calculate_metrics(
-        trades, 
-        equity_curve, 
-        config.initial_capital,
-        len(price_history)
-    )
-    
-    return BacktestResult(
-        symbol=config.symbol.upper(),
-        strategy=config.strategy,
-        strategy_name=strategy_info.name,
-        parameters=params,
-        initial_capital=config.initial_capital,
-        final_value=equity_curve[-1]["value"] if equity_curve else config.initial_capital,
-        trades=[t for t in trades],
-        equity_curve=equity_curve,
-        start_date=price_history[0]["date"] if price_history else "",
-        end_date=price_history[-1]["date"] if price_history else "",
-        trading_days=len(price_history),
-        **metrics
-    )
+    return backtest_result(config, price_history)
+
+
+def execute_backtest(config_data: Dict[str, Any], price_history: List[Dict]) -> Dict[str, Any]:
+    """Worker entry point: a fixed-parameter backtest as a JSON-ready dict"""
+    return backtest_result(BacktestConfig(**config_data), price_history).model_dump(mode="json")
+
+
+async def run_backtest_in_pool(
+    config: BacktestConfig,
+    price_history: List[Dict],
+    pool: BacktestPool
+) -> Dict[str, Any]:
+    """
+    Backtest without blocking the event loop, as a JSON-ready dict.
+    
+    A fixed-parameter run is one pool task; walk-forward runs fan their
+    window optimization out over the pool, then stitch the result in one
+    more pool task. Either raises BacktestTimeout past the pool's timeout.
+    """
+    if config.walk_forward is not None:
+        # Imported here for the same reason as in run_backtest
+        from services.walk_forward import run_walk_forward_in_pool
+        price_history = select_date_range(price_history, config.start_date, config.end_date)
+        return await run_walk_forward_in_pool(config, price_history, pool)
+    return await pool.run(execute_backtest, config.model_dump(mode="json"), price_history)
 
 
 def get_available_strategies() -> List[StrategyInfo]:
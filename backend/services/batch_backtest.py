@@ -0,0 +1,166 @@
+"""
+Batch Backtest Service for StockPulse
+Runs one strategy configuration across a list of symbols or a sector on the
+backtest worker pool, with per-symbol metrics, an equally weighted
+portfolio curve and cross-sectional statistics
+"""
+
+import logging
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models.backtest_models import BatchBacktestConfig, StrategyType
+from services.backtest_pool import BacktestPool, SharedArray, SharedArraySpec, attach_shared_array, backtest_pool
+from services.backtesting_service import (
+    STRATEGIES, STRATEGY_SIGNALS, normalize_parameters, simulate_positions, simulation_metrics,
+)
+from services.performance_metrics import equity_metrics
+
+logger = logging.getLogger(__name__)
+
+BACKTEST_BATCH_MAX_SYMBOLS = int(os.environ.get("BACKTEST_BATCH_MAX_SYMBOLS", "100"))
+
+# Per-symbol metrics summarized across the universe
+CROSS_SECTION_METRICS = (
+    "total_return_percent", "sharpe_ratio", "sortino_ratio", "max_drawdown", "exposure_percent", "total_trades",
+)
+
+# (symbol, start, end) of one symbol's closes in the concatenated array
+Segment = Tuple[str, int, int]
+
+
+def backtest_segments(
+    closes_spec: SharedArraySpec,
+    segments: List[Segment],
+    strategy: str,
+    params: Dict[str, Any],
+    capital: float,
+) -> List[Dict[str, Any]]:
+    """Worker entry point: backtest each symbol's slice of the shared close-price array"""
+    all_closes = attach_shared_array(closes_spec)
+    signal_fn = STRATEGY_SIGNALS[StrategyType(strategy)]
+    rows = []
+    for symbol, start, end in segments:
+        closes = all_closes[start:end]
+        signals = signal_fn(closes, **params)
+        sim = simulate_positions(closes, signals.entries, signals.exits, capital)
+        rows.append({
+            "symbol": symbol,
+            "final_value": round(float(sim.equity[-1]), 2),
+            **simulation_metrics(sim, capital),
+            "equity": sim.equity,
+        })
+    return rows
+
+
+def equal_weight_curve(
+    dates: Dict[str, List[str]], equity: Dict[str, np.ndarray], allocation: float
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Sum of the per-symbol equity curves over the union of their dates.
+
+    A symbol holds its allocation in cash before its first bar and carries
+    its last value across dates it did not trade.
+    """
+    all_dates = sorted(set().union(*dates.values()))
+    axis = np.array(all_dates)
+    total = np.zeros(len(axis))
+    for symbol, values in equity.items():
+        position = np.searchsorted(np.array(dates[symbol]), axis, side="right") - 1
+        total += np.where(position >= 0, values[np.maximum(position, 0)], allocation)
+    return all_dates, total
+
+
+def cross_sectional_stats(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Distribution of each metric across symbols, plus the best and worst performers"""
+    stats: Dict[str, Any] = {}
+    for metric in CROSS_SECTION_METRICS:
+        values = np.array([row[metric] for row in rows], dtype=float)
+        p25, median, p75 = np.percentile(values, [25, 50, 75])
+        stats[metric] = {
+            "mean": round(float(values.mean()), 2),
+            "median": round(float(median), 2),
+            "std": round(float(values.std()), 2),
+            "min": round(float(values.min()), 2),
+            "p25": round(float(p25), 2),
+            "p75": round(float(p75), 2),
+            "max": round(float(values.max()), 2),
+        }
+    by_return = sorted(rows, key=lambda row: row["total_return_percent"])
+    stats["positive_return_percent"] = round(
+        sum(1 for row in rows if row["total_return_percent"] > 0) / len(rows) * 100, 2
+    )
+    stats["best"] = {"symbol": by_return[-1]["symbol"], "total_return_percent": by_return[-1]["total_return_percent"]}
+    stats["worst"] = {"symbol": by_return[0]["symbol"], "total_return_percent": by_return[0]["total_return_percent"]}
+    return stats
+
+
+async def run_batch_backtest(
+    config: BatchBacktestConfig,
+    histories: Dict[str, List[Dict]],
+    pool: Optional[BacktestPool] = None,
+) -> Dict[str, Any]:
+    """
+    Backtest config.strategy on every symbol in histories.
+
+    Capital is split equally, so each symbol trades initial_capital / N on
+    its own. Every close series goes into one shared memory block, and the
+    symbols are spread over the pool in a few chunks. Symbols with no price
+    history are left out and listed under "skipped".
+    """
+    pool = pool or backtest_pool
+    strategy_info = STRATEGIES[config.strategy]
+    params = normalize_parameters(config.strategy, config.parameters)
+    symbols = [symbol for symbol, history in histories.items() if history]
+    skipped = [symbol for symbol, history in histories.items() if not history]
+    if not symbols:
+        raise ValueError("No price history for any requested symbol")
+    allocation = config.initial_capital / len(symbols)
+    start = time.perf_counter()
+
+    segments, offset = [], 0
+    for symbol in symbols:
+        segments.append((symbol, offset, offset + len(histories[symbol])))
+        offset += len(histories[symbol])
+    closes = np.array([bar["close"] for symbol in symbols for bar in histories[symbol]], dtype=float)
+
+    chunk_size = max(1, math.ceil(len(segments) / (pool.workers * 2)))
+    with SharedArray(closes) as shared:
+        futures = [
+            pool.submit(
+                backtest_segments, shared.spec, segments[i:i + chunk_size],
+                config.strategy.value, params, allocation,
+            )
+            for i in range(0, len(segments), chunk_size)
+        ]
+        chunks = await pool.gather(futures)
+    rows = [row for chunk in chunks for row in chunk]
+
+    equity = {row["symbol"]: row.pop("equity") for row in rows}
+    dates = {symbol: [bar["date"] for bar in histories[symbol]] for symbol in symbols}
+    curve_dates, curve = equal_weight_curve(dates, equity, allocation)
+
+    logger.info(f"Batch backtest of {config.strategy.value} on {len(symbols)} symbols in {time.perf_counter() - start:.2f}s")
+    return {
+        "strategy": config.strategy.value,
+        "strategy_name": strategy_info.name,
+        "parameters": params,
+        "initial_capital": config.initial_capital,
+        "allocation_per_symbol": round(allocation, 2),
+        "symbols": sorted(rows, key=lambda row: row["total_return_percent"], reverse=True),
+        "portfolio": {
+            "final_value": round(float(curve[-1]), 2),
+            **equity_metrics(curve, config.initial_capital),
+            "start_date": curve_dates[0],
+            "end_date": curve_dates[-1],
+            "equity_curve": [
+                {"date": date, "value": round(value, 2)} for date, value in zip(curve_dates, curve.tolist())
+            ],
+        },
+        "cross_section": cross_sectional_stats(rows),
+        "skipped": skipped,
+    }
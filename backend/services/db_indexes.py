@@ -0,0 +1,101 @@
+"""
+Database Index Bootstrapper for StockPulse
+Declares the MongoDB indexes for every collection the API touches and
+creates them idempotently on startup
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Tuple
+
+from pymongo.errors import ConnectionFailure
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the startup bootstrap; motor waits up to 30s for an unreachable server
+INDEX_BOOTSTRAP_TIMEOUT_SECONDS = float(os.environ.get("INDEX_BOOTSTRAP_TIMEOUT_SECONDS", "5"))
+
+# Index declarations for collections owned by the API: collection -> [(keys, options)]
+# Keys follow pymongo's create_index format; options are passed through verbatim.
+# The data extraction collections (stock_data, price_history, ...) are declared
+# by MongoDBStore.ensure_indexes and bootstrapped alongside these.
+INDEX_SPECS: Dict[str, List[Tuple[List[Tuple[str, int]], Dict[str, Any]]]] = {
+    # server.py: find_one / delete_one / update_one by symbol
+    "watchlist": [
+        ([("symbol", 1)], {"name": "symbol_unique", "unique": True}),
+    ],
+    # server.py: find_one / delete_one / update_one by symbol
+    "portfolio": [
+        ([("symbol", 1)], {"name": "symbol_unique", "unique": True}),
+    ],
+    # AlertsService: lookups by id, filtering by status and/or symbol
+    "alerts": [
+        ([("id", 1)], {"name": "id_unique", "unique": True}),
+        ([("status", 1), ("symbol", 1)], {"name": "status_symbol"}),
+        ([("symbol", 1)], {"name": "symbol"}),
+    ],
+}
+
+
+def register_indexes(collection: str, specs: List[Tuple[List[Tuple[str, int]], Dict[str, Any]]]):
+    """Register additional index declarations for a collection"""
+    INDEX_SPECS.setdefault(collection, []).extend(specs)
+
+
+async def ensure_indexes(db) -> Dict[str, List[str]]:
+    """
+    Create all declared indexes.
+
+    create_index is a no-op when an identical index already exists, so this is
+    safe to run on every startup. A spec that conflicts with existing data or an
+    existing index (e.g. duplicate symbols under a unique index) is logged and
+    skipped so the API can still start. If the server is unreachable the
+    bootstrap is abandoned after the first failure.
+
+    Returns:
+        Mapping of API collection name to the index names that are in place
+    """
+    created: Dict[str, List[str]] = {}
+
+    for collection_name, specs in INDEX_SPECS.items():
+        collection = db[collection_name]
+        for keys, options in specs:
+            try:
+                name = await collection.create_index(keys, **options)
+                created.setdefault(collection_name, []).append(name)
+            except ConnectionFailure as e:
+                logger.error(f"MongoDB unreachable, skipping index bootstrap: {e}")
+                return created
+            except Exception as e:
+                logger.warning(
+                    f"Could not create index {options.get('name', keys)} on {collection_name}: {e}"
+                )
+
+    # Data extraction collections
+    try:
+        from data_extraction.storage.mongodb_store import MongoDBStore
+        await MongoDBStore(db).ensure_indexes()
+    except ImportError as e:
+        logger.warning(f"Data extraction store not available, skipping its indexes: {e}")
+    except Exception as e:
+        logger.warning(f"Could not create data extraction indexes: {e}")
+
+    total = sum(len(names) for names in created.values())
+    logger.info(f"Ensured {total} indexes across {len(created)} collections")
+    return created
+
+
+async def bootstrap_indexes(db, timeout: float = None) -> Dict[str, List[str]]:
+    """
+    ensure_indexes bounded by timeout (default INDEX_BOOTSTRAP_TIMEOUT_SECONDS).
+
+    Past the timeout the failure is logged and startup continues without the
+    indexes; they are created on the next start with the database reachable.
+    """
+    timeout = INDEX_BOOTSTRAP_TIMEOUT_SECONDS if timeout is None else timeout
+    try:
+        return await asyncio.wait_for(ensure_indexes(db), timeout)
+    except asyncio.TimeoutError:
+        logger.error(f"Index bootstrap timed out after {timeout:.1f}s (MongoDB unreachable?), continuing without it")
+        return {}
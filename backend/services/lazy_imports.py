@@ -0,0 +1,36 @@
+"""
+Lazy Import Helpers for StockPulse
+Availability checks for optional dependencies that do not import them, so
+heavy integrations are only loaded when a request first needs them
+"""
+
+import importlib.util
+from functools import lru_cache
+
+# Optional integrations deferred until first use; server import must not load these
+HEAVY_MODULES = (
+    "yfinance",
+    "pandas",
+    "reportlab",
+    "aiohttp",
+    "emergentintegrations",
+    "data_extraction.pipeline.orchestrator",
+    "services.pdf_service",
+)
+
+
+@lru_cache(maxsize=None)
+def is_installed(*modules: str) -> bool:
+    """
+    Check that every named module can be imported, without importing it.
+
+    Only locates the module spec (a filesystem lookup); a dotted name imports
+    its parent packages, which should therefore stay lightweight.
+    """
+    for name in modules:
+        try:
+            if importlib.util.find_spec(name) is None:
+                return False
+        except (ImportError, ValueError):
+            return False
+    return True
@@ -0,0 +1,201 @@
+"""
+LLM Response Cache for StockPulse
+Content-addressed cache for LLM completions keyed by a hash of (provider,
+model, system message, prompt), with a shared in-memory tier, a persistent
+MongoDB tier and single-flight deduplication of identical concurrent calls
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from services.db_indexes import register_indexes
+from services.metrics import registry
+from services.state_backend import fetch_shared, get_state_backend
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_SECONDS = int(os.environ.get("LLM_CACHE_TTL_SECONDS", "1800"))
+# Upper bound on a persistent-tier read or write, so a slow database never stalls a request
+PERSISTENT_TIER_TIMEOUT_SECONDS = 2.0
+# Upper bound on one upstream completion; the shared-fetch lock outlives it so
+# other workers keep waiting for the call instead of starting a duplicate
+LLM_TIMEOUT_SECONDS = float(os.environ.get("LLM_TIMEOUT_SECONDS", "60"))
+LLM_LOCK_MARGIN_SECONDS = 10.0
+COLLECTION_NAME = "llm_cache"
+
+LLM_CACHE_LOOKUPS = registry.counter(
+    "stockpulse_llm_cache_lookups_total",
+    "LLM cache lookups by operation and result (memory, persistent, coalesced, miss)",
+    ("operation", "result"),
+)
+LLM_CALL_SECONDS = registry.histogram(
+    "stockpulse_llm_call_duration_seconds",
+    "Latency of upstream LLM completions",
+    ("operation",),
+)
+
+register_indexes(COLLECTION_NAME, [
+    ([("created_at", 1)], {"name": "created_at_ttl", "expireAfterSeconds": LLM_CACHE_TTL_SECONDS}),
+])
+
+
+def cache_key(provider: str, model: str, system_message: str, prompt: str) -> str:
+    """Content address of one completion request"""
+    payload = json.dumps([provider, model, system_message, prompt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Two-tier completion cache.
+
+    The memory tier lives in the shared state backend (so it is shared by all
+    workers when that is Redis); the persistent tier is a MongoDB collection
+    with a TTL index and survives restarts. Only successful completions are
+    stored; callers raise on failure so errors are never cached.
+    """
+
+    def __init__(self, ttl_seconds: int = LLM_CACHE_TTL_SECONDS):
+        self.ttl = ttl_seconds
+        self.collection = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def attach_db(self, db):
+        """Enable the persistent tier"""
+        self.collection = db[COLLECTION_NAME]
+
+    @staticmethod
+    def _memory_key(key: str) -> str:
+        return f"llm:{key}"
+
+    async def _persistent_get(self, key: str) -> Optional[str]:
+        if self.collection is None:
+            return None
+        try:
+            doc = await asyncio.wait_for(
+                self.collection.find_one({
+                    "_id": key,
+                    # The TTL monitor only sweeps once a minute
+                    "created_at": {"$gt": datetime.utcnow() - timedelta(seconds=self.ttl)},
+                }),
+                PERSISTENT_TIER_TIMEOUT_SECONDS,
+            )
+        except Exception as e:
+            logger.warning(f"LLM cache persistent read failed: {e}")
+            return None
+        return doc["response"] if doc else None
+
+    async def _persistent_put(self, key: str, response: str, metadata: Dict):
+        if self.collection is None:
+            return
+        try:
+            await asyncio.wait_for(
+                self.collection.replace_one(
+                    {"_id": key},
+                    {"response": response, "created_at": datetime.utcnow(), **metadata},
+                    upsert=True,
+                ),
+                PERSISTENT_TIER_TIMEOUT_SECONDS,
+            )
+        except Exception as e:
+            logger.warning(f"LLM cache persistent write failed: {e}")
+
+    async def get(self, key: str, operation: str = "completion") -> Optional[str]:
+        """Cached response from either tier, recording the lookup result"""
+        response = await get_state_backend().get(self._memory_key(key))
+        if response is not None:
+            LLM_CACHE_LOOKUPS.inc(operation=operation, result="memory")
+            return response
+
+        response = await self._persistent_get(key)
+        if response is not None:
+            LLM_CACHE_LOOKUPS.inc(operation=operation, result="persistent")
+            await get_state_backend().set(self._memory_key(key), response, ttl=self.ttl)
+            return response
+
+        return None
+
+    async def put(self, key: str, response: str, metadata: Optional[Dict] = None):
+        """Store a completed response in both tiers"""
+        await get_state_backend().set(self._memory_key(key), response, ttl=self.ttl)
+        await self._persistent_put(key, response, metadata or {})
+
+    def inflight(self, key: str) -> Optional[asyncio.Task]:
+        """The in-process call currently generating key, if any"""
+        return self._inflight.get(key)
+
+    async def get_or_generate(
+        self,
+        key: str,
+        generate: Callable[[], Awaitable[str]],
+        operation: str = "completion",
+        metadata: Optional[Dict] = None,
+    ) -> str:
+        """
+        Cached response for key, or run generate once and cache its result.
+
+        Concurrent callers in this process share one in-flight call; callers
+        in other workers wait for it through the shared state backend.
+        """
+        if not LLM_CACHE_ENABLED:
+            return await self._timed(generate, operation)
+
+        response = await self.get(key, operation)
+        if response is not None:
+            return response
+
+        task = self._inflight.get(key)
+        if task is not None:
+            LLM_CACHE_LOOKUPS.inc(operation=operation, result="coalesced")
+            return await asyncio.shield(task)
+
+        LLM_CACHE_LOOKUPS.inc(operation=operation, result="miss")
+
+        async def generate_and_persist():
+            result = await self._timed(generate, operation)
+            await self._persistent_put(key, result, metadata or {})
+            return result
+
+        task = asyncio.ensure_future(
+            fetch_shared(
+                self._memory_key(key),
+                self.ttl,
+                generate_and_persist,
+                lock_timeout=LLM_TIMEOUT_SECONDS + LLM_LOCK_MARGIN_SECONDS,
+            )
+        )
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    @staticmethod
+    async def _timed(generate: Callable[[], Awaitable[str]], operation: str) -> str:
+        with LLM_CALL_SECONDS.time(operation=operation):
+            return await asyncio.wait_for(generate(), LLM_TIMEOUT_SECONDS)
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Lookup counts and hit rate per operation"""
+        stats: Dict[str, Dict[str, float]] = {}
+        for (operation, result), count in LLM_CACHE_LOOKUPS.items():
+            stats.setdefault(operation, {})[result] = count
+        for counts in stats.values():
+            total = sum(counts.values())
+            hits = total - counts.get("miss", 0)
+            counts["hit_rate"] = round(hits / total, 4) if total else 0.0
+        return stats
+
+
+# Global instance
+llm_cache = LLMCache()
+
+
+def init_llm_cache(db) -> LLMCache:
+    """Attach the persistent tier to the global cache"""
+    llm_cache.attach_db(db)
+    return llm_cache
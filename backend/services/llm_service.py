@@ -1,43 +1,355 @@
+import asyncio
 import os
 import logging
-from typing import Dict, Optional
+import re
+import time
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Set, Tuple
 from dotenv import load_dotenv
 
+from services.llm_cache import cache_key, llm_cache, LLM_CACHE_LOOKUPS, LLM_CALL_SECONDS
+from services.metrics import registry
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+LLM_PROVIDER = "openai"
+LLM_MODEL = "gpt-4o"
+
+INSIGHT_SYSTEM_MESSAGE = """You are an expert Indian stock market analyst. Provide concise, actionable insights.
+Focus on key factors affecting the stock. Be direct and avoid generic statements.
+Format your response with clear sections using markdown."""
+
+NEWS_SYSTEM_MESSAGE = "You are a financial news analyst. Summarize market news into actionable insights. Be concise."
+
+BATCH_INSIGHT_SYSTEM_MESSAGE = """You are an expert Indian stock market analyst reviewing several stocks at once.
+Answer every stock in its own section, in the order given, using exactly the requested headings.
+Be direct and specific to each company."""
+
+# Batched insight limits: prompt size standing in for the context budget, and
+# how many batches of one request may be in flight together
+BATCH_PROMPT_CHAR_BUDGET = int(os.environ.get("LLM_BATCH_PROMPT_CHAR_BUDGET", "6000"))
+BATCH_CONCURRENCY = int(os.environ.get("LLM_BATCH_CONCURRENCY", "2"))
+
+# Latency budget for insights on report paths; past it a rule-based narrative is served
+INSIGHT_DEADLINE_SECONDS = float(os.environ.get("LLM_INSIGHT_DEADLINE_SECONDS", "8"))
+
+LLM_INSIGHT_FALLBACKS = registry.counter(
+    "stockpulse_llm_insight_fallbacks_total",
+    "Insights served from the rule-based fallback, by operation and reason (deadline, error)",
+    ("operation", "reason"),
+)
+
+# LLM calls left running past their deadline, kept referenced until they finish
+_background_calls: Set[asyncio.Task] = set()
+
+
+class _SharedStream:
+    """One upstream insight stream fanned out to every identical request in this process"""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[Exception] = None
+        self.followers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def notify(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def follow(self) -> AsyncIterator[str]:
+        """Every chunk so far, then each new one until the upstream call ends"""
+        sent = 0
+        while True:
+            changed = self._changed
+            while sent < len(self.chunks):
+                yield self.chunks[sent]
+                sent += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await changed.wait()
+
+
+# Insight streams in flight in this process, by cache key
+_inflight_streams: Dict[str, _SharedStream] = {}
+
+
+async def _complete(api_key: str, session_id: str, system_message: str, prompt: str) -> str:
+    """Send one prompt to the model; raises on failure so errors are never cached"""
+    from emergentintegrations.llm.chat import LlmChat, UserMessage
+    
+    chat = LlmChat(
+        api_key=api_key,
+        session_id=session_id,
+        system_message=system_message
+    ).with_model(LLM_PROVIDER, LLM_MODEL)
+    
+    return await chat.send_message(UserMessage(text=prompt))
+
+
+async def _stream_complete(
+    api_key: str, session_id: str, system_message: str, prompt: str
+) -> AsyncIterator[str]:
+    """
+    Yield completion text as the model produces it.
+    
+    Uses the SDK's stream_message when the installed emergentintegrations
+    provides it; otherwise (as with the pinned 0.1.0) the full completion
+    arrives as a single chunk and only the transport is incremental.
+    Closing the generator (e.g. on client disconnect) abandons the call.
+    """
+    from emergentintegrations.llm.chat import LlmChat, UserMessage
+    
+    chat = LlmChat(
+        api_key=api_key,
+        session_id=session_id,
+        system_message=system_message
+    ).with_model(LLM_PROVIDER, LLM_MODEL)
+    
+    stream_message = getattr(chat, "stream_message", None)
+    if stream_message is None:
+        yield await chat.send_message(UserMessage(text=prompt))
+        return
+    
+    async for chunk in stream_message(UserMessage(text=prompt)):
+        if chunk:
+            yield chunk
+
+
+async def _cached_complete(
+    api_key: str, session_id: str, system_message: str, prompt: str, operation: str
+) -> str:
+    """Completion served from the LLM cache when the same request was answered recently"""
+    key = cache_key(LLM_PROVIDER, LLM_MODEL, system_message, prompt)
+    return await llm_cache.get_or_generate(
+        key,
+        lambda: _complete(api_key, session_id, system_message, prompt),
+        operation=operation,
+        metadata={"model": f"{LLM_PROVIDER}/{LLM_MODEL}", "operation": operation},
+    )
+
 
 async def generate_stock_insight(stock_data: Dict, analysis_type: str = "full") -> str:
     """Generate LLM-powered insights for a stock"""
     try:
-        from emergentintegrations.llm.chat import LlmChat, UserMessage
-        
         api_key = os.environ.get("EMERGENT_LLM_KEY")
         if not api_key:
             return "LLM insights unavailable - API key not configured."
         
-        chat = LlmChat(
-            api_key=api_key,
-            session_id=f"stock_analysis_{stock_data.get('symbol', 'unknown')}",
-            system_message="""You are an expert Indian stock market analyst. Provide concise, actionable insights.
-Focus on key factors affecting the stock. Be direct and avoid generic statements.
-Format your response with clear sections using markdown."""
-        ).with_model("openai", "gpt-4o")
-        
-        # Build context based on analysis type
-        symbol = stock_data.get("symbol", "Unknown")
-        name = stock_data.get("name", "Unknown")
-        sector = stock_data.get("sector", "Unknown")
-        price = stock_data.get("current_price", 0)
-        change_pct = stock_data.get("price_change_percent", 0)
-        
-        fund = stock_data.get("fundamentals", {})
-        val = stock_data.get("valuation", {})
-        tech = stock_data.get("technicals", {})
-        analysis = stock_data.get("analysis", {})
+        prompt = build_insight_prompt(stock_data, analysis_type)
+        return await _cached_complete(
+            api_key,
+            f"stock_analysis_{stock_data.get('symbol', 'unknown')}",
+            INSIGHT_SYSTEM_MESSAGE,
+            prompt,
+            operation="insight",
+        )
         
-        if analysis_type == "score_explanation":
-            prompt = f"""Explain why {name} ({symbol}) has these scores:
+    except Exception as e:
+        logger.error(f"LLM insight generation failed: {str(e)}")
+        return f"Unable to generate AI insights at this time. Error: {str(e)}"
+
+
+async def stream_stock_insight(stock_data: Dict, analysis_type: str = "full") -> AsyncIterator[str]:
+    """
+    Streaming variant of generate_stock_insight yielding text chunks.
+    
+    A cached insight is replayed at once. Otherwise identical requests in
+    this process follow one upstream call: each gets the chunks produced so
+    far, then the rest as they arrive, and the complete text is stored in
+    the LLM cache. The call is cancelled, and nothing cached, once every
+    consumer has stopped early. Upstream errors propagate.
+    """
+    api_key = os.environ.get("EMERGENT_LLM_KEY")
+    if not api_key:
+        yield "LLM insights unavailable - API key not configured."
+        return
+    
+    prompt = build_insight_prompt(stock_data, analysis_type)
+    key = cache_key(LLM_PROVIDER, LLM_MODEL, INSIGHT_SYSTEM_MESSAGE, prompt)
+    
+    cached = await llm_cache.get(key, operation="insight_stream")
+    if cached is None:
+        # An identical non-streaming call already in flight will answer sooner
+        task = llm_cache.inflight(key)
+        if task is not None:
+            LLM_CACHE_LOOKUPS.inc(operation="insight_stream", result="coalesced")
+            cached = await asyncio.shield(task)
+    if cached is not None:
+        yield cached
+        return
+    
+    shared = _inflight_streams.get(key)
+    if shared is None:
+        LLM_CACHE_LOOKUPS.inc(operation="insight_stream", result="miss")
+        shared = _inflight_streams[key] = _SharedStream()
+        session_id = f"stock_analysis_{stock_data.get('symbol', 'unknown')}"
+        shared.task = asyncio.ensure_future(_produce_stream(shared, key, api_key, session_id, prompt))
+    else:
+        LLM_CACHE_LOOKUPS.inc(operation="insight_stream", result="coalesced")
+    
+    shared.followers += 1
+    try:
+        async for chunk in shared.follow():
+            yield chunk
+    finally:
+        shared.followers -= 1
+        if shared.followers == 0 and not shared.done:
+            _inflight_streams.pop(key, None)
+            shared.task.cancel()
+
+
+async def _produce_stream(shared: _SharedStream, key: str, api_key: str, session_id: str, prompt: str):
+    """Drive one upstream stream into shared, caching the complete text"""
+    start = time.perf_counter()
+    try:
+        async for chunk in _stream_complete(api_key, session_id, INSIGHT_SYSTEM_MESSAGE, prompt):
+            shared.chunks.append(chunk)
+            shared.notify()
+        LLM_CALL_SECONDS.observe(time.perf_counter() - start, operation="insight_stream")
+        await llm_cache.put(
+            key, "".join(shared.chunks),
+            metadata={"model": f"{LLM_PROVIDER}/{LLM_MODEL}", "operation": "insight"},
+        )
+    except Exception as e:
+        shared.error = e
+    finally:
+        shared.done = True
+        shared.notify()
+        if _inflight_streams.get(key) is shared:
+            del _inflight_streams[key]
+
+
+async def _within_deadline(call: Awaitable[Any], deadline: float, operation: str) -> Optional[Any]:
+    """
+    Result of call if it completes within deadline seconds, else None.
+    
+    A call that misses the deadline keeps running in the background so its
+    completion still lands in the LLM cache; a call that fails returns None.
+    """
+    task = asyncio.ensure_future(call)
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), deadline)
+    except asyncio.TimeoutError:
+        LLM_INSIGHT_FALLBACKS.inc(operation=operation, reason="deadline")
+        logger.warning(f"LLM {operation} exceeded {deadline:.1f}s deadline, finishing in background")
+        _background_calls.add(task)
+        task.add_done_callback(_finish_background_call)
+    except Exception as e:
+        LLM_INSIGHT_FALLBACKS.inc(operation=operation, reason="error")
+        logger.error(f"LLM {operation} failed, using rule-based fallback: {str(e)}")
+    return None
+
+
+def _finish_background_call(task: asyncio.Task):
+    _background_calls.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Background LLM call failed: {task.exception()}")
+
+
+async def generate_stock_insight_within_deadline(
+    stock_data: Dict, analysis_type: str = "full", deadline: Optional[float] = None
+) -> Tuple[str, str]:
+    """
+    generate_stock_insight with a latency budget.
+    
+    Returns (insight, source) where source is "llm", or "rule_based" when
+    the model did not answer within the deadline (default
+    INSIGHT_DEADLINE_SECONDS) or failed.
+    """
+    api_key = os.environ.get("EMERGENT_LLM_KEY")
+    if not api_key:
+        return build_rule_based_insight(stock_data), "rule_based"
+    
+    insight = await _within_deadline(
+        _cached_complete(
+            api_key,
+            f"stock_analysis_{stock_data.get('symbol', 'unknown')}",
+            INSIGHT_SYSTEM_MESSAGE,
+            build_insight_prompt(stock_data, analysis_type),
+            operation="insight",
+        ),
+        INSIGHT_DEADLINE_SECONDS if deadline is None else deadline,
+        operation="insight",
+    )
+    if insight is None:
+        return build_rule_based_insight(stock_data), "rule_based"
+    return insight, "llm"
+
+
+def build_rule_based_insight(stock_data: Dict) -> str:
+    """
+    Deterministic markdown narrative built from generate_analysis output.
+    
+    Covers the verdict and scores, triggered deal-breakers, risk penalties
+    and quality boosters, in the same sections as the full LLM insight.
+    """
+    symbol = stock_data.get("symbol", "Unknown")
+    name = stock_data.get("name", symbol)
+    analysis = stock_data.get("analysis", {})
+    breakdown = analysis.get("score_breakdown", {})
+    verdict = analysis.get("verdict", "N/A")
+    
+    deal_breakers = analysis.get("triggered_deal_breakers", {}).get("long_term", [])
+    penalties = analysis.get("risk_penalties", {}).get("long_term", [])
+    boosters = analysis.get("quality_boosters", {}).get("long_term", [])
+    
+    lines = [
+        "**Investment Thesis**",
+        f"{name} ({symbol}) is rated **{verdict}** with a long-term score of "
+        f"{analysis.get('long_term_score', 'N/A')}/100 and a short-term score of "
+        f"{analysis.get('short_term_score', 'N/A')}/100 "
+        f"({analysis.get('confidence_level', 'N/A')} confidence).",
+        f"Component scores: fundamentals {breakdown.get('fundamental_score', 'N/A')}, "
+        f"valuation {breakdown.get('valuation_score', 'N/A')}, "
+        f"technicals {breakdown.get('technical_score', 'N/A')}, "
+        f"quality {breakdown.get('quality_score', 'N/A')}.",
+        "",
+        "**Key Strengths**",
+    ]
+    lines += [f"- {b['description']}" for b in boosters[:3]]
+    lines += [f"- {s}" for s in analysis.get("top_strengths", [])[:max(0, 3 - len(boosters))]]
+    
+    lines += ["", "**Key Risks**"]
+    if deal_breakers:
+        lines += [f"- Deal-breaker {db['description']}" for db in deal_breakers]
+    lines += [f"- {p['description']} (penalty {p['penalty']})" for p in penalties[:3]]
+    if not deal_breakers and not penalties:
+        lines += [f"- {r}" for r in analysis.get("top_risks", [])[:2]]
+    
+    if deal_breakers:
+        action = "Avoid until the deal-breakers above are resolved."
+    elif verdict in ("STRONG BUY", "BUY"):
+        action = "Consider accumulating, sizing the position to the risks listed."
+    elif verdict == "HOLD":
+        action = "Hold existing positions and wait for scores to improve before adding."
+    else:
+        action = "Avoid fresh positions at current levels."
+    lines += ["", "**Actionable Recommendation**", action, "",
+              "_Generated from StockPulse scoring rules; AI commentary was not available in time._"]
+    
+    return "\n".join(lines)
+
+
+def build_insight_prompt(stock_data: Dict, analysis_type: str = "full") -> str:
+    """Render the insight prompt for a stock and analysis type"""
+    # Build context based on analysis type
+    symbol = stock_data.get("symbol", "Unknown")
+    name = stock_data.get("name", "Unknown")
+    sector = stock_data.get("sector", "Unknown")
+    price = stock_data.get("current_price", 0)
+    change_pct = stock_data.get("price_change_percent", 0)
+    
+    fund = stock_data.get("fundamentals", {})
+    val = stock_data.get("valuation", {})
+    tech = stock_data.get("technicals", {})
+    analysis = stock_data.get("analysis", {})
+    
+    if analysis_type == "score_explanation":
+        prompt = f"""Explain why {name} ({symbol}) has these scores:
 - Long-term Score: {analysis.get('long_term_score', 'N/A')}/100
 - Short-term Score: {analysis.get('short_term_score', 'N/A')}/100
 - Verdict: {analysis.get('verdict', 'N/A')}
@@ -51,8 +363,8 @@ Key metrics:
 
 Explain in 3-4 sentences why the score is high/low and what's driving it."""
 
-        elif analysis_type == "risk_assessment":
-            prompt = f"""Assess the key risks for {name} ({symbol}) in the {sector} sector:
+    elif analysis_type == "risk_assessment":
+        prompt = f"""Assess the key risks for {name} ({symbol}) in the {sector} sector:
 
 Current metrics:
 - Debt/Equity: {fund.get('debt_to_equity', 'N/A')}
@@ -63,16 +375,16 @@ Current metrics:
 
 Identify top 3 risks in bullet points. Be specific to this company."""
 
-        elif analysis_type == "news_summary":
-            prompt = f"""Based on typical market dynamics for {name} ({symbol}):
+    elif analysis_type == "news_summary":
+        prompt = f"""Based on typical market dynamics for {name} ({symbol}):
 - Sector: {sector}
 - Recent price change: {change_pct}%
 - Current technical position: RSI {tech.get('rsi_14', 50)}, Price vs 200-DMA
 
 Provide a brief market sentiment summary (2-3 sentences) explaining likely factors driving recent price action."""
 
-        else:  # full analysis
-            prompt = f"""Provide a comprehensive analysis for {name} ({symbol}):
+    else:  # full analysis
+        prompt = f"""Provide a comprehensive analysis for {name} ({symbol}):
 
 **Company Profile:**
 - Sector: {sector}
@@ -106,31 +418,166 @@ Provide:
 2. **Key Strengths** (2 bullet points)
 3. **Key Risks** (2 bullet points)
 4. **Actionable Recommendation** (1 sentence with specific action)"""
+    
+    return prompt
+
+
+def build_compact_summary(stock_data: Dict) -> str:
+    """One-line metric summary of a stock for batched prompts"""
+    fund = stock_data.get("fundamentals", {})
+    val = stock_data.get("valuation", {})
+    tech = stock_data.get("technicals", {})
+    analysis = stock_data.get("analysis", {})
+    
+    return (
+        f"{stock_data.get('name', 'Unknown')} | Sector: {stock_data.get('sector', 'Unknown')} | "
+        f"Price: ₹{stock_data.get('current_price', 0):,.2f} ({stock_data.get('price_change_percent', 0):+.2f}%) | "
+        f"Rev Growth: {fund.get('revenue_growth_yoy', 'N/A')}% | ROE: {fund.get('roe', 'N/A')}% | "
+        f"D/E: {fund.get('debt_to_equity', 'N/A')} | P/E: {val.get('pe_ratio', 'N/A')} | "
+        f"RSI: {tech.get('rsi_14', 'N/A')} | "
+        f"Scores LT/ST: {analysis.get('long_term_score', 'N/A')}/{analysis.get('short_term_score', 'N/A')} | "
+        f"Verdict: {analysis.get('verdict', 'N/A')}"
+    )
+
+
+def build_batch_prompt(summaries: Dict[str, str]) -> str:
+    """Render one prompt covering every symbol in summaries"""
+    stock_lines = "\n".join(f"- {symbol}: {summary}" for symbol, summary in summaries.items())
+    headings = ", ".join(f"### {symbol}" for symbol in summaries)
+    
+    return f"""Review these stocks side by side:
+
+{stock_lines}
+
+For each stock write a section starting with its heading on its own line ({headings}) containing:
+1. **Investment Thesis** (1-2 sentences)
+2. **Key Strength** and **Key Risk** (one bullet each)
+3. **Relative Standing** (1 sentence versus the other stocks listed)"""
+
+
+def pack_batches(summaries: Dict[str, str], char_budget: int = BATCH_PROMPT_CHAR_BUDGET) -> List[Dict[str, str]]:
+    """
+    Split summaries into as few batches as fit the prompt budget.
+    
+    Symbols keep their order; a summary larger than the budget on its own
+    still gets a batch of one.
+    """
+    overhead = len(build_batch_prompt({}))
+    batches: List[Dict[str, str]] = []
+    current: Dict[str, str] = {}
+    size = overhead
+    
+    for symbol, summary in summaries.items():
+        # Each symbol costs its summary line plus its heading in the instructions
+        cost = len(symbol) * 2 + len(summary) + 12
+        if current and size + cost > char_budget:
+            batches.append(current)
+            current, size = {}, overhead
+        current[symbol] = summary
+        size += cost
+    
+    if current:
+        batches.append(current)
+    return batches
+
+
+def parse_batch_sections(text: str, symbols: List[str]) -> Dict[str, str]:
+    """Split a batched completion into per-symbol sections keyed by symbol"""
+    pattern = re.compile(
+        r"^\s*#{1,4}\s*\**(" + "|".join(re.escape(s) for s in symbols) + r")\b.*$",
+        re.MULTILINE | re.IGNORECASE,
+    )
+    matches = list(pattern.finditer(text))
+    by_upper = {s.upper(): s for s in symbols}
+    
+    sections: Dict[str, str] = {}
+    for i, match in enumerate(matches):
+        symbol = by_upper[match.group(1).upper()]
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        body = text[match.end():end].strip()
+        if body and symbol not in sections:
+            sections[symbol] = body
+    return sections
+
+
+async def generate_batch_insights(stocks_data: List[Dict], deadline: Optional[float] = None) -> Dict[str, str]:
+    """
+    LLM insights for several stocks in as few round trips as possible.
+    
+    Compact summaries are packed into batched prompts within
+    BATCH_PROMPT_CHAR_BUDGET; batches run concurrently, at most
+    BATCH_CONCURRENCY at a time. Returns an insight per symbol, with a
+    placeholder for any symbol the model's answer left out. Past the
+    deadline (default INSIGHT_DEADLINE_SECONDS) every stock gets its
+    rule-based narrative while the batches finish in the background.
+    """
+    insights, _ = await generate_batch_insights_within_deadline(stocks_data, deadline)
+    return insights
+
+
+async def generate_batch_insights_within_deadline(
+    stocks_data: List[Dict], deadline: Optional[float] = None
+) -> Tuple[Dict[str, str], str]:
+    """
+    generate_batch_insights that also reports where the insights came from.
+    
+    Returns (insights, source) where source is "llm" when every batch was
+    answered, "error" when a batch failed and its stocks carry an error
+    placeholder, or "rule_based" when there is no API key or the deadline passed.
+    """
+    symbols = [s.get("symbol", "unknown") for s in stocks_data]
+    api_key = os.environ.get("EMERGENT_LLM_KEY")
+    if not api_key:
+        return {s.get("symbol", "unknown"): build_rule_based_insight(s) for s in stocks_data}, "rule_based"
+    
+    summaries = {s.get("symbol", "unknown"): build_compact_summary(s) for s in stocks_data}
+    batches = pack_batches(summaries, BATCH_PROMPT_CHAR_BUDGET)
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    
+    async def run_batch(batch: Dict[str, str]) -> Tuple[Dict[str, str], bool]:
+        async with semaphore:
+            try:
+                text = await _cached_complete(
+                    api_key,
+                    f"batch_analysis_{'_'.join(batch)}",
+                    BATCH_INSIGHT_SYSTEM_MESSAGE,
+                    build_batch_prompt(batch),
+                    operation="batch_insight",
+                )
+            except Exception as e:
+                logger.error(f"Batched LLM insight failed for {list(batch)}: {str(e)}")
+                error = f"Unable to generate AI insights at this time. Error: {str(e)}"
+                return {symbol: error for symbol in batch}, False
         
-        user_message = UserMessage(text=prompt)
-        response = await chat.send_message(user_message)
-        return response
-        
-    except Exception as e:
-        logger.error(f"LLM insight generation failed: {str(e)}")
-        return f"Unable to generate AI insights at this time. Error: {str(e)}"
+        sections = parse_batch_sections(text, list(batch))
+        missing = [symbol for symbol in batch if symbol not in sections]
+        if missing:
+            logger.warning(f"Batched LLM insight missing sections for {missing}")
+        return {symbol: sections.get(symbol, "AI insight not available for this stock.") for symbol in batch}, True
+    
+    results = await _within_deadline(
+        asyncio.gather(*[run_batch(batch) for batch in batches]),
+        INSIGHT_DEADLINE_SECONDS if deadline is None else deadline,
+        operation="batch_insight",
+    )
+    if results is None:
+        return {s.get("symbol", "unknown"): build_rule_based_insight(s) for s in stocks_data}, "rule_based"
+    
+    insights: Dict[str, str] = {}
+    for result, _ in results:
+        insights.update(result)
+    
+    logger.info(f"Generated batched insights for {len(symbols)} stocks in {len(batches)} LLM call(s)")
+    return insights, "llm" if all(answered for _, answered in results) else "error"
 
 
 async def summarize_news(news_items: list) -> str:
     """Summarize multiple news items into key takeaways"""
     try:
-        from emergentintegrations.llm.chat import LlmChat, UserMessage
-        
         api_key = os.environ.get("EMERGENT_LLM_KEY")
         if not api_key:
             return "News summarization unavailable."
         
-        chat = LlmChat(
-            api_key=api_key,
-            session_id="news_summary",
-            system_message="You are a financial news analyst. Summarize market news into actionable insights. Be concise."
-        ).with_model("openai", "gpt-4o")
-        
         news_text = "\n".join([
             f"- {item.get('title', '')} (Sentiment: {item.get('sentiment', 'NEUTRAL')})"
             for item in news_items[:10]
@@ -142,9 +589,9 @@ async def summarize_news(news_items: list) -> str:
 
 Provide brief, actionable insights for an investor."""
         
-        user_message = UserMessage(text=prompt)
-        response = await chat.send_message(user_message)
-        return response
+        return await _cached_complete(
+            api_key, "news_summary", NEWS_SYSTEM_MESSAGE, prompt, operation="news_summary"
+        )
         
     except Exception as e:
         logger.error(f"News summarization failed: {str(e)}")
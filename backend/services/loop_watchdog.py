@@ -0,0 +1,189 @@
+"""
+Event Loop Watchdog for StockPulse
+Measures event-loop lag continuously and, when the loop is blocked, captures
+the loop thread's stack to record which function blocked it
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+LOOP_WATCHDOG_ENABLED = os.environ.get("LOOP_WATCHDOG_ENABLED", "true").lower() == "true"
+# How often the monitor task wakes to measure lag
+LOOP_MONITOR_INTERVAL_MS = float(os.environ.get("LOOP_MONITOR_INTERVAL_MS", "100"))
+# Lag beyond which the loop counts as blocked and its stack is captured
+LOOP_BLOCK_THRESHOLD_MS = float(os.environ.get("LOOP_BLOCK_THRESHOLD_MS", "100"))
+
+# Frames under this directory (outside site-packages) are blamed for a block
+APP_ROOT = str(Path(__file__).resolve().parent.parent)
+
+LOOP_LAG_SECONDS = registry.histogram(
+    "stockpulse_event_loop_lag_seconds",
+    "Delay between when the loop monitor should have woken and when it did",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+LOOP_BLOCK_SECONDS = registry.histogram(
+    "stockpulse_event_loop_block_duration_seconds",
+    "Event loop stalls beyond the threshold, by the application function that blocked",
+    ("function",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+def find_offender(frame) -> str:
+    """
+    Name the function responsible for a blocked stack.
+
+    Prefers the innermost application frame (a library call such as
+    yfinance or reportlab is blamed on the app function that made it) and
+    falls back to the innermost frame overall.
+    """
+    leaf = frame
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_ROOT) and "site-packages" not in filename:
+            relative = os.path.relpath(filename, APP_ROOT)
+            return f"{relative}:{frame.f_code.co_name}"
+        frame = frame.f_back
+    if leaf is None:
+        return "unknown"
+    return f"{os.path.basename(leaf.f_code.co_filename)}:{leaf.f_code.co_name}"
+
+
+class LoopWatchdog:
+    """
+    Loop lag monitor plus a watcher thread.
+
+    The monitor task sleeps for a fixed interval and records how late it woke.
+    Each wake-up refreshes a heartbeat; the watcher thread notices a stale
+    heartbeat while the loop is still stuck and snapshots the loop thread's
+    stack, so the culprit is captured in the act rather than after the fact.
+    """
+
+    def __init__(
+        self,
+        interval_ms: float = LOOP_MONITOR_INTERVAL_MS,
+        threshold_ms: float = LOOP_BLOCK_THRESHOLD_MS,
+        max_events: int = 100,
+    ):
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.events: deque = deque(maxlen=max_events)
+
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = 0.0
+        self._captured: Optional[Dict[str, Any]] = None
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+
+    async def start(self):
+        """Start monitoring the running event loop"""
+        if self._running:
+            return
+
+        self._running = True
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.perf_counter()
+        self._task = asyncio.create_task(self._monitor_loop())
+        self._thread = threading.Thread(
+            target=self._watch, name="stockpulse-loop-watchdog", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"Loop watchdog started (interval {self.interval * 1000:.0f}ms, "
+            f"threshold {self.threshold * 1000:.0f}ms)"
+        )
+
+    async def stop(self):
+        """Stop monitoring"""
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._thread:
+            self._thread.join(timeout=1)
+        logger.info("Loop watchdog stopped")
+
+    async def _monitor_loop(self):
+        while self._running:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(0.0, now - start - self.interval)
+            self._heartbeat = now
+            LOOP_LAG_SECONDS.observe(lag)
+
+            if lag >= self.threshold:
+                self._record_block(lag)
+            else:
+                # A capture taken just before the loop recovered is not a block
+                self._captured = None
+
+    def _watch(self):
+        """Watcher thread: snapshot the loop thread's stack while it is stuck"""
+        poll = min(self.interval, self.threshold) / 2
+        while self._running:
+            time.sleep(poll)
+            stalled_for = time.perf_counter() - self._heartbeat - self.interval
+            if stalled_for < self.threshold or self._captured is not None:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._captured = {
+                "heartbeat": self._heartbeat,
+                "function": find_offender(frame),
+                "stack": traceback.format_stack(frame),
+            }
+            del frame
+
+    def _record_block(self, lag: float):
+        captured, self._captured = self._captured, None
+        function = captured["function"] if captured else "unknown"
+        LOOP_BLOCK_SECONDS.observe(lag, function=function)
+        self.events.append({
+            "function": function,
+            "duration_ms": round(lag * 1000, 1),
+            "detected_at": datetime.now(timezone.utc).isoformat(),
+            "stack": captured["stack"] if captured else [],
+        })
+        logger.warning(f"Event loop blocked for {lag * 1000:.0f}ms by {function}")
+
+    def get_recent_blocks(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent stalls, newest first"""
+        return list(self.events)[-limit:][::-1]
+
+    def get_offender_summary(self) -> Dict[str, Dict[str, float]]:
+        """Total stall count and time per offending function"""
+        summary: Dict[str, Dict[str, float]] = {}
+        for event in self.events:
+            entry = summary.setdefault(event["function"], {"count": 0, "total_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] = round(entry["total_ms"] + event["duration_ms"], 1)
+        return summary
+
+
+# Global instance
+loop_watchdog = LoopWatchdog()
+
+
+def is_loop_watchdog_enabled() -> bool:
+    """Check if the loop watchdog should run"""
+    return LOOP_WATCHDOG_ENABLED
@@ -8,15 +8,23 @@ import os
 import logging
 import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Awaitable, Callable
 from functools import lru_cache
 import json
 
+from services.lazy_imports import is_installed
+from services.metrics import (
+    MARKET_CACHE_HITS, MARKET_CACHE_MISSES, MARKET_CACHE_COALESCED, YFINANCE_CALL_SECONDS
+)
+from services import state_backend as state
+
 logger = logging.getLogger(__name__)
 
-# Cache for storing fetched data
-_price_cache: Dict[str, Dict] = {}
-_cache_timestamps: Dict[str, datetime] = {}
+# Fetched data is cached in the shared state backend under "market:<cache_key>",
+# so with several workers one fetch serves them all
+
+# Upstream fetches currently in flight in this process, keyed by cache key
+_inflight: Dict[str, asyncio.Task] = {}
 CACHE_TTL_SECONDS = 60  # 1 minute cache for real-time data
 HISTORICAL_CACHE_TTL = 3600  # 1 hour for historical data
 
@@ -101,12 +109,35 @@ def get_yahoo_symbol(symbol: str, exchange: str = "NSE") -> str:
     return f"{symbol}{suffix}"
 
 
-def is_cache_valid(cache_key: str, ttl: int = CACHE_TTL_SECONDS) -> bool:
-    """Check if cached data is still valid"""
-    if cache_key not in _cache_timestamps:
-        return False
-    age = (datetime.now() - _cache_timestamps[cache_key]).total_seconds()
-    return age < ttl
+async def _cache_get(cache_key: str) -> Optional[Any]:
+    """Cached value for a key, or None when missing or expired"""
+    return await state.get_state_backend().get(f"market:{cache_key}")
+
+
+async def _yf_call(operation: str, fn: Callable, *args, **kwargs):
+    """Run a blocking yfinance call in a worker thread and record its latency"""
+    with YFINANCE_CALL_SECONDS.time(operation=operation):
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+async def _single_flight(
+    cache_key: str, cache_name: str, ttl: int, fetch: Callable[[], Awaitable]
+):
+    """
+    Share one upstream fetch between concurrent callers missing the same key.
+    
+    Callers in this process join the in-flight task; other workers wait on the
+    shared backend for the result. A non-None result is cached for ttl seconds.
+    """
+    task = _inflight.get(cache_key)
+    if task is not None:
+        MARKET_CACHE_COALESCED.inc(cache=cache_name)
+        return await asyncio.shield(task)
+    
+    task = asyncio.ensure_future(state.fetch_shared(f"market:{cache_key}", ttl, fetch))
+    _inflight[cache_key] = task
+    task.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+    return await asyncio.shield(task)
 
 
 async def get_stock_quote(symbol: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
@@ -116,9 +147,20 @@ async def get_stock_quote(symbol: str, use_cache: bool = True) -> Optional[Dict[
     """
     cache_key = f"quote_{symbol}"
     
-    if use_cache and is_cache_valid(cache_key):
-        return _price_cache.get(cache_key)
+    if use_cache:
+        cached = await _cache_get(cache_key)
+        if cached is not None:
+            MARKET_CACHE_HITS.inc(cache="quote")
+            return cached
     
+    MARKET_CACHE_MISSES.inc(cache="quote")
+    return await _single_flight(
+        cache_key, "quote", CACHE_TTL_SECONDS, lambda: _fetch_stock_quote(symbol)
+    )
+
+
+async def _fetch_stock_quote(symbol: str) -> Optional[Dict[str, Any]]:
+    """Fetch a quote from Yahoo Finance"""
     try:
         import yfinance as yf
         
@@ -126,7 +168,7 @@ async def get_stock_quote(symbol: str, use_cache: bool = True) -> Optional[Dict[
         ticker = yf.Ticker(yahoo_symbol)
         
         # Get real-time info
-        info = ticker.info
+        info = await _yf_call("quote", lambda: ticker.info)
         
         if not info or 'regularMarketPrice' not in info:
             logger.warning(f"No data found for {symbol}")
@@ -162,10 +204,6 @@ async def get_stock_quote(symbol: str, use_cache: bool = True) -> Optional[Dict[
             quote_data["price_change"] = 0
             quote_data["price_change_percent"] = 0
         
-        # Cache the result
-        _price_cache[cache_key] = quote_data
-        _cache_timestamps[cache_key] = datetime.now()
-        
         return quote_data
         
     except ImportError:
@@ -193,9 +231,24 @@ async def get_historical_data(
     """
     cache_key = f"history_{symbol}_{period}_{interval}"
     
-    if use_cache and is_cache_valid(cache_key, HISTORICAL_CACHE_TTL):
-        return _price_cache.get(cache_key, [])
+    if use_cache:
+        cached = await _cache_get(cache_key)
+        if cached is not None:
+            MARKET_CACHE_HITS.inc(cache="history")
+            return cached
     
+    MARKET_CACHE_MISSES.inc(cache="history")
+    history = await _single_flight(
+        cache_key, "history", HISTORICAL_CACHE_TTL,
+        lambda: _fetch_historical_data(symbol, period, interval)
+    )
+    return history or []
+
+
+async def _fetch_historical_data(
+    symbol: str, period: str, interval: str
+) -> Optional[List[Dict[str, Any]]]:
+    """Fetch price history from Yahoo Finance (None when unavailable, so it is not cached)"""
     try:
         import yfinance as yf
         
@@ -203,11 +256,11 @@ async def get_historical_data(
         ticker = yf.Ticker(yahoo_symbol)
         
         # Get historical data
-        hist = ticker.history(period=period, interval=interval)
+        hist = await _yf_call("history", ticker.history, period=period, interval=interval)
         
         if hist.empty:
             logger.warning(f"No historical data found for {symbol}")
-            return []
+            return None
         
         # Convert to list of dicts
         history_data = []
@@ -221,27 +274,115 @@ async def get_historical_data(
                 "volume": int(row["Volume"])
             })
         
-        # Cache the result
-        _price_cache[cache_key] = history_data
-        _cache_timestamps[cache_key] = datetime.now()
-        
         return history_data
         
     except ImportError:
         logger.error("yfinance not installed. Run: pip install yfinance")
-        return []
+        return None
     except Exception as e:
         logger.error(f"Error fetching history for {symbol}: {str(e)}")
-        return []
+        return None
+
+
+async def get_bulk_historical_data(
+    symbols: List[str],
+    period: str = "1y",
+    interval: str = "1d"
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Historical price data for many symbols, with one upstream download for
+    every symbol not already cached
+    
+    Results share the cache entries of get_historical_data. Symbols with no
+    data are left out of the result.
+    """
+    results = {}
+    missing = []
+    for symbol in symbols:
+        cached = await _cache_get(f"history_{symbol}_{period}_{interval}")
+        if cached is not None:
+            MARKET_CACHE_HITS.inc(cache="history")
+            results[symbol] = cached
+        else:
+            MARKET_CACHE_MISSES.inc(cache="history")
+            missing.append(symbol)
+    
+    if len(missing) == 1:
+        history = await get_historical_data(missing[0], period, interval)
+        if history:
+            results[missing[0]] = history
+    elif missing:
+        downloaded = await _fetch_bulk_historical_data(missing, period, interval)
+        for symbol, history in downloaded.items():
+            await state.get_state_backend().set(
+                f"market:history_{symbol}_{period}_{interval}", history, ttl=HISTORICAL_CACHE_TTL
+            )
+            results[symbol] = history
+    
+    return results
+
+
+async def _fetch_bulk_historical_data(
+    symbols: List[str], period: str, interval: str
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Download price history for several symbols in one Yahoo Finance request"""
+    try:
+        import yfinance as yf
+        
+        yahoo_symbols = {get_yahoo_symbol(s): s for s in symbols}
+        frame = await _yf_call(
+            "bulk_history", yf.download, " ".join(yahoo_symbols),
+            period=period, interval=interval, group_by="ticker",
+            auto_adjust=False, progress=False, threads=True
+        )
+        
+        results = {}
+        for yahoo_symbol, symbol in yahoo_symbols.items():
+            if yahoo_symbol not in frame.columns.get_level_values(0):
+                continue
+            hist = frame[yahoo_symbol].dropna(subset=["Close"])
+            if hist.empty:
+                continue
+            results[symbol] = [
+                {
+                    "date": date.strftime("%Y-%m-%d"),
+                    "open": round(row["Open"], 2),
+                    "high": round(row["High"], 2),
+                    "low": round(row["Low"], 2),
+                    "close": round(row["Close"], 2),
+                    "volume": int(row["Volume"])
+                }
+                for date, row in hist.iterrows()
+            ]
+        
+        return results
+        
+    except ImportError:
+        logger.error("yfinance not installed. Run: pip install yfinance")
+        return {}
+    except Exception as e:
+        logger.error(f"Error in bulk history download: {str(e)}")
+        return {}
 
 
 async def get_market_indices() -> Dict[str, Any]:
     """Get current values for major Indian market indices"""
     cache_key = "market_indices"
     
-    if is_cache_valid(cache_key):
-        return _price_cache.get(cache_key, {})
+    cached = await _cache_get(cache_key)
+    if cached is not None:
+        MARKET_CACHE_HITS.inc(cache="indices")
+        return cached
     
+    MARKET_CACHE_MISSES.inc(cache="indices")
+    indices = await _single_flight(
+        cache_key, "indices", CACHE_TTL_SECONDS, _fetch_market_indices
+    )
+    return indices or {}
+
+
+async def _fetch_market_indices() -> Optional[Dict[str, Any]]:
+    """Fetch index levels from Yahoo Finance"""
     try:
         import yfinance as yf
         
@@ -250,7 +391,7 @@ async def get_market_indices() -> Dict[str, Any]:
         for name, yahoo_symbol in INDIAN_INDICES.items():
             try:
                 ticker = yf.Ticker(yahoo_symbol)
-                info = ticker.info
+                info = await _yf_call("index", lambda: ticker.info)
                 
                 current_price = info.get("regularMarketPrice", 0)
                 previous_close = info.get("regularMarketPreviousClose", 0)
@@ -273,18 +414,14 @@ async def get_market_indices() -> Dict[str, Any]:
                     "error": str(e)
                 }
         
-        # Cache the result
-        _price_cache[cache_key] = indices_data
-        _cache_timestamps[cache_key] = datetime.now()
-        
         return indices_data
         
     except ImportError:
         logger.error("yfinance not installed")
-        return {}
+        return None
     except Exception as e:
         logger.error(f"Error fetching market indices: {str(e)}")
-        return {}
+        return None
 
 
 async def get_bulk_quotes(symbols: List[str]) -> Dict[str, Dict]:
@@ -302,7 +439,7 @@ async def get_bulk_quotes(symbols: List[str]) -> Dict[str, Dict]:
         for i, symbol in enumerate(symbols):
             yahoo_sym = yahoo_symbols[i]
             try:
-                info = tickers.tickers[yahoo_sym].info
+                info = await _yf_call("bulk_quote", lambda: tickers.tickers[yahoo_sym].info)
                 
                 current_price = info.get("regularMarketPrice", 0)
                 previous_close = info.get("regularMarketPreviousClose", 0)
@@ -335,15 +472,26 @@ async def get_stock_fundamentals(symbol: str) -> Optional[Dict[str, Any]]:
     """Get fundamental data for a stock"""
     cache_key = f"fundamentals_{symbol}"
     
-    if is_cache_valid(cache_key, HISTORICAL_CACHE_TTL):
-        return _price_cache.get(cache_key)
+    cached = await _cache_get(cache_key)
+    if cached is not None:
+        MARKET_CACHE_HITS.inc(cache="fundamentals")
+        return cached
     
+    MARKET_CACHE_MISSES.inc(cache="fundamentals")
+    return await _single_flight(
+        cache_key, "fundamentals", HISTORICAL_CACHE_TTL,
+        lambda: _fetch_stock_fundamentals(symbol)
+    )
+
+
+async def _fetch_stock_fundamentals(symbol: str) -> Optional[Dict[str, Any]]:
+    """Fetch fundamentals from Yahoo Finance"""
     try:
         import yfinance as yf
         
         yahoo_symbol = get_yahoo_symbol(symbol)
         ticker = yf.Ticker(yahoo_symbol)
-        info = ticker.info
+        info = await _yf_call("fundamentals", lambda: ticker.info)
         
         fundamentals = {
             "symbol": symbol,
@@ -363,10 +511,6 @@ async def get_stock_fundamentals(symbol: str) -> Optional[Dict[str, Any]]:
             "operating_cash_flow": info.get("operatingCashflow", 0),
         }
         
-        # Cache the result
-        _price_cache[cache_key] = fundamentals
-        _cache_timestamps[cache_key] = datetime.now()
-        
         return fundamentals
         
     except ImportError:
@@ -386,9 +530,9 @@ async def get_stock_financials(symbol: str) -> Optional[Dict[str, Any]]:
         ticker = yf.Ticker(yahoo_symbol)
         
         # Get financial statements
-        income_stmt = ticker.income_stmt
-        balance_sheet = ticker.balance_sheet
-        cash_flow = ticker.cashflow
+        income_stmt, balance_sheet, cash_flow = await _yf_call(
+            "financials", lambda: (ticker.income_stmt, ticker.balance_sheet, ticker.cashflow)
+        )
         
         return {
             "income_statement": income_stmt.to_dict() if not income_stmt.empty else {},
@@ -401,11 +545,9 @@ async def get_stock_financials(symbol: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def clear_cache():
-    """Clear all cached data"""
-    global _price_cache, _cache_timestamps
-    _price_cache = {}
-    _cache_timestamps = {}
+async def clear_cache():
+    """Clear all cached market data"""
+    await state.get_state_backend().clear("market:")
     logger.info("Cache cleared")
 
 
@@ -416,9 +558,5 @@ def get_available_symbols() -> List[str]:
 
 # Check if real data service is available
 def is_real_data_available() -> bool:
-    """Check if yfinance is installed and working"""
-    try:
-        import yfinance
-        return True
-    except ImportError:
-        return False
+    """Check if yfinance is installed (without importing it and pandas)"""
+    return is_installed("yfinance")
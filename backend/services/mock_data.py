@@ -48,19 +48,20 @@ INDIAN_STOCKS = [
 ]
 
 
-def generate_price_history(base_price: float, days: int = 365) -> List[Dict]:
-    """Generate realistic price history"""
+def generate_price_history(base_price: float, days: int = 365, seed=None) -> List[Dict]:
+    """Generate realistic price history (the same history for the same seed)"""
+    rng = random.Random(seed) if seed is not None else random
     prices = []
-    current_price = base_price * random.uniform(0.7, 0.9)
+    current_price = base_price * rng.uniform(0.7, 0.9)
     
     for i in range(days):
         date = (datetime.now() - timedelta(days=days-i)).strftime("%Y-%m-%d")
-        daily_return = random.gauss(0.0005, 0.02)  # Mean 0.05% daily, 2% std dev
+        daily_return = rng.gauss(0.0005, 0.02)  # Mean 0.05% daily, 2% std dev
         current_price = current_price * (1 + daily_return)
         
-        high = current_price * random.uniform(1.0, 1.03)
-        low = current_price * random.uniform(0.97, 1.0)
-        open_price = random.uniform(low, high)
+        high = current_price * rng.uniform(1.0, 1.03)
+        low = current_price * rng.uniform(0.97, 1.0)
+        open_price = rng.uniform(low, high)
         
         prices.append({
             "date": date,
@@ -68,7 +69,7 @@ def generate_price_history(base_price: float, days: int = 365) -> List[Dict]:
             "high": round(high, 2),
             "low": round(low, 2),
             "close": round(current_price, 2),
-            "volume": random.randint(100000, 50000000)
+            "volume": rng.randint(100000, 50000000)
         })
     
     return prices
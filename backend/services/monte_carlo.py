@@ -0,0 +1,135 @@
+"""
+Monte Carlo Service for StockPulse
+Resamples a finished backtest's closed-trade returns or blocks of its daily
+returns into thousands of alternative paths, and reports percentile bands
+of their final value, maximum drawdown and Sharpe ratio
+"""
+
+import logging
+import math
+import os
+import time
+from typing import Any, Dict, Iterator, Tuple
+
+import numpy as np
+
+from models.backtest_models import MonteCarloConfig, MonteCarloMethod
+from services.performance_metrics import PERIODS_PER_YEAR
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on one (paths x bars) block of returns; paths are simulated in chunks below it
+MONTE_CARLO_CHUNK_ELEMENTS = int(os.environ.get("MONTE_CARLO_CHUNK_ELEMENTS", "1000000"))
+
+MONTE_CARLO_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def bootstrap_blocks(
+    returns: np.ndarray, paths: int, block_size: int, rng: np.random.Generator
+) -> np.ndarray:
+    """
+    (paths x len(returns)) matrix of circular block-bootstrapped returns.
+
+    Each path strings together blocks of block_size consecutive returns
+    from random starting bars, wrapping past the end, so short-range
+    autocorrelation such as volatility clustering survives the resampling.
+    """
+    bars = len(returns)
+    block_size = min(block_size, bars)
+    blocks = math.ceil(bars / block_size)
+    starts = rng.integers(0, bars, size=(paths, blocks, 1))
+    index = (starts + np.arange(block_size)) % bars
+    return returns[index.reshape(paths, blocks * block_size)[:, :bars]]
+
+
+def resample_trades(returns: np.ndarray, paths: int, rng: np.random.Generator) -> np.ndarray:
+    """(paths x trades) matrix of trade returns drawn with replacement"""
+    return returns[rng.integers(0, len(returns), size=(paths, len(returns)))]
+
+
+def path_statistics(
+    returns: np.ndarray, initial_capital: float, periods_per_year: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Final value, max drawdown (percent) and annualized Sharpe of every path.
+
+    Works in place on returns, which becomes the paths' growth factors.
+    """
+    mean = returns.mean(axis=1)
+    deviation = returns.std(axis=1)
+    sharpe = np.divide(mean, deviation, out=np.zeros_like(mean), where=deviation > 0) * np.sqrt(periods_per_year)
+
+    growth = np.cumprod(np.add(returns, 1.0, out=returns), axis=1, out=returns)
+    final_value = initial_capital * growth[:, -1]
+    # Peaks start at the initial capital, as for the backtest's own drawdown
+    peaks = np.maximum(np.maximum.accumulate(growth, axis=1), 1.0)
+    max_drawdown = ((peaks - growth) / peaks).max(axis=1) * 100
+    return final_value, max_drawdown, sharpe
+
+
+def _chunks(total: int, bars: int) -> Iterator[int]:
+    rows = max(1, MONTE_CARLO_CHUNK_ELEMENTS // max(1, bars))
+    for start in range(0, total, rows):
+        yield min(rows, total - start)
+
+
+def _bands(values: np.ndarray) -> Dict[str, float]:
+    percentiles = np.percentile(values, MONTE_CARLO_PERCENTILES)
+    return {f"p{p}": round(float(v), 2) for p, v in zip(MONTE_CARLO_PERCENTILES, percentiles)}
+
+
+def monte_carlo_bands(
+    config: MonteCarloConfig,
+    equity: np.ndarray,
+    trade_returns: np.ndarray,
+    initial_capital: float,
+) -> Dict[str, Any]:
+    """
+    Percentile bands over config.simulations resampled paths of a backtest.
+
+    Block bootstrap resamples the equity curve's bar-to-bar returns and
+    keeps the backtest's length; trade resampling reorders (with
+    replacement) the returns of closed round trips, one step per trade,
+    with Sharpe annualized by the backtest's trades per year.
+    """
+    rng = np.random.default_rng(config.seed)
+    by_trade = config.method == MonteCarloMethod.TRADES
+    if by_trade:
+        if len(trade_returns) == 0:
+            raise ValueError("Monte Carlo trade resampling needs at least one closed trade")
+        source = np.asarray(trade_returns, dtype=float)
+        periods_per_year = len(source) / (len(equity) / PERIODS_PER_YEAR)
+    else:
+        if len(equity) < 2:
+            raise ValueError("Monte Carlo bootstrap needs at least two bars")
+        levels = np.concatenate(([initial_capital], equity))
+        source = np.diff(levels) / levels[:-1]
+        periods_per_year = PERIODS_PER_YEAR
+
+    start = time.perf_counter()
+    final_values, drawdowns, sharpes = [], [], []
+    for paths in _chunks(config.simulations, len(source)):
+        if by_trade:
+            sample = resample_trades(source, paths, rng)
+        else:
+            sample = bootstrap_blocks(source, paths, config.block_size, rng)
+        final_value, max_drawdown, sharpe = path_statistics(sample, initial_capital, periods_per_year)
+        final_values.append(final_value)
+        drawdowns.append(max_drawdown)
+        sharpes.append(sharpe)
+    final_value = np.concatenate(final_values)
+
+    logger.info(
+        f"Monte Carlo ({config.method.value}): {config.simulations} paths x {len(source)} steps "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    return {
+        "method": config.method.value,
+        "simulations": config.simulations,
+        "steps": len(source),
+        "block_size": None if by_trade else min(config.block_size, len(source)),
+        "final_value": _bands(final_value),
+        "max_drawdown": _bands(np.concatenate(drawdowns)),
+        "sharpe_ratio": _bands(np.concatenate(sharpes)),
+        "probability_of_loss": round(float((final_value < initial_capital).mean() * 100), 2),
+    }
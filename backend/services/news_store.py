@@ -0,0 +1,182 @@
+"""
+News Store for StockPulse
+In-memory news index: items are ingested once, deduplicated and identified
+by content hash, and served from inverted indexes by related symbol and
+sentiment, newest first, with cursor pagination and running sentiment counts
+"""
+
+import base64
+import bisect
+import hashlib
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SENTIMENTS = ("POSITIVE", "NEGATIVE", "NEUTRAL")
+PUBLISHED_DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+# Posting key: (published timestamp, content hash); lists are kept sorted ascending
+PostingKey = Tuple[float, str]
+
+
+def content_hash(item: Dict[str, Any]) -> str:
+    """Hash of the fields that identify a story, ignoring feed-assigned ids and urls"""
+    parts = [
+        item.get("title", "").strip().lower(),
+        item.get("summary", "").strip().lower(),
+        item.get("source", "").strip().lower(),
+    ]
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _published_ts(item: Dict[str, Any]) -> float:
+    try:
+        return datetime.strptime(item["published_date"], PUBLISHED_DATE_FORMAT).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
+def encode_cursor(key: PostingKey) -> str:
+    return base64.urlsafe_b64encode(f"{key[0]!r}|{key[1]}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> PostingKey:
+    """Inverse of encode_cursor; raises ValueError for a malformed cursor"""
+    try:
+        ts, digest = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return float(ts), digest
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class NewsStore:
+    """
+    Deduplicating news index.
+
+    Every posting list (the global timeline plus one per symbol and per
+    sentiment) holds (published_ts, hash) keys in sorted order, so a query is
+    a reverse walk from the cursor position over the smallest matching list.
+    When max_items is exceeded the oldest stories are evicted.
+    """
+
+    def __init__(self, max_items: int = 50000):
+        self.max_items = max_items
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._timeline: List[PostingKey] = []
+        self._by_symbol: Dict[str, List[PostingKey]] = {}
+        self._by_sentiment: Dict[str, List[PostingKey]] = {}
+        self._sentiment_counts: Counter = Counter()
+        self.last_ingested_at: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def ingest(self, items: Iterable[Dict[str, Any]]) -> int:
+        """Add new stories; returns how many were not already stored"""
+        added = 0
+        for item in items:
+            digest = content_hash(item)
+            if digest in self._items:
+                continue
+
+            # Feeds reuse ids for different stories; the content hash is stable
+            item = {**item, "id": f"news_{digest[:16]}"}
+            key = (_published_ts(item), digest)
+            sentiment = item.get("sentiment", "NEUTRAL").upper()
+            self._items[digest] = item
+            bisect.insort(self._timeline, key)
+            bisect.insort(self._by_sentiment.setdefault(sentiment, []), key)
+            for symbol in item.get("related_stocks", []):
+                bisect.insort(self._by_symbol.setdefault(symbol.upper(), []), key)
+            self._sentiment_counts[sentiment] += 1
+            added += 1
+
+        while len(self._items) > self.max_items:
+            self._evict_oldest()
+
+        self.last_ingested_at = datetime.now()
+        if added:
+            logger.info(f"Ingested {added} news items ({len(self._items)} stored)")
+        return added
+
+    def _evict_oldest(self):
+        key = self._timeline.pop(0)
+        item = self._items.pop(key[1])
+        sentiment = item.get("sentiment", "NEUTRAL").upper()
+        self._remove_posting(self._by_sentiment, sentiment, key)
+        for symbol in item.get("related_stocks", []):
+            self._remove_posting(self._by_symbol, symbol.upper(), key)
+        self._sentiment_counts[sentiment] -= 1
+
+    @staticmethod
+    def _remove_posting(index: Dict[str, List[PostingKey]], name: str, key: PostingKey):
+        postings = index.get(name)
+        if not postings:
+            return
+        position = bisect.bisect_left(postings, key)
+        if position < len(postings) and postings[position] == key:
+            postings.pop(position)
+        if not postings:
+            del index[name]
+
+    def query(
+        self,
+        symbol: Optional[str] = None,
+        sentiment: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Newest stories matching the filters, starting after cursor.
+
+        Returns the page and the cursor for the next page (None at the end).
+        Raises ValueError for a malformed cursor.
+        """
+        candidates = [self._timeline]
+        if symbol:
+            candidates.append(self._by_symbol.get(symbol.upper(), []))
+        if sentiment:
+            candidates.append(self._by_sentiment.get(sentiment.upper(), []))
+        postings = min(candidates, key=len)
+
+        symbol = symbol.upper() if symbol else None
+        sentiment = sentiment.upper() if sentiment else None
+
+        end = len(postings)
+        if cursor:
+            end = bisect.bisect_left(postings, decode_cursor(cursor))
+
+        page: List[Dict[str, Any]] = []
+        last_key = None
+        position = end - 1
+        while position >= 0 and len(page) < limit:
+            key = postings[position]
+            item = self._items[key[1]]
+            if self._matches(item, symbol, sentiment):
+                page.append(item)
+                last_key = key
+            position -= 1
+
+        has_more = position >= 0 and last_key is not None
+        return page, encode_cursor(last_key) if has_more else None
+
+    @staticmethod
+    def _matches(item: Dict[str, Any], symbol: Optional[str], sentiment: Optional[str]) -> bool:
+        if symbol and symbol not in {s.upper() for s in item.get("related_stocks", [])}:
+            return False
+        if sentiment and item.get("sentiment", "").upper() != sentiment:
+            return False
+        return True
+
+    def latest(self, limit: int) -> List[Dict[str, Any]]:
+        return [self._items[key[1]] for key in reversed(self._timeline[-limit:])]
+
+    def sentiment_counts(self) -> Dict[str, int]:
+        return {s: self._sentiment_counts.get(s, 0) for s in SENTIMENTS}
+
+
+# Global instance
+news_store = NewsStore()
@@ -0,0 +1,152 @@
+"""
+PDF Report Cache for StockPulse
+Content-addressed on-disk cache of rendered PDF reports, keyed by report
+type, symbols, a hash of the input data and the date, with least-recently
+used eviction under a total size budget
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+PDF_CACHE_ENABLED = os.environ.get("PDF_CACHE_ENABLED", "true").lower() == "true"
+PDF_CACHE_DIR = os.environ.get("PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "stockpulse_pdf_cache"))
+PDF_CACHE_MAX_BYTES = int(os.environ.get("PDF_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+PDF_CACHE_LOOKUPS = registry.counter(
+    "stockpulse_pdf_cache_lookups_total",
+    "PDF report cache lookups by result (hit, miss)",
+    ("result",),
+)
+PDF_CACHE_BYTES = registry.gauge(
+    "stockpulse_pdf_cache_bytes",
+    "Total size of cached PDF reports",
+)
+
+
+def snapshot_hash(data: Any) -> str:
+    """Stable hash of the data a report is rendered from"""
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def report_cache_key(report_type: str, symbols: List[str], data_hash: str, day: Optional[date] = None) -> str:
+    """Content address of a report; also used as its ETag"""
+    day = day or date.today()
+    parts = [report_type, ",".join(s.upper() for s in symbols), data_hash, day.isoformat()]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class PDFCache:
+    """
+    On-disk PDF cache with an in-memory LRU index.
+
+    Files are written atomically, so a concurrent reader sees either nothing
+    or a complete PDF. The index is rebuilt from the directory (oldest
+    modification first) on first use; processes sharing the directory each
+    enforce the budget against their own view and tolerate files another
+    process has already evicted.
+    """
+
+    def __init__(self, directory: str = PDF_CACHE_DIR, max_bytes: int = PDF_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.pdf"
+
+    def _load(self):
+        if self._loaded:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for path in self.directory.glob("*.pdf"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total += size
+        self._loaded = True
+        PDF_CACHE_BYTES.set(self._total)
+
+    def _drop(self, key: str):
+        self._total -= self._index.pop(key, 0)
+
+    def get(self, key: str) -> Optional[Path]:
+        """Path of the cached report for key, or None on a miss"""
+        with self._lock:
+            self._load()
+            path = self._path(key)
+            if key in self._index and path.exists():
+                self._index.move_to_end(key)
+                try:
+                    # Keeps recency across restarts, when the index is rebuilt from mtimes
+                    os.utime(path)
+                except OSError:
+                    pass
+                PDF_CACHE_LOOKUPS.inc(result="hit")
+                return path
+
+            self._drop(key)
+            PDF_CACHE_LOOKUPS.inc(result="miss")
+            return None
+
+    def put(self, key: str, pdf_bytes: bytes) -> Path:
+        """Store a rendered report and evict least recently used ones over budget"""
+        with self._lock:
+            self._load()
+            path = self._path(key)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(pdf_bytes)
+            os.replace(tmp_path, path)
+
+            self._drop(key)
+            self._index[key] = len(pdf_bytes)
+            self._total += len(pdf_bytes)
+            self._evict()
+            PDF_CACHE_BYTES.set(self._total)
+            return path
+
+    def _evict(self):
+        # Never evict the entry just written, even if it alone exceeds the budget
+        while self._total > self.max_bytes and len(self._index) > 1:
+            key, _ = next(iter(self._index.items()))
+            self._drop(key)
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+            logger.debug(f"Evicted cached PDF {key}")
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            self._load()
+            return {
+                "enabled": PDF_CACHE_ENABLED,
+                "directory": str(self.directory),
+                "entries": len(self._index),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Global instance
+pdf_cache = PDFCache()
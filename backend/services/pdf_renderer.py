@@ -0,0 +1,196 @@
+"""
+PDF Renderer for StockPulse
+Runs ReportLab report builds in a pool of worker processes, so CPU-bound
+rendering never blocks the event loop, with a per-render timeout and
+styles warmed once per worker
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+PDF_RENDER_WORKERS = int(os.environ.get("PDF_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_RENDER_TIMEOUT_SECONDS = float(os.environ.get("PDF_RENDER_TIMEOUT_SECONDS", "30"))
+
+# Report type -> pdf_service function rendering it
+RENDERERS = {
+    "single_stock": "generate_single_stock_pdf",
+    "comparison": "generate_comparison_pdf",
+    "portfolio_health": "generate_portfolio_health_pdf",
+}
+
+# Stock fields the report templates read; everything else (price history,
+# checklists, deal-breaker tables) is dropped before crossing to a worker
+STOCK_REPORT_FIELDS = (
+    "symbol", "name", "sector", "current_price", "price_change_percent",
+    "fundamentals", "valuation", "technicals", "analysis", "ml_prediction", "llm_insight",
+)
+ANALYSIS_REPORT_FIELDS = (
+    "long_term_score", "short_term_score", "verdict", "confidence_level",
+    "score_breakdown", "fundamental_score", "technical_score", "risk_level",
+)
+
+PDF_RENDER_SECONDS = registry.histogram(
+    "stockpulse_pdf_render_duration_seconds",
+    "Time to render a PDF report in the worker pool, including queueing",
+    ("report_type",),
+)
+PDF_RENDER_FAILURES = registry.counter(
+    "stockpulse_pdf_render_failures_total",
+    "PDF renders that failed, by report type and reason (timeout, error, broken_pool)",
+    ("report_type", "reason"),
+)
+
+
+class PDFRenderTimeout(TimeoutError):
+    """A render did not finish within the pool's timeout"""
+
+
+def _stock_payload(stock: Dict[str, Any]) -> Dict[str, Any]:
+    payload = {field: stock[field] for field in STOCK_REPORT_FIELDS if field in stock}
+    if "analysis" in payload:
+        payload["analysis"] = {
+            field: stock["analysis"][field] for field in ANALYSIS_REPORT_FIELDS if field in stock["analysis"]
+        }
+    return payload
+
+
+def to_render_payload(report_type: str, data: Any) -> Any:
+    """
+    Reduce report data to the plain JSON input a worker renders from.
+    
+    Stocks are trimmed to the fields the templates read, and datetimes,
+    ObjectIds and similar values become strings, so every payload pickles
+    cheaply and renders the same way in any worker.
+    """
+    if report_type == "single_stock":
+        data = _stock_payload(data)
+    elif report_type == "comparison":
+        data = [_stock_payload(stock) for stock in data]
+    return json.loads(json.dumps(data, default=str))
+
+
+def _warm_worker():
+    """Pool initializer: import ReportLab and build the shared styles once"""
+    from services import pdf_service
+    
+    pdf_service._get_styles()
+    # Exercise font metrics and the platypus layout path on a throwaway document
+    pdf_service.generate_portfolio_health_pdf({"portfolio": {"holdings": []}})
+
+
+def _render(report_type: str, payload: Any) -> bytes:
+    """Worker entry point"""
+    from services import pdf_service
+    
+    return getattr(pdf_service, RENDERERS[report_type])(payload)
+
+
+class PDFRenderPool:
+    """
+    Process pool for PDF rendering.
+    
+    Workers start on first use (spawned, so they never inherit the server's
+    threads or event loop). A render that exceeds the timeout cannot be
+    interrupted inside its worker, so the pool is torn down and rebuilt;
+    renders in flight at that moment fail and may be retried.
+    """
+    
+    def __init__(self, workers: int = PDF_RENDER_WORKERS, timeout: float = PDF_RENDER_TIMEOUT_SECONDS):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.renders = 0
+        self.restarts = 0
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+            logger.info(f"Started PDF render pool with {self.workers} workers")
+        return self._executor
+    
+    def _restart(self):
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        self.restarts += 1
+        # Stuck workers never return, so stop them rather than waiting
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def start(self) -> int:
+        """Spawn and warm every worker up front; returns how many answered"""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        # Submitting one task per worker at once makes the executor spawn them all
+        pids = await asyncio.gather(*[
+            loop.run_in_executor(executor, os.getpid) for _ in range(self.workers)
+        ])
+        return len(set(pids))
+    
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """Run a picklable module-level function in the pool under the timeout"""
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._get_executor(), fn, *args)
+        try:
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self._restart()
+            raise PDFRenderTimeout(f"PDF render exceeded {timeout or self.timeout:.0f}s")
+        except BrokenProcessPool:
+            self._restart()
+            raise
+    
+    async def render(self, report_type: str, data: Any, timeout: Optional[float] = None) -> bytes:
+        """Render a report of report_type from data, returning the PDF bytes"""
+        if report_type not in RENDERERS:
+            raise ValueError(f"Unknown report type: {report_type}")
+        
+        payload = to_render_payload(report_type, data)
+        try:
+            with PDF_RENDER_SECONDS.time(report_type=report_type):
+                pdf_bytes = await self.run(_render, report_type, payload, timeout=timeout)
+        except PDFRenderTimeout:
+            PDF_RENDER_FAILURES.inc(report_type=report_type, reason="timeout")
+            raise
+        except BrokenProcessPool:
+            PDF_RENDER_FAILURES.inc(report_type=report_type, reason="broken_pool")
+            raise
+        except Exception:
+            PDF_RENDER_FAILURES.inc(report_type=report_type, reason="error")
+            raise
+        
+        self.renders += 1
+        return pdf_bytes
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "timeout_seconds": self.timeout,
+            "started": self._executor is not None,
+            "renders": self.renders,
+            "restarts": self.restarts,
+        }
+    
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global instance
+pdf_render_pool = PDFRenderPool()
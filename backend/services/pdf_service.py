@@ -7,7 +7,9 @@ Uses ReportLab for PDF generation
 import io
 import logging
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
+from xml.sax.saxutils import escape
 
 logger = logging.getLogger(__name__)
 
@@ -46,8 +48,9 @@ def is_pdf_available() -> bool:
     return PDF_AVAILABLE
 
 
+@lru_cache(maxsize=1)
 def _get_styles():
-    """Get custom paragraph styles"""
+    """Get custom paragraph styles (built once per process; treat as read-only)"""
     styles = getSampleStyleSheet()
     
     # Custom title style
@@ -290,7 +293,8 @@ def generate_single_stock_pdf(stock_data: Dict[str, Any]) -> bytes:
         story.append(Paragraph("AI-Powered Insight", styles['SectionHeader']))
         story.append(HRFlowable(color=COLORS["primary"], width="100%", thickness=1))
         story.append(Spacer(1, 10))
-        story.append(Paragraph(llm_insight, styles['Normal']))
+        # Paragraph parses markup, so escape text such as "D/E < 0.5" and keep line breaks
+        story.append(Paragraph(escape(llm_insight).replace("\n", "<br/>"), styles['Normal']))
         story.append(Spacer(1, 20))
     
     # Footer
@@ -308,6 +312,22 @@ def generate_single_stock_pdf(stock_data: Dict[str, Any]) -> bytes:
     return buffer.getvalue()
 
 
+def _append_insights(story: List, styles, title: str, insights: Dict[str, Any]):
+    """Section with one LLM insight per symbol, skipping symbols without one"""
+    insights = {symbol: text for symbol, text in insights.items() if text}
+    if not insights:
+        return
+    
+    story.append(Paragraph(title, styles['SectionHeader']))
+    story.append(HRFlowable(color=COLORS["primary"], width="100%", thickness=1))
+    story.append(Spacer(1, 10))
+    for symbol, text in insights.items():
+        story.append(Paragraph(f"<b>{escape(symbol)}</b>", styles['Normal']))
+        story.append(Paragraph(escape(text).replace("\n", "<br/>"), styles['Normal']))
+        story.append(Spacer(1, 10))
+    story.append(Spacer(1, 10))
+
+
 def generate_comparison_pdf(stocks_data: List[Dict[str, Any]]) -> bytes:
     """Generate PDF report comparing multiple stocks"""
     if not PDF_AVAILABLE:
@@ -373,6 +393,10 @@ def generate_comparison_pdf(stocks_data: List[Dict[str, Any]]) -> bytes:
     story.append(comparison_table)
     story.append(Spacer(1, 30))
     
+    # LLM insights (if available)
+    insights = {stock.get("symbol", ""): stock.get("llm_insight") for stock in stocks_data}
+    _append_insights(story, styles, "AI-Powered Insights", insights)
+    
     # Footer
     story.append(HRFlowable(color=colors.grey, width="100%", thickness=0.5))
     story.append(Spacer(1, 10))
@@ -495,6 +519,9 @@ def generate_portfolio_health_pdf(portfolio_data: Dict[str, Any]) -> bytes:
             story.append(Paragraph(f"• {rec}", styles['Normal']))
         story.append(Spacer(1, 20))
     
+    # LLM insights per holding (if available)
+    _append_insights(story, styles, "AI Holding Insights", portfolio_data.get("insights", {}))
+    
     # Footer
     story.append(Spacer(1, 40))
     story.append(HRFlowable(color=colors.grey, width="100%", thickness=0.5))
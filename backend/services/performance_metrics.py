@@ -0,0 +1,168 @@
+"""
+Performance Metrics Service for StockPulse
+Vectorized return, risk and trade statistics computed from an equity array
+and executed-trade arrays, used by single backtests, parameter sweeps,
+walk-forward windows and batch portfolios alike
+"""
+
+from typing import Any, Dict, NamedTuple
+
+import numpy as np
+
+# Bars per year for annualizing daily statistics
+PERIODS_PER_YEAR = 252
+
+
+class RoundTrips(NamedTuple):
+    """Closed positions as parallel arrays: entry and exit bar, profit or loss and return on cost"""
+    entry_bars: np.ndarray
+    exit_bars: np.ndarray
+    pnl: np.ndarray
+    returns: np.ndarray
+
+
+def drawdown_series(equity: np.ndarray, initial_capital: float) -> np.ndarray:
+    """Percent below the running peak (starting from initial_capital) at every bar"""
+    peaks = np.maximum.accumulate(np.concatenate(([initial_capital], equity)))[1:]
+    return (peaks - equity) / peaks * 100
+
+
+def max_drawdown_duration(drawdown: np.ndarray) -> int:
+    """Longest stretch of consecutive bars spent below a previous peak"""
+    bars = np.arange(len(drawdown))
+    # Bars spent underwater since the last bar at a peak
+    last_peak = np.maximum.accumulate(np.where(drawdown <= 0, bars, -1))
+    return int((bars - last_peak).max()) if len(drawdown) else 0
+
+
+def equity_metrics(
+    equity: np.ndarray, initial_capital: float, periods_per_year: int = PERIODS_PER_YEAR
+) -> Dict[str, Any]:
+    """
+    Return and risk statistics of an equity array.
+
+    Drawdown is measured from a running maximum that starts at
+    initial_capital; ratios are annualized from per-bar returns.
+    """
+    if len(equity) == 0:
+        return {
+            "total_return": 0.0,
+            "total_return_percent": 0.0,
+            "annualized_return": 0.0,
+            "max_drawdown": 0.0,
+            "max_drawdown_duration": 0,
+            "volatility": 0.0,
+            "sharpe_ratio": 0.0,
+            "sortino_ratio": 0.0,
+            "calmar_ratio": 0.0,
+        }
+
+    final_value = float(equity[-1])
+    years = len(equity) / periods_per_year
+    growth = final_value / initial_capital
+    annualized_return = (growth ** (1 / years) - 1) * 100 if growth > 0 else 0.0
+
+    drawdown = drawdown_series(equity, initial_capital)
+    max_drawdown = float(drawdown.max())
+
+    returns = np.diff(equity) / equity[:-1]
+    mean = returns.mean() if len(returns) else 0.0
+    deviation = returns.std() if len(returns) else 0.0
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2)) if len(returns) else 0.0
+    scale = np.sqrt(periods_per_year)
+
+    return {
+        "total_return": round(final_value - initial_capital, 2),
+        "total_return_percent": round((growth - 1) * 100, 2),
+        "annualized_return": round(annualized_return, 2),
+        "max_drawdown": round(max_drawdown, 2),
+        "max_drawdown_duration": max_drawdown_duration(drawdown),
+        "volatility": round(float(deviation * scale * 100), 2),
+        "sharpe_ratio": round(float(mean / deviation * scale), 2) if deviation > 0 else 0.0,
+        "sortino_ratio": round(float(mean / downside * scale), 2) if downside > 0 else 0.0,
+        "calmar_ratio": round(annualized_return / max_drawdown, 2) if max_drawdown > 0 else 0.0,
+    }
+
+
+def round_trips(
+    trade_bars: np.ndarray,
+    trade_is_buy: np.ndarray,
+    trade_quantities: np.ndarray,
+    trade_values: np.ndarray,
+) -> RoundTrips:
+    """
+    Pair each sell with the buy that opened the position it closes.
+
+    A sell closes the most recent buy after the previous sell; a sell with
+    no open buy is ignored, as is a position still open at the end. A
+    partial exit books the matching share of the entry cost.
+    """
+    index = np.arange(len(trade_bars))
+    sells = np.flatnonzero(~trade_is_buy)
+    last_buy = np.maximum.accumulate(np.where(trade_is_buy, index, -1))[sells]
+    previous_sell = np.concatenate(([-1], sells[:-1]))
+    closed = last_buy > previous_sell
+    sells, entries = sells[closed], last_buy[closed]
+
+    entry_cost = trade_values[entries] * trade_quantities[sells] / trade_quantities[entries]
+    pnl = trade_values[sells] - entry_cost
+    return RoundTrips(
+        entry_bars=trade_bars[entries],
+        exit_bars=trade_bars[sells],
+        pnl=pnl,
+        returns=pnl / entry_cost,
+    )
+
+
+def trade_metrics(
+    trips: RoundTrips,
+    bars: int,
+    trade_values: np.ndarray,
+    equity: np.ndarray,
+    open_entry_bar: int = -1,
+) -> Dict[str, Any]:
+    """
+    Win/loss statistics of closed round trips, plus exposure and turnover.
+
+    Exposure is the percent of bars that closed holding a position
+    (open_entry_bar marks one still open at the end). Turnover is the
+    value traded, buys and sells, over the average equity.
+    """
+    wins = trips.pnl[trips.pnl > 0]
+    losses = -trips.pnl[trips.pnl <= 0]
+    total_trades = len(trips.pnl)
+
+    held = int((trips.exit_bars - trips.entry_bars).sum())
+    if open_entry_bar >= 0:
+        held += bars - open_entry_bar
+    average_equity = float(equity.mean()) if len(equity) else 0.0
+
+    return {
+        "total_trades": total_trades,
+        "winning_trades": len(wins),
+        "losing_trades": len(losses),
+        "win_rate": round(len(wins) / total_trades * 100, 2) if total_trades else 0.0,
+        "avg_win": round(float(wins.mean()), 2) if len(wins) else 0.0,
+        "avg_loss": round(float(losses.mean()), 2) if len(losses) else 0.0,
+        "profit_factor": round(float(wins.sum() / losses.sum()), 2) if losses.sum() > 0 else 0.0,
+        "exposure_percent": round(held / bars * 100, 2) if bars else 0.0,
+        "turnover": round(float(trade_values.sum()) / average_equity, 2) if average_equity > 0 else 0.0,
+    }
+
+
+def performance_metrics(
+    equity: np.ndarray,
+    trade_bars: np.ndarray,
+    trade_is_buy: np.ndarray,
+    trade_quantities: np.ndarray,
+    trade_values: np.ndarray,
+    initial_capital: float,
+    periods_per_year: int = PERIODS_PER_YEAR,
+) -> Dict[str, Any]:
+    """Every equity and trade metric of one simulated run"""
+    trips = round_trips(trade_bars, trade_is_buy, trade_quantities, trade_values)
+    open_entry_bar = int(trade_bars[-1]) if len(trade_bars) and trade_is_buy[-1] else -1
+    return {
+        **equity_metrics(equity, initial_capital, periods_per_year),
+        **trade_metrics(trips, len(equity), trade_values, equity, open_entry_bar),
+    }
@@ -0,0 +1,266 @@
+"""
+Request Profiling Service for StockPulse
+Opt-in statistical profiler for individual HTTP requests with a bounded
+ring buffer of slow-request call-tree profiles
+"""
+
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from services.admin_auth import ADMIN_TOKEN_HEADER, is_admin_token
+
+logger = logging.getLogger(__name__)
+
+# Master switch: when false the middleware is never installed, so requests pay nothing
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() == "true"
+# Fraction of requests profiled at random (0 disables sampling)
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+# Profiled requests slower than this are kept in the ring buffer
+PROFILE_SLOW_THRESHOLD_MS = float(os.environ.get("PROFILE_SLOW_THRESHOLD_MS", "1000"))
+# Stack sampling interval
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+# Number of profiles retained
+PROFILE_BUFFER_SIZE = int(os.environ.get("PROFILE_BUFFER_SIZE", "50"))
+# Request header that forces profiling, honoured only alongside the admin token;
+# forced profiles are kept regardless of latency
+PROFILE_HEADER = b"x-profile"
+
+
+class ProfileSession:
+    """Call-tree built from stack samples of one thread while a request runs"""
+
+    def __init__(self, thread_id: int):
+        self.thread_id = thread_id
+        self.sample_count = 0
+        self._root: Dict[str, Any] = {"name": "<root>", "samples": 0, "children": {}}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def add_stack(self, frame):
+        """Fold one sampled stack (leaf frame) into the call tree"""
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+            frame = frame.f_back
+
+        with self._lock:
+            if self._closed:
+                return
+            self.sample_count += 1
+            node = self._root
+            node["samples"] += 1
+            for name in reversed(stack):
+                child = node["children"].get(name)
+                if child is None:
+                    child = {"name": name, "samples": 0, "children": {}}
+                    node["children"][name] = child
+                child["samples"] += 1
+                node = child
+
+    def close(self) -> Dict[str, Any]:
+        """Stop accepting samples and return the call tree"""
+        with self._lock:
+            self._closed = True
+            return _tree_to_list(self._root)
+
+
+def _tree_to_list(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert child dicts into sample-ordered lists for serialization"""
+    children = sorted(node["children"].values(), key=lambda c: c["samples"], reverse=True)
+    return {
+        "name": node["name"],
+        "samples": node["samples"],
+        "children": [_tree_to_list(c) for c in children],
+    }
+
+
+def collapse_tree(tree: Dict[str, Any]) -> str:
+    """Render a call tree in collapsed-stack format (flamegraph.pl / speedscope)"""
+    lines = []
+
+    def walk(node, path):
+        own = node["samples"] - sum(c["samples"] for c in node["children"])
+        if own > 0 and path:
+            lines.append(f"{';'.join(path)} {own}")
+        for child in node["children"]:
+            walk(child, path + [child["name"]])
+
+    walk(tree, [])
+    return "\n".join(lines) + "\n"
+
+
+class StackSampler:
+    """Background thread sampling the stacks of threads with active sessions"""
+
+    def __init__(self, interval_seconds: float):
+        self.interval = interval_seconds
+        self._sessions: List[ProfileSession] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, session: ProfileSession):
+        with self._lock:
+            self._sessions.append(session)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="stockpulse-profiler", daemon=True
+                )
+                self._thread.start()
+
+    def remove(self, session: ProfileSession):
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._sessions:
+                    # Exit when idle; the next add() starts a fresh thread
+                    self._thread = None
+                    return
+                sessions = list(self._sessions)
+
+            frames = sys._current_frames()
+            for session in sessions:
+                frame = frames.get(session.thread_id)
+                if frame is not None:
+                    session.add_stack(frame)
+            del frames
+
+            time.sleep(self.interval)
+
+
+class ProfileStore:
+    """Bounded in-memory ring buffer of request profiles"""
+
+    def __init__(self, maxlen: int = PROFILE_BUFFER_SIZE):
+        self._profiles: deque = deque(maxlen=maxlen)
+
+    def add(self, profile: Dict[str, Any]):
+        self._profiles.append(profile)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Profile summaries, newest first"""
+        return [
+            {k: v for k, v in p.items() if k != "tree"}
+            for p in reversed(self._profiles)
+        ]
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        for profile in self._profiles:
+            if profile["id"] == profile_id:
+                return profile
+        return None
+
+    def clear(self):
+        self._profiles.clear()
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles opted-in requests.
+
+    A request is profiled when it carries the X-Profile header together with
+    the admin token (X-Admin-Token), or is picked by PROFILE_SAMPLE_RATE. Its
+    profile is stored when it was forced by header or took longer than
+    PROFILE_SLOW_THRESHOLD_MS.
+
+    Samples come from the event loop thread, so with concurrent requests a
+    profile also shows whatever else the loop ran during the request's lifetime.
+    """
+
+    def __init__(
+        self,
+        app,
+        store: Optional[ProfileStore] = None,
+        sample_rate: Optional[float] = None,
+        slow_threshold_ms: Optional[float] = None,
+        interval_ms: Optional[float] = None,
+        admin_token: Optional[str] = None,
+    ):
+        self.app = app
+        self.admin_token = admin_token
+        self.store = store if store is not None else profile_store
+        self.sample_rate = PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.slow_threshold_ms = (
+            PROFILE_SLOW_THRESHOLD_MS if slow_threshold_ms is None else slow_threshold_ms
+        )
+        interval = PROFILE_INTERVAL_MS if interval_ms is None else interval_ms
+        self.sampler = StackSampler(interval / 1000)
+
+    def _trigger(self, scope) -> Optional[str]:
+        headers = dict(scope.get("headers", ()))
+        if headers.get(PROFILE_HEADER) not in (None, b"", b"0", b"false"):
+            token = headers.get(ADMIN_TOKEN_HEADER)
+            if is_admin_token(token.decode("latin-1") if token else None, self.admin_token):
+                return "header"
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_holder = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        session = ProfileSession(threading.get_ident())
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        self.sampler.add(session)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.sampler.remove(session)
+            duration_ms = (time.perf_counter() - start) * 1000
+            tree = session.close()
+
+            if trigger == "header" or duration_ms >= self.slow_threshold_ms:
+                route = scope.get("route")
+                self.store.add({
+                    "id": f"prof_{uuid.uuid4().hex[:12]}",
+                    "method": scope.get("method", "GET"),
+                    "path": scope.get("path", ""),
+                    "route": getattr(route, "path", None),
+                    "status": status_holder[0],
+                    "trigger": trigger,
+                    "duration_ms": round(duration_ms, 2),
+                    "started_at": started_at.isoformat(),
+                    "interval_ms": round(self.sampler.interval * 1000, 3),
+                    "sample_count": session.sample_count,
+                    "tree": tree,
+                })
+                logger.info(
+                    f"Stored profile for {scope.get('method')} {scope.get('path')} "
+                    f"({duration_ms:.0f}ms, {session.sample_count} samples)"
+                )
+
+
+# Global profile ring buffer
+profile_store = ProfileStore()
+
+
+def is_profiling_enabled() -> bool:
+    """Check if request profiling is switched on"""
+    return PROFILING_ENABLED
@@ -0,0 +1,358 @@
+"""
+Report Job Queue for StockPulse
+Background jobs that render many PDF reports in parallel, with pollable
+progress and a ZIP download that streams each PDF as soon as it is ready
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import uuid
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.metrics import registry
+from services.state_backend import get_state_backend
+
+logger = logging.getLogger(__name__)
+
+REPORT_JOB_CONCURRENCY = int(os.environ.get("REPORT_JOB_CONCURRENCY", "4"))
+REPORT_JOB_MAX_ITEMS = int(os.environ.get("REPORT_JOB_MAX_ITEMS", "500"))
+REPORT_JOB_TTL_SECONDS = int(os.environ.get("REPORT_JOB_TTL_SECONDS", "3600"))
+# Must be shared by every worker (same host or a shared volume): any worker may stream
+# the download of a job another worker rendered, reading its PDFs from this directory
+REPORT_JOB_DIR = os.environ.get("REPORT_JOB_DIR", os.path.join(tempfile.gettempdir(), "stockpulse_report_jobs"))
+# How often a download served by another worker than the job's re-reads its state
+REPORT_JOB_POLL_SECONDS = 0.5
+
+REPORT_JOB_ITEMS = registry.counter(
+    "stockpulse_report_job_items_total",
+    "Reports rendered by background jobs, by result (completed, failed)",
+    ("result",),
+)
+REPORT_JOBS_ACTIVE = registry.gauge(
+    "stockpulse_report_jobs_active",
+    "Report jobs with items still rendering",
+)
+
+# Renders one report: returns (file name inside the bundle, PDF bytes)
+RenderFn = Callable[[], Awaitable[Tuple[str, bytes]]]
+
+
+class ReportJobItem:
+    """One report of a job"""
+
+    def __init__(self, label: str, render: RenderFn):
+        self.label = label
+        self.render = render
+        self.status = "queued"
+        self.filename: Optional[str] = None
+        self.path: Optional[Path] = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"label": self.label, "status": self.status, "filename": self.filename, "error": self.error}
+
+
+class ReportJob:
+    """
+    A batch of reports rendered in the background.
+
+    Finished PDFs are written under the job's directory in completion order;
+    `completed` records that order so downloads can stream entries while
+    the rest are still rendering.
+    """
+
+    def __init__(self, items: List[ReportJobItem], directory: Path, name: str):
+        self.job_id = str(uuid.uuid4())
+        self.name = name
+        self.items = items
+        self.directory = directory / self.job_id
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+        self.completed: List[ReportJobItem] = []
+        self._changed = asyncio.Event()
+        self._used_names: set = set()
+
+    @property
+    def processed(self) -> int:
+        return sum(1 for item in self.items if item.status in ("completed", "failed"))
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for item in self.items if item.status == "failed")
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def status(self) -> str:
+        if not self.done:
+            return "running" if any(item.status != "queued" for item in self.items) else "queued"
+        if self.failed == len(self.items):
+            return "failed"
+        return "completed_with_errors" if self.failed else "completed"
+
+    def _unique_name(self, filename: str) -> str:
+        stem, suffix = os.path.splitext(filename)
+        candidate, n = filename, 1
+        while candidate in self._used_names:
+            n += 1
+            candidate = f"{stem}_{n}{suffix}"
+        self._used_names.add(candidate)
+        return candidate
+
+    def _notify(self):
+        # Wake every waiter, then arm a fresh event for the next change
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_for_change(self):
+        await self._changed.wait()
+
+    def to_dict(self, include_items: bool = True) -> Dict[str, Any]:
+        total = len(self.items)
+        end = self.finished_at or datetime.now(timezone.utc)
+        result = {
+            "job_id": self.job_id,
+            "name": self.name,
+            "status": self.status,
+            "total_reports": total,
+            "processed_reports": self.processed,
+            "failed_reports": self.failed,
+            "progress_percent": round(self.processed / total * 100, 1) if total else 100.0,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_seconds": round((end - self.created_at).total_seconds(), 2),
+        }
+        if include_items:
+            result["items"] = [item.to_dict() for item in self.items]
+        return result
+
+    def to_state(self) -> Dict[str, Any]:
+        """to_dict plus where the finished PDFs are, as shared with other workers"""
+        return {
+            **self.to_dict(),
+            "directory": str(self.directory),
+            "completed": [item.filename for item in self.completed],
+        }
+
+
+def public_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """A job's shared state as returned by the API"""
+    return {key: value for key, value in state.items() if key not in ("directory", "completed")}
+
+
+class ReportJobQueue:
+    """
+    Report job runner.
+
+    Items of all jobs share one concurrency limit; each item typically
+    renders through the PDF worker pool, so this bounds how many renders a
+    job queue keeps in flight. Jobs run in the process that accepted them;
+    their progress is published to the shared state backend after every
+    change, so any worker can report it and stream the download, provided
+    all workers share the job directory. Jobs expire REPORT_JOB_TTL_SECONDS
+    after they finish, with their files.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = REPORT_JOB_CONCURRENCY,
+        directory: str = REPORT_JOB_DIR,
+        ttl_seconds: int = REPORT_JOB_TTL_SECONDS,
+    ):
+        self.concurrency = concurrency
+        self.directory = Path(directory)
+        self.ttl = ttl_seconds
+        self.jobs: Dict[str, ReportJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def submit(self, renders: List[Tuple[str, RenderFn]], name: str = "reports") -> ReportJob:
+        """Start a job rendering each (label, render) pair; returns immediately"""
+        if not renders:
+            raise ValueError("A report job needs at least one report")
+        if len(renders) > REPORT_JOB_MAX_ITEMS:
+            raise ValueError(f"A report job is limited to {REPORT_JOB_MAX_ITEMS} reports")
+
+        self._prune()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        job = ReportJob([ReportJobItem(label, render) for label, render in renders], self.directory, name)
+        self.jobs[job.job_id] = job
+        await self._publish(job)
+        self._tasks[job.job_id] = asyncio.ensure_future(self._run(job))
+        logger.info(f"Report job {job.job_id} submitted with {len(renders)} reports")
+        return job
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        return self.jobs.get(job_id)
+
+    @staticmethod
+    def _state_key(job_id: str) -> str:
+        return f"report_job:{job_id}"
+
+    async def _publish(self, job: ReportJob):
+        await get_state_backend().set(self._state_key(job.job_id), job.to_state(), ttl=self.ttl)
+
+    async def get_state(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Shared state of a job started by any worker, or None once it has expired"""
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job.to_state()
+        return await get_state_backend().get(self._state_key(job_id))
+
+    async def _run(self, job: ReportJob):
+        REPORT_JOBS_ACTIVE.inc()
+        job.directory.mkdir(parents=True, exist_ok=True)
+        try:
+            await asyncio.gather(*[self._run_item(job, item) for item in job.items])
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            await self._publish(job)
+            job._notify()
+            REPORT_JOBS_ACTIVE.dec()
+            self._tasks.pop(job.job_id, None)
+            logger.info(f"Report job {job.job_id} finished: {job.processed - job.failed}/{len(job.items)} rendered")
+
+    async def _run_item(self, job: ReportJob, item: ReportJobItem):
+        async with self._semaphore:
+            item.status = "running"
+            try:
+                filename, pdf_bytes = await item.render()
+                item.filename = job._unique_name(filename)
+                item.path = job.directory / item.filename
+                await asyncio.to_thread(item.path.write_bytes, pdf_bytes)
+                item.status = "completed"
+                job.completed.append(item)
+                REPORT_JOB_ITEMS.inc(result="completed")
+            except Exception as e:
+                item.status = "failed"
+                item.error = str(e) or type(e).__name__
+                REPORT_JOB_ITEMS.inc(result="failed")
+                logger.warning(f"Report job {job.job_id} item {item.label} failed: {item.error}")
+        await self._publish(job)
+        job._notify()
+
+    async def stream_zip(self, job_id: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        """
+        ZIP archive of the job's PDFs, yielded as each one completes.
+
+        PDFs are already compressed, so entries are stored. A manifest.json
+        with every item's status and error closes the archive. A job running
+        in another worker is followed through its shared state, but its PDFs
+        are read from the job's directory, so every worker must see the same
+        REPORT_JOB_DIR (one host or a shared volume). A file that cannot be
+        read, say because the job expired mid-download, is left out and
+        marked failed in the manifest.
+        """
+        buffer = _ZipBuffer()
+        archive = zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_STORED)
+        sent = 0
+        manifest = None
+        unreadable: Dict[str, str] = {}
+
+        while True:
+            job = self.jobs.get(job_id)
+            state = job.to_state() if job is not None else await get_state_backend().get(self._state_key(job_id))
+            if state is None:
+                break
+            manifest = public_state(state)
+            pending = state["completed"][sent:]
+            for filename in pending:
+                sent += 1
+                try:
+                    source = open(Path(state["directory"]) / filename, "rb")
+                except OSError as e:
+                    unreadable[filename] = f"Report file unavailable: {e.strerror or type(e).__name__}"
+                    logger.warning(f"Report job {job_id} file {filename} could not be read: {e}")
+                    continue
+                with source, archive.open(filename, mode="w") as entry:
+                    while True:
+                        chunk = await asyncio.to_thread(source.read, chunk_size)
+                        if not chunk:
+                            break
+                        entry.write(chunk)
+                        if buffer.pending() >= chunk_size:
+                            yield buffer.drain()
+                yield buffer.drain()
+            if pending:
+                continue
+            if state["finished_at"] is not None:
+                break
+            if job is not None:
+                # No await since the state was read, so no change is missed
+                await job.wait_for_change()
+            else:
+                await asyncio.sleep(REPORT_JOB_POLL_SECONDS)
+
+        if manifest is not None and unreadable:
+            manifest["items"] = [
+                {**item, "status": "failed", "error": unreadable[item["filename"]]}
+                if item["filename"] in unreadable else item
+                for item in manifest["items"]
+            ]
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+        archive.close()
+        yield buffer.drain()
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        for job_id, job in list(self.jobs.items()):
+            if job.done and job.finished_at.timestamp() < cutoff:
+                del self.jobs[job_id]
+                shutil.rmtree(job.directory, ignore_errors=True)
+
+    async def shutdown(self):
+        for task in list(self._tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "jobs": len(self.jobs),
+            "active_jobs": len(self._tasks),
+        }
+
+
+class _ZipBuffer:
+    """Write-only, unseekable sink for zipfile that hands out bytes as they are written"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._size = 0
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._size += len(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def pending(self) -> int:
+        return self._size
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks, self._size = [], 0
+        return data
+
+
+# Global instance
+report_job_queue = ReportJobQueue()
@@ -0,0 +1,350 @@
+"""
+Shared State Backend for StockPulse
+Pluggable key/value store for caches and notifications so several uvicorn
+workers share one copy of upstream data instead of each fetching its own
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from services.lazy_imports import is_installed
+from services.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# "memory" keeps state per process; "redis" shares it between workers
+STATE_BACKEND = os.environ.get("STATE_BACKEND", "memory").lower()
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+STATE_KEY_PREFIX = os.environ.get("STATE_KEY_PREFIX", "stockpulse:")
+
+REDIS_AVAILABLE = is_installed("redis")
+
+STATE_BACKEND_ERRORS = registry.counter(
+    "stockpulse_state_backend_errors_total",
+    "Shared state backend operations that failed and were treated as a miss",
+    ("operation",),
+)
+SHARED_FETCH_WAITS = registry.counter(
+    "stockpulse_shared_fetch_waits_total",
+    "Cache misses served by waiting for another worker's upstream fetch",
+)
+
+
+class StateBackend:
+    """
+    Interface for shared state.
+
+    Values are JSON-compatible structures. A missing or expired key reads as
+    None, so None itself cannot be stored. Lists are capped append-only logs
+    (used for notification history).
+    """
+
+    name = "base"
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    async def set_if_absent(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Set key only if it does not exist; returns whether it was set"""
+        raise NotImplementedError
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+    async def delete_if_equals(self, key: str, value: Any) -> bool:
+        """Delete key only if it holds value, atomically; returns whether it was deleted"""
+        raise NotImplementedError
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Values for the keys that exist"""
+        raise NotImplementedError
+
+    async def set_many(self, values: Dict[str, Any], ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    async def list_push(self, key: str, value: Any, max_length: Optional[int] = None):
+        """Append to a list, keeping only the newest max_length entries"""
+        raise NotImplementedError
+
+    async def list_range(self, key: str, limit: int) -> List[Any]:
+        """Newest `limit` list entries, oldest first"""
+        raise NotImplementedError
+
+    async def clear(self, prefix: str = ""):
+        """Delete every key starting with prefix"""
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class InProcessStateBackend(StateBackend):
+    """
+    Dict-backed store local to one process.
+
+    Values are stored by reference (no serialization), matching the
+    module-level dict caches this replaces. Expired keys are dropped when
+    read, and writes sweep out the rest at most every sweep_interval
+    seconds, so keys that are never read again do not pile up.
+    """
+
+    name = "memory"
+
+    def __init__(self, sweep_interval: float = 30.0):
+        self._data: Dict[str, Any] = {}
+        self._expiry: Dict[str, float] = {}
+        self.sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def _sweep(self):
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.sweep_interval
+        for key in [k for k, expires in self._expiry.items() if expires <= now]:
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+
+    def _live(self, key: str) -> bool:
+        expires = self._expiry.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+        return key in self._data
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._data[key] if self._live(key) else None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self._sweep()
+        self._data[key] = value
+        if ttl:
+            self._expiry[key] = time.monotonic() + ttl
+        else:
+            self._expiry.pop(key, None)
+
+    async def set_if_absent(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        if self._live(key):
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def delete(self, key: str):
+        self._data.pop(key, None)
+        self._expiry.pop(key, None)
+
+    async def delete_if_equals(self, key: str, value: Any) -> bool:
+        # No await between the check and the delete, so nothing can interleave
+        if not self._live(key) or self._data[key] != value:
+            return False
+        await self.delete(key)
+        return True
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        return {k: self._data[k] for k in keys if self._live(k)}
+
+    async def set_many(self, values: Dict[str, Any], ttl: Optional[float] = None):
+        for key, value in values.items():
+            await self.set(key, value, ttl)
+
+    async def list_push(self, key: str, value: Any, max_length: Optional[int] = None):
+        items = self._data.setdefault(key, [])
+        items.append(value)
+        if max_length is not None and len(items) > max_length:
+            del items[:-max_length]
+
+    async def list_range(self, key: str, limit: int) -> List[Any]:
+        return list(self._data.get(key, [])[-limit:]) if limit > 0 else []
+
+    async def clear(self, prefix: str = ""):
+        for key in [k for k in self._data if k.startswith(prefix)]:
+            await self.delete(key)
+
+
+class RedisStateBackend(StateBackend):
+    """
+    Store shared between processes over the Redis protocol.
+
+    Works with any redis.asyncio-compatible client (Redis, Valkey, KeyDB, or
+    fakeredis in tests). Values are JSON encoded. Connection errors are
+    logged and counted, then treated as a cache miss so the API keeps
+    serving from upstream when Redis is down.
+    """
+
+    name = "redis"
+
+    # Compare-and-delete in one server-side step, so a lock that expired and
+    # was taken by another worker is never released by its previous holder
+    DELETE_IF_EQUALS_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+    def __init__(self, client=None, url: str = REDIS_URL, prefix: str = STATE_KEY_PREFIX):
+        if client is None:
+            import redis.asyncio as aioredis
+            client = aioredis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    @staticmethod
+    def _dumps(value: Any) -> str:
+        return json.dumps(value, default=str)
+
+    @staticmethod
+    def _loads(raw) -> Optional[Any]:
+        return None if raw is None else json.loads(raw)
+
+    async def _run(self, operation: str, command: Awaitable, default=None):
+        try:
+            return await command
+        except Exception as e:
+            STATE_BACKEND_ERRORS.inc(operation=operation)
+            logger.warning(f"State backend {operation} failed: {e}")
+            return default
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._loads(await self._run("get", self.client.get(self._key(key))))
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        px = int(ttl * 1000) if ttl else None
+        await self._run("set", self.client.set(self._key(key), self._dumps(value), px=px))
+
+    async def set_if_absent(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        px = int(ttl * 1000) if ttl else None
+        # On error report success, so callers proceed as if they held the lock
+        result = await self._run(
+            "set", self.client.set(self._key(key), self._dumps(value), px=px, nx=True), True
+        )
+        return bool(result)
+
+    async def delete(self, key: str):
+        await self._run("delete", self.client.delete(self._key(key)))
+
+    async def delete_if_equals(self, key: str, value: Any) -> bool:
+        result = await self._run(
+            "delete", self.client.eval(self.DELETE_IF_EQUALS_SCRIPT, 1, self._key(key), self._dumps(value)), 0
+        )
+        return bool(result)
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        if not keys:
+            return {}
+        raw = await self._run("get", self.client.mget([self._key(k) for k in keys]), [])
+        return {k: self._loads(v) for k, v in zip(keys, raw or []) if v is not None}
+
+    async def set_many(self, values: Dict[str, Any], ttl: Optional[float] = None):
+        if not values:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        px = int(ttl * 1000) if ttl else None
+        for key, value in values.items():
+            pipe.set(self._key(key), self._dumps(value), px=px)
+        await self._run("set", pipe.execute())
+
+    async def list_push(self, key: str, value: Any, max_length: Optional[int] = None):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.rpush(self._key(key), self._dumps(value))
+        if max_length is not None:
+            pipe.ltrim(self._key(key), -max_length, -1)
+        await self._run("list_push", pipe.execute())
+
+    async def list_range(self, key: str, limit: int) -> List[Any]:
+        if limit <= 0:
+            return []
+        raw = await self._run("list_range", self.client.lrange(self._key(key), -limit, -1), [])
+        return [self._loads(v) for v in raw or []]
+
+    async def clear(self, prefix: str = ""):
+        async def scan_and_delete():
+            keys = [k async for k in self.client.scan_iter(match=f"{self._key(prefix)}*")]
+            if keys:
+                await self.client.delete(*keys)
+
+        await self._run("clear", scan_and_delete())
+
+    async def close(self):
+        await self._run("close", self.client.aclose())
+
+
+def create_state_backend(kind: str = STATE_BACKEND) -> StateBackend:
+    """Build the configured backend, falling back to in-process state"""
+    if kind == "redis":
+        if REDIS_AVAILABLE:
+            logger.info(f"Using Redis state backend at {REDIS_URL}")
+            return RedisStateBackend()
+        logger.warning("STATE_BACKEND=redis but the redis package is not installed; using memory")
+    return InProcessStateBackend()
+
+
+# Global instance
+state_backend: StateBackend = create_state_backend()
+
+
+def get_state_backend() -> StateBackend:
+    """Get the shared state backend"""
+    return state_backend
+
+
+def set_state_backend(backend: StateBackend) -> StateBackend:
+    """Replace the shared state backend (tests, alternative stores)"""
+    global state_backend
+    state_backend = backend
+    return backend
+
+
+async def fetch_shared(
+    key: str,
+    ttl: float,
+    fetch: Callable[[], Awaitable[Any]],
+    lock_timeout: float = 15.0,
+    poll_interval: float = 0.05,
+) -> Any:
+    """
+    Fetch a value once across all workers and store it under key.
+
+    The worker that takes the key's lock runs fetch and stores a non-None
+    result for ttl seconds; the others poll the backend for it until the lock
+    expires, then fetch themselves. Pair with per-process single-flight so
+    only one coroutine per worker waits here.
+    """
+    backend = state_backend
+    lock_key = f"lock:{key}"
+    token = uuid.uuid4().hex
+
+    deadline = time.monotonic() + lock_timeout
+    while not await backend.set_if_absent(lock_key, token, ttl=lock_timeout):
+        value = await backend.get(key)
+        if value is not None:
+            SHARED_FETCH_WAITS.inc()
+            return value
+        if time.monotonic() >= deadline:
+            break
+        await asyncio.sleep(poll_interval)
+
+    try:
+        # Another worker may have stored the value just before releasing the lock
+        value = await backend.get(key)
+        if value is not None:
+            SHARED_FETCH_WAITS.inc()
+            return value
+        value = await fetch()
+        if value is not None:
+            await backend.set(key, value, ttl=ttl)
+        return value
+    finally:
+        # Our lock may have expired and been taken by another worker meanwhile
+        await backend.delete_if_equals(lock_key, token)
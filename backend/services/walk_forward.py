@@ -0,0 +1,261 @@
+"""
+Walk-Forward Analysis for StockPulse
+Re-optimizes a strategy's parameters on rolling in-sample windows and
+trades each choice on the out-of-sample window that follows, stitching
+those out-of-sample segments into one equity curve
+"""
+
+import logging
+import math
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from models.backtest_models import BacktestConfig, BacktestResult, OptimizeConfig, StrategyType
+from services.backtest_optimizer import OBJECTIVES, build_combinations
+from services.backtest_pool import BacktestPool, SharedArray, SharedArraySpec, attach_shared_array, backtest_pool
+from services.backtesting_service import (
+    STRATEGY_SIGNALS, SimulationResult, build_result, build_trades, simulate_positions,
+)
+from services.performance_metrics import equity_metrics
+
+logger = logging.getLogger(__name__)
+
+# Recorded on the sell that closes a position when its out-of-sample window ends
+WINDOW_END_SIGNAL = "Walk-forward window end"
+
+
+class Window(NamedTuple):
+    """Bar ranges of one walk-forward step (end-exclusive)"""
+    in_start: int
+    in_end: int
+    out_start: int
+    out_end: int
+
+
+def build_windows(bars: int, in_sample: int, out_of_sample: int) -> List[Window]:
+    """
+    Rolling windows: each in-sample window is followed by its out-of-sample
+    window, and the next step starts out_of_sample bars later, so the
+    out-of-sample windows tile the history after the first in-sample window.
+    """
+    if bars <= in_sample:
+        raise ValueError(f"Walk-forward needs more than {in_sample} bars of history, got {bars}")
+    windows = []
+    start = 0
+    while start + in_sample < bars:
+        in_end = start + in_sample
+        windows.append(Window(start, in_end, in_end, min(in_end + out_of_sample, bars)))
+        start += out_of_sample
+    return windows
+
+
+def score_windows(
+    closes_spec: SharedArraySpec,
+    strategy: str,
+    combos: List[Dict[str, Any]],
+    windows: List[Window],
+    initial_capital: float,
+    metric: str,
+) -> List[List[float]]:
+    """
+    Worker entry point: metric of every combination on every in-sample window.
+    Every objective is an equity metric, so trades are not analysed here.
+
+    Indicators only look back, so each combination's signals are computed
+    once over the whole series and every window simulates on a slice of them.
+    """
+    closes = attach_shared_array(closes_spec)
+    signal_fn = STRATEGY_SIGNALS[StrategyType(strategy)]
+    scores = []
+    for params in combos:
+        signals = signal_fn(closes, **params)
+        row = []
+        for window in windows:
+            span = slice(window.in_start, window.in_end)
+            sim = simulate_positions(closes[span], signals.entries[span], signals.exits[span], initial_capital)
+            row.append(equity_metrics(sim.equity, initial_capital)[metric])
+        scores.append(row)
+    return scores
+
+
+async def optimize_windows(
+    closes: np.ndarray,
+    strategy: StrategyType,
+    combos: List[Dict[str, Any]],
+    windows: List[Window],
+    initial_capital: float,
+    metric: str,
+    pool: BacktestPool,
+) -> np.ndarray:
+    """(combinations x windows) metric matrix, with combinations split across the pool"""
+    chunk_size = max(1, math.ceil(len(combos) / (pool.workers * 2)))
+    with SharedArray(closes) as shared:
+        futures = [
+            pool.submit(
+                score_windows, shared.spec, strategy.value,
+                combos[i:i + chunk_size], windows, initial_capital, metric,
+            )
+            for i in range(0, len(combos), chunk_size)
+        ]
+        chunks = await pool.gather(futures)
+    return np.array([row for chunk in chunks for row in chunk], dtype=float)
+
+
+class WindowChoices(NamedTuple):
+    """Each window's chosen combination, from the in-sample scoring"""
+    windows: List[Window]
+    combos: List[Dict[str, Any]]
+    best: List[int]
+    scores: np.ndarray
+
+
+async def choose_parameters(
+    config: BacktestConfig,
+    price_history: List[Dict],
+    pool: BacktestPool,
+) -> WindowChoices:
+    """Score every combination on every in-sample window over the pool and pick each window's best"""
+    wf = config.walk_forward
+    closes = np.array([p["close"] for p in price_history], dtype=float)
+    windows = build_windows(len(closes), wf.in_sample_bars, wf.out_of_sample_bars)
+    combos = build_combinations(OptimizeConfig(
+        symbol=config.symbol,
+        strategy=config.strategy,
+        initial_capital=config.initial_capital,
+        parameter_grid=wf.parameter_grid,
+        search=wf.search,
+        samples=wf.samples,
+        seed=wf.seed,
+        objective=wf.objective,
+    ))
+
+    metric, higher_is_better = OBJECTIVES[wf.objective]
+    scores = await optimize_windows(
+        closes, config.strategy, combos, windows, config.initial_capital, metric, pool
+    )
+    best = scores.argmax(axis=0) if higher_is_better else scores.argmin(axis=0)
+    logger.info(
+        f"Walk-forward {config.strategy.value} on {config.symbol}: "
+        f"{len(combos)} combinations x {len(windows)} windows"
+    )
+    return WindowChoices(windows, combos, best.tolist(), scores)
+
+
+def stitch_walk_forward(
+    config: BacktestConfig,
+    price_history: List[Dict],
+    choices: WindowChoices,
+) -> BacktestResult:
+    """
+    Worker entry point: trade each window's choice out of sample.
+
+    Each out-of-sample segment starts flat with the equity the previous one
+    ended with, and any open position is sold at the segment's last close.
+    The result covers the out-of-sample bars only; `parameters` are the ones
+    chosen by the latest window.
+    """
+    wf = config.walk_forward
+    windows, combos, best, scores = choices
+    closes = np.array([p["close"] for p in price_history], dtype=float)
+    dates = [p["date"] for p in price_history]
+
+    # Compound from segment to segment
+    signal_fn = STRATEGY_SIGNALS[config.strategy]
+    signals_by_combo = {}
+    capital = float(config.initial_capital)
+    segments, trades, reports = [], [], []
+    for index, (window, choice) in enumerate(zip(windows, best)):
+        if choice not in signals_by_combo:
+            signals_by_combo[choice] = signal_fn(closes, **combos[choice])
+        signals = signals_by_combo[choice]
+
+        span = slice(window.out_start, window.out_end)
+        entries = signals.entries[span].copy()
+        exits = signals.exits[span].copy()
+        entries[-1] = False
+        exits[-1] = True
+        sim = simulate_positions(closes[span], entries, exits, capital)
+
+        segment_trades = build_trades(sim, signals, dates[span])
+        forced_exit = not signals.exits[window.out_end - 1]
+        if forced_exit and len(sim.trade_bars) and sim.trade_bars[-1] == len(exits) - 1:
+            segment_trades[-1].signal = WINDOW_END_SIGNAL
+
+        end_value = float(sim.equity[-1])
+        reports.append({
+            "in_sample_start": dates[window.in_start],
+            "in_sample_end": dates[window.in_end - 1],
+            "out_of_sample_start": dates[window.out_start],
+            "out_of_sample_end": dates[window.out_end - 1],
+            "parameters": combos[choice],
+            "in_sample_objective": float(scores[choice, index]),
+            "out_of_sample_return_percent": round((end_value / capital - 1) * 100, 2),
+        })
+        segments.append(sim._replace(trade_bars=sim.trade_bars + window.out_start - windows[0].out_start))
+        trades.extend(segment_trades)
+        capital = end_value
+
+    first_out = windows[0].out_start
+    stitched = SimulationResult(*(np.concatenate(arrays) for arrays in zip(*segments)))
+    return build_result(
+        config,
+        combos[best[-1]],
+        stitched,
+        trades,
+        dates[first_out:],
+        closes[first_out:],
+        walk_forward={
+            "in_sample_bars": wf.in_sample_bars,
+            "out_of_sample_bars": wf.out_of_sample_bars,
+            "objective": wf.objective.value,
+            "combinations": len(combos),
+            "windows": reports,
+        },
+    )
+
+
+def execute_walk_forward(
+    config_data: Dict[str, Any], price_history: List[Dict], choices: WindowChoices
+) -> Dict[str, Any]:
+    """Worker entry point: the stitched walk-forward result as a JSON-ready dict"""
+    return stitch_walk_forward(BacktestConfig(**config_data), price_history, choices).model_dump(mode="json")
+
+
+def _remaining(pool: BacktestPool, started: float) -> float:
+    # Scoring and stitching share one timeout budget
+    return max(pool.timeout - (time.monotonic() - started), 0.001)
+
+
+async def run_walk_forward(
+    config: BacktestConfig,
+    price_history: List[Dict],
+    pool: Optional[BacktestPool] = None,
+) -> BacktestResult:
+    """
+    Walk-forward backtest of config.strategy.
+
+    The in-sample scoring fans out over the pool, and the out-of-sample
+    stitching (with any Monte Carlo stage) runs as one more pool task, so
+    nothing CPU-bound runs on the event loop. Both together are bounded by
+    the pool's timeout.
+    """
+    pool = pool or backtest_pool
+    started = time.monotonic()
+    choices = await choose_parameters(config, price_history, pool)
+    return await pool.run(stitch_walk_forward, config, price_history, choices, timeout=_remaining(pool, started))
+
+
+async def run_walk_forward_in_pool(
+    config: BacktestConfig,
+    price_history: List[Dict],
+    pool: BacktestPool,
+) -> Dict[str, Any]:
+    """run_walk_forward with the result serialized in the worker, as a JSON-ready dict"""
+    started = time.monotonic()
+    choices = await choose_parameters(config, price_history, pool)
+    return await pool.run(
+        execute_walk_forward, config.model_dump(mode="json"), price_history, choices,
+        timeout=_remaining(pool, started),
+    )
@@ -6,12 +6,21 @@ Handles WebSocket connections and broadcasts price updates to clients
 import asyncio
 import json
 import logging
+import time
 from datetime import datetime
 from typing import Dict, Set, List, Optional, Any
 from fastapi import WebSocket, WebSocketDisconnect
 
+from services.metrics import WEBSOCKET_BROADCAST_SECONDS, WEBSOCKET_CONNECTIONS
+from services.state_backend import get_state_backend
+
 logger = logging.getLogger(__name__)
 
+# Last known prices are kept in the shared state backend under this prefix
+PRICE_KEY_PREFIX = "ws_price:"
+# How long a last known price is retained for newly subscribing clients
+PRICE_RETENTION_SECONDS = 24 * 3600
+
 
 class ConnectionManager:
     """Manages WebSocket connections and subscriptions"""
@@ -26,9 +35,6 @@ class ConnectionManager:
         # Reverse mapping: connection_id -> set of symbols
         self.connection_subscriptions: Dict[str, Set[str]] = {}
         
-        # Last known prices for caching
-        self.price_cache: Dict[str, Dict] = {}
-        
         # Background task reference
         self._broadcast_task: Optional[asyncio.Task] = None
         self._running = False
@@ -38,6 +44,7 @@ class ConnectionManager:
         await websocket.accept()
         self.active_connections[client_id] = websocket
         self.connection_subscriptions[client_id] = set()
+        WEBSOCKET_CONNECTIONS.set(len(self.active_connections))
         logger.info(f"Client {client_id} connected. Total connections: {len(self.active_connections)}")
     
     def disconnect(self, client_id: str):
@@ -54,6 +61,7 @@ class ConnectionManager:
                         del self.subscriptions[symbol]
             del self.connection_subscriptions[client_id]
         
+        WEBSOCKET_CONNECTIONS.set(len(self.active_connections))
         logger.info(f"Client {client_id} disconnected. Total connections: {len(self.active_connections)}")
     
     async def subscribe(self, client_id: str, symbols: List[str]):
@@ -93,12 +101,8 @@ class ConnectionManager:
             return
         
         websocket = self.active_connections[client_id]
-        prices = {}
-        
-        for symbol in symbols:
-            symbol = symbol.upper()
-            if symbol in self.price_cache:
-                prices[symbol] = self.price_cache[symbol]
+        cached = await self.get_cached_prices([s.upper() for s in symbols])
+        prices = {symbol: entry["data"] for symbol, entry in cached.items()}
         
         if prices:
             try:
@@ -112,9 +116,26 @@ class ConnectionManager:
     
     async def broadcast_prices(self, prices: Dict[str, Dict]):
         """Broadcast price updates to all subscribed clients"""
-        # Update cache
-        for symbol, price_data in prices.items():
-            self.price_cache[symbol] = price_data
+        with WEBSOCKET_BROADCAST_SECONDS.time():
+            await self._broadcast_prices(prices)
+    
+    async def get_cached_prices(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Last known prices as {symbol: {"data": ..., "fetched_at": epoch seconds}}"""
+        entries = await get_state_backend().get_many([f"{PRICE_KEY_PREFIX}{s}" for s in symbols])
+        return {key[len(PRICE_KEY_PREFIX):]: entry for key, entry in entries.items()}
+    
+    async def cache_prices(self, prices: Dict[str, Dict]):
+        """Store last known prices in the shared cache"""
+        fetched_at = time.time()
+        await get_state_backend().set_many(
+            {
+                f"{PRICE_KEY_PREFIX}{symbol}": {"data": data, "fetched_at": fetched_at}
+                for symbol, data in prices.items()
+            },
+            ttl=PRICE_RETENTION_SECONDS,
+        )
+    
+    async def _broadcast_prices(self, prices: Dict[str, Dict]):
         
         # Group updates by client
         client_updates: Dict[str, Dict] = {}
@@ -218,7 +239,31 @@ class PriceBroadcaster:
                 await asyncio.sleep(self.fetch_interval)
     
     async def _fetch_prices(self, symbols: List[str]) -> Dict[str, Dict]:
-        """Fetch current prices for symbols"""
+        """
+        Current prices for symbols.
+        
+        Prices another worker fetched within the last interval are reused from
+        the shared cache, so each symbol is fetched upstream about once per
+        interval however many workers have subscribers for it.
+        """
+        cached = await self.manager.get_cached_prices(symbols)
+        fresh_after = time.time() - self.fetch_interval
+        prices = {
+            symbol: entry["data"]
+            for symbol, entry in cached.items()
+            if entry.get("fetched_at", 0) >= fresh_after
+        }
+        missing = [s for s in symbols if s not in prices]
+        
+        if missing:
+            fetched = await self._fetch_upstream_prices(missing)
+            await self.manager.cache_prices(fetched)
+            prices.update(fetched)
+        
+        return prices
+    
+    async def _fetch_upstream_prices(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Fetch current prices for symbols from the market data provider"""
         prices = {}
         
         try:
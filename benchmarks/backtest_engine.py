@@ -0,0 +1,36 @@
+"""Time one backtest on 5,000 bars: bar-by-bar reference, vectorized signals and simulator, full run_backtest"""
+
+import asyncio
+
+import numpy as np
+
+from common import best_of
+
+from models.backtest_models import BacktestConfig
+from services import backtesting_service as bt
+from tests.test_backtest_engine import PARAMETERS, REFERENCE_STRATEGIES, _prices, execute_trades
+
+
+def main(bars: int = 5000):
+    prices = _prices(bars)
+    closes = np.array([p["close"] for p in prices])
+
+    print(f"One backtest on {bars} bars (best of 20)")
+    print(f"{'strategy':<18}{'reference us':>14}{'vectorized us':>15}{'speedup':>9}{'full run_backtest us':>22}")
+    for strategy, params in PARAMETERS:
+        reference = best_of(
+            lambda: execute_trades(REFERENCE_STRATEGIES[strategy](prices, **params), 100000, prices), runs=20
+        ) * 1e6
+
+        def vectorized():
+            signals = bt.STRATEGY_SIGNALS[strategy](closes, **params)
+            bt.simulate_positions(closes, signals.entries, signals.exits, 100000)
+
+        fast = best_of(vectorized, runs=20) * 1e6
+        config = BacktestConfig(symbol="TEST", strategy=strategy, parameters=params)
+        full = best_of(lambda: asyncio.run(bt.run_backtest(config, prices))) * 1e6
+        print(f"{strategy.value:<18}{reference:>14.0f}{fast:>15.0f}{reference / fast:>8.0f}x{full:>22.0f}")
+
+
+if __name__ == "__main__":
+    main()
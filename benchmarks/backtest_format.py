@@ -0,0 +1,26 @@
+"""Compare payload size and serialization time of a 10-year backtest in each response format"""
+
+import json
+import time
+
+import common  # noqa: F401  (import paths)
+
+from services.backtest_format import format_backtest_result
+from tests.test_backtest_format import _result
+
+FORMATS = (("rows", None, False), ("columnar", None, True), ("rows, 500 points", 500, False),
+           ("columnar, 250 points", 250, True))
+
+
+def main():
+    result = _result()
+    print(f"{len(result['equity_curve'])} bars, {len(result['trades'])} trades")
+    for label, points, columnar in FORMATS:
+        start = time.perf_counter()
+        payload = json.dumps(format_backtest_result(result, points, columnar), separators=(",", ":"))
+        elapsed = time.perf_counter() - start
+        print(f"{label:>22}: {len(payload) / 1024:7.1f} KiB in {elapsed * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Time a full SMA crossover grid on 500 bars, in-process versus the worker pool"""
+
+import asyncio
+import time
+
+import numpy as np
+
+import common  # noqa: F401  (import paths)
+
+from services.backtest_optimizer import build_combinations, evaluate_combinations, run_sweep
+from services.backtest_pool import BacktestPool, SharedArray
+from tests.test_backtest_optimizer import _config, _prices
+
+
+def main(bars: int = 500):
+    closes = np.array([p["close"] for p in _prices(bars)])
+    config = _config(parameter_grid={"short_period": list(range(5, 51, 3)), "long_period": list(range(20, 201, 10))})
+    combos = build_combinations(config)
+
+    with SharedArray(closes) as shared:
+        start = time.perf_counter()
+        evaluate_combinations(shared.spec, config.strategy.value, combos, config.initial_capital)
+        inline = time.perf_counter() - start
+
+    pool = BacktestPool()
+
+    async def run():
+        await pool.run(sum, [])  # spawn the workers outside the timing
+        start = time.perf_counter()
+        async for _ in run_sweep(closes, config, combos, pool=pool):
+            pass
+        return time.perf_counter() - start
+
+    try:
+        pooled = asyncio.run(run())
+    finally:
+        pool.shutdown()
+    print(f"{len(combos)} SMA crossover combinations on {bars} bars")
+    print(f"in-process: {inline * 1000:.0f} ms   pool ({pool.workers} workers): {pooled * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Compare 50 sequential single-symbol backtests with one batch run on the worker pool"""
+
+import asyncio
+import time
+
+import common  # noqa: F401  (import paths)
+
+from models.backtest_models import BacktestConfig, BatchBacktestConfig, StrategyType
+from services.backtest_pool import BacktestPool
+from services.backtesting_service import run_backtest
+from services.batch_backtest import run_batch_backtest
+from tests.conftest import price_history
+
+
+def main(symbols: int = 50, bars: int = 500):
+    histories = {f"S{i:02d}": price_history(bars, i) for i in range(symbols)}
+    config = BatchBacktestConfig(symbols=list(histories), strategy=StrategyType.SMA_CROSSOVER)
+    pool = BacktestPool()
+
+    async def measure():
+        start = time.perf_counter()
+        for symbol, history in histories.items():
+            await run_backtest(BacktestConfig(symbol=symbol, strategy=config.strategy), history)
+        sequential = time.perf_counter() - start
+
+        await pool.run(sum, [])  # spawn the workers outside the timing
+        start = time.perf_counter()
+        await run_batch_backtest(config, histories, pool=pool)
+        return sequential, time.perf_counter() - start
+
+    try:
+        sequential, batch = asyncio.run(measure())
+    finally:
+        pool.shutdown()
+    print(f"{symbols} symbols x {bars} bars, SMA crossover")
+    print(f"sequential run_backtest: {sequential * 1000:.0f} ms   batch ({pool.workers} workers): {batch * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
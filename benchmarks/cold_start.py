@@ -0,0 +1,13 @@
+"""Print the wall time and resident memory each module adds when the API starts in a fresh interpreter"""
+
+import common  # noqa: F401  (import paths)
+
+from tests.test_cold_start import _format, measure_cold_start
+
+
+def main():
+    print(_format(measure_cold_start()))
+
+
+if __name__ == "__main__":
+    main()
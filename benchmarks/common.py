@@ -0,0 +1,29 @@
+"""
+Shared setup for the StockPulse benchmarks.
+
+Each script in this directory times one hot path against the reference
+implementation kept in the matching test module, or against another way
+of running it, and prints a table. They are not tests; run them from the
+repository root, e.g.:  python benchmarks/indicators.py
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+# Backend modules import each other as top-level packages; reference code lives under tests/
+for path in (ROOT / "backend", ROOT):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+def best_of(fn: Callable[[], object], runs: int = 5) -> float:
+    """Fastest of runs calls of fn, in seconds"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
@@ -0,0 +1,31 @@
+"""Time the NumPy indicator kernels against the pure-Python reference on 10- and 20-year daily series"""
+
+import numpy as np
+
+from common import best_of
+
+from services import backtesting_service as bt
+from tests.test_backtest_indicators import _series, ref_bollinger_bands, ref_ema, ref_macd, ref_rsi, ref_sma
+
+INDICATORS = [
+    ("SMA(50)", lambda c: ref_sma(c, 50), lambda c: bt.sma_array(c, 50)),
+    ("EMA(26)", lambda c: ref_ema(c, 26), lambda c: bt.ema_array(c, 26)),
+    ("RSI(14)", lambda c: ref_rsi(c, 14), lambda c: bt.rsi_array(c, 14)),
+    ("MACD(12,26,9)", lambda c: ref_macd(c), lambda c: bt.macd_arrays(c)),
+    ("Bollinger(20,2)", lambda c: ref_bollinger_bands(c), lambda c: bt.bollinger_arrays(c)),
+]
+
+
+def main():
+    print(f"{'indicator':<18}{'years':>6}{'python ms':>12}{'numpy ms':>12}{'speedup':>10}")
+    for years in (10, 20):
+        closes = _series(years)
+        array = np.asarray(closes)
+        for name, reference, kernel in INDICATORS:
+            before = best_of(lambda: reference(closes)) * 1000
+            after = best_of(lambda: kernel(array)) * 1000
+            print(f"{name:<18}{years:>6}{before:>12.2f}{after:>12.3f}{before / after:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
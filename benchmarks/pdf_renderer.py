@@ -0,0 +1,62 @@
+"""Compare concurrent report throughput and event-loop stalls for in-thread rendering versus the process pool"""
+
+import asyncio
+import os
+import time
+
+import common  # noqa: F401  (import paths)
+
+from services.pdf_renderer import PDFRenderPool, to_render_payload
+from services.pdf_service import generate_single_stock_pdf
+from tests.test_pdf_renderer import _stock
+
+
+def main(reports: int = 64, workers: int = 4):
+    stocks = [_stock(symbol) for symbol in ("TCS", "INFY", "RELIANCE", "HDFCBANK")]
+    payloads = [to_render_payload("single_stock", stocks[i % len(stocks)]) for i in range(reports)]
+
+    async def measure(render):
+        # Longest gap between ticks of a 10ms heartbeat while the batch renders
+        worst, done = 0.0, asyncio.Event()
+
+        async def heartbeat():
+            nonlocal worst
+            last = time.perf_counter()
+            while not done.is_set():
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                worst = max(worst, now - last - 0.01)
+                last = now
+
+        beat = asyncio.create_task(heartbeat())
+        start = time.perf_counter()
+        await asyncio.gather(*[render(p) for p in payloads])
+        elapsed = time.perf_counter() - start
+        done.set()
+        await beat
+        return elapsed, worst
+
+    async def run():
+        pool = PDFRenderPool(workers=workers)
+        await pool.start()
+
+        async def inline(payload):
+            return generate_single_stock_pdf(payload)
+
+        try:
+            return {
+                "event loop": await measure(inline),
+                "to_thread": await measure(lambda p: asyncio.to_thread(generate_single_stock_pdf, p)),
+                f"process pool ({workers})": await measure(lambda p: pool.render("single_stock", p)),
+            }
+        finally:
+            pool.shutdown()
+
+    print(f"{reports} single-stock PDFs rendered concurrently on {os.cpu_count()} CPU(s)")
+    print(f"{'mode':<20}{'seconds':>10}{'reports/s':>12}{'max loop stall ms':>20}")
+    for mode, (elapsed, stall) in asyncio.run(run()).items():
+        print(f"{mode:<20}{elapsed:>10.2f}{reports / elapsed:>12.1f}{stall * 1000:>20.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Time the metrics of one 5,000-bar run: loop-based drawdown/Sharpe versus every metric vectorized"""
+
+import numpy as np
+
+from common import best_of
+
+from services.performance_metrics import performance_metrics
+from tests.test_performance_metrics import _equity, _reference_equity_metrics
+
+
+def main(bars: int = 5000, runs: int = 200):
+    equity = _equity(bars)
+    trade_bars = np.arange(10, bars, 25)
+    is_buy = np.arange(len(trade_bars)) % 2 == 0
+    quantities = np.full(len(trade_bars), 100)
+    values = np.linspace(9000.0, 11000.0, len(trade_bars))
+
+    reference = best_of(lambda: _reference_equity_metrics(equity.tolist(), 100000), runs)
+    vectorized = best_of(lambda: performance_metrics(equity, trade_bars, is_buy, quantities, values, 100000), runs)
+    print(f"{bars} bars, {len(trade_bars)} trades")
+    print(f"loop drawdown/Sharpe: {reference * 1e6:.0f} us   all metrics vectorized: {vectorized * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Show how walk-forward cost grows with history length"""
+
+import asyncio
+import time
+
+import common  # noqa: F401  (import paths)
+
+from services import walk_forward
+from services.backtest_pool import BacktestPool
+from tests.test_walk_forward import _config, _prices
+
+GRID = {"short_period": [5, 10, 15, 20, 30], "long_period": [40, 60, 90, 120, 200]}
+
+
+def main():
+    pool = BacktestPool()
+
+    async def run(bars):
+        config = _config(in_sample_bars=252, out_of_sample_bars=63, parameter_grid=GRID)
+        start = time.perf_counter()
+        await walk_forward.run_walk_forward(config, _prices(bars), pool=pool)
+        return time.perf_counter() - start
+
+    async def measure():
+        await pool.run(sum, [])  # spawn the workers outside the timing
+        print(f"SMA crossover walk-forward, 25 combinations, 252/63-bar windows, {pool.workers} workers")
+        for bars in (1000, 2000, 4000, 8000):
+            elapsed = await run(bars)
+            print(f"{bars:>6} bars: {elapsed * 1000:7.0f} ms")
+
+    try:
+        asyncio.run(measure())
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Backend modules import each other as top-level packages (models, services, ...)
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def random_walk(bars: int, seed: int, drift: float = 0.0005, vol: float = 0.02, start: float = 100.0) -> np.ndarray:
+    """Seeded compounding random walk: start grown by bars normal(drift, vol) returns"""
+    rng = np.random.default_rng(seed)
+    return start * np.cumprod(1 + rng.normal(drift, vol, bars))
+
+
+def price_history(
+    bars: int, seed: int, drift: float = 0.0005, vol: float = 0.02, start: float = 100.0, first_day: int = 0
+) -> List[Dict[str, Any]]:
+    """Daily price history ({"date", "close"} rows) following random_walk, dated d00000, d00001, ..."""
+    closes = random_walk(bars, seed, drift, vol, start)
+    return [{"date": f"d{first_day + i:05d}", "close": float(c)} for i, c in enumerate(closes)]
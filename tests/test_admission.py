@@ -0,0 +1,108 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+
+from services.admission import (
+    ADMISSION_REJECTED, ADMISSION_WAIT_SECONDS, AdmissionController, AdmissionRejected,
+    admission_controllers, admission_rejected_handler, limit_concurrency,
+)
+
+
+def test_queue_full_and_timeout_are_rejected():
+    controller = AdmissionController("unit", max_concurrent=1, max_queue=1, queue_timeout=0.1)
+
+    async def hold(seconds):
+        async with controller.slot():
+            await asyncio.sleep(seconds)
+
+    async def run():
+        running = asyncio.create_task(hold(0.3))
+        await asyncio.sleep(0.01)
+        queued = asyncio.create_task(hold(0))
+        await asyncio.sleep(0.01)
+        assert controller.waiting == 1
+
+        with pytest.raises(AdmissionRejected) as full:
+            await controller.acquire()
+        assert full.value.reason == "queue_full"
+        assert full.value.retry_after >= 1
+
+        # The queued request gives up after queue_timeout
+        with pytest.raises(AdmissionRejected) as timed_out:
+            await queued
+        assert timed_out.value.reason == "timeout"
+        await running
+        assert controller.in_flight == 0 and controller.waiting == 0
+
+    before = ADMISSION_REJECTED.get(endpoint_class="unit", reason="timeout")
+    asyncio.run(run())
+    assert ADMISSION_REJECTED.get(endpoint_class="unit", reason="timeout") == before + 1
+
+
+@pytest.mark.parametrize("native_timeout", [True, False])
+def test_timed_out_waits_never_keep_a_permit(native_timeout, monkeypatch):
+    if not native_timeout:
+        monkeypatch.delattr(asyncio, "timeout", raising=False)
+    controller = AdmissionController("unit", max_concurrent=2, max_queue=200, queue_timeout=0.002)
+
+    async def hold():
+        try:
+            async with controller.slot():
+                await asyncio.sleep(0.001)
+        except AdmissionRejected:
+            pass
+
+    async def run():
+        # Slots free up around the moment queued waits time out
+        await asyncio.gather(*[hold() for _ in range(200)])
+        assert controller.in_flight == 0 and controller.waiting == 0
+        for _ in range(2):
+            await asyncio.wait_for(controller._semaphore.acquire(), 0.1)
+        assert controller._semaphore.locked()
+
+    asyncio.run(run())
+
+
+def test_overload_returns_429_with_retry_after_and_cheap_routes_stay_fast():
+    admission_controllers["test"] = AdmissionController(
+        "test", max_concurrent=2, max_queue=2, queue_timeout=5
+    )
+    app = FastAPI()
+    app.add_exception_handler(AdmissionRejected, admission_rejected_handler)
+
+    @app.post("/slow", dependencies=[Depends(limit_concurrency("test"))])
+    async def slow():
+        await asyncio.sleep(0.2)
+        return {"ok": True}
+
+    @app.get("/cheap")
+    async def cheap():
+        return {"ok": True}
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            slow_requests = [asyncio.create_task(client.post("/slow")) for _ in range(6)]
+            await asyncio.sleep(0.05)
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            cheap_response = await client.get("/cheap")
+            cheap_latency = loop.time() - start
+            return await asyncio.gather(*slow_requests), cheap_response, cheap_latency
+
+    try:
+        responses, cheap_response, cheap_latency = asyncio.run(run())
+    finally:
+        del admission_controllers["test"]
+
+    statuses = sorted(r.status_code for r in responses)
+    assert statuses == [200, 200, 200, 200, 429, 429]
+    rejected = [r for r in responses if r.status_code == 429]
+    assert all(int(r.headers["Retry-After"]) >= 1 for r in rejected)
+    assert rejected[0].json()["reason"] == "queue_full"
+    assert ADMISSION_WAIT_SECONDS.get_count(endpoint_class="test") == 4
+
+    assert cheap_response.status_code == 200
+    assert cheap_latency < 0.1
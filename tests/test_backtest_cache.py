@@ -0,0 +1,141 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.backtest_models import BacktestConfig, StrategyType
+from services import state_backend
+from services.backtest_cache import (
+    BACKTEST_CACHE_LOOKUPS, BacktestResultCache, backtest_cache_key, price_series_hash,
+)
+from services.backtesting_service import run_backtest, select_date_range
+from services.state_backend import InProcessStateBackend
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    previous = state_backend.get_state_backend()
+    state_backend.set_state_backend(InProcessStateBackend())
+    yield
+    state_backend.set_state_backend(previous)
+
+
+def _bars(days=300):
+    start = datetime(2023, 1, 1)
+    return [
+        {"date": (start + timedelta(days=i)).strftime("%Y-%m-%d"), "close": 100 + (i % 17) - (i % 5) * 0.7}
+        for i in range(days)
+    ]
+
+
+def _config(**overrides):
+    return BacktestConfig(symbol="tcs", strategy=StrategyType.SMA_CROSSOVER, **overrides)
+
+
+def test_key_normalizes_parameters_and_tracks_the_data():
+    data_hash = price_series_hash(_bars())
+    base = backtest_cache_key(_config(parameters={"short_period": 20}), data_hash)
+    # Defaults filled in, numbers cast to the declared type
+    assert base == backtest_cache_key(_config(parameters={"long_period": 50.0, "short_period": 20}), data_hash)
+    assert base != backtest_cache_key(_config(parameters={"short_period": 10}), data_hash)
+    assert base != backtest_cache_key(_config(initial_capital=50000), data_hash)
+    assert base != backtest_cache_key(_config(start_date="2023-03-01"), data_hash)
+
+    # A new bar changes the series hash
+    assert price_series_hash(_bars(301)) != data_hash
+    assert price_series_hash(_bars()) == data_hash
+
+
+def test_date_range_is_honored():
+    bars = _bars()
+    selected = select_date_range(bars, "2023-02-01", "2023-06-30")
+    assert selected[0]["date"] == "2023-02-01" and selected[-1]["date"] == "2023-06-30"
+    assert select_date_range(bars) is bars
+
+    result = asyncio.run(run_backtest(_config(start_date="2023-03-01"), bars))
+    assert result.start_date == "2023-03-01" and result.trading_days == 300 - 59
+
+    with pytest.raises(ValueError):
+        select_date_range(bars, "03/01/2023")
+    with pytest.raises(ValueError):
+        select_date_range(bars, "2024-01-01")
+    with pytest.raises(ValueError):
+        select_date_range(bars, "2023-06-01", "2023-05-01")
+
+
+def test_results_are_cached_until_the_series_grows():
+    cache = BacktestResultCache(ttl_seconds=60)
+    runs = []
+
+    def runner(config, bars):
+        async def run():
+            runs.append(len(bars))
+            await asyncio.sleep(0.01)
+            return (await run_backtest(config, bars)).model_dump(mode="json")
+        return run
+
+    async def scenario():
+        config, bars = _config(), _bars()
+        concurrent = await asyncio.gather(*[cache.get_or_run(config, bars, runner(config, bars)) for _ in range(3)])
+        again = await cache.get_or_run(config, bars, runner(config, bars))
+        extended = await cache.get_or_run(config, _bars(301), runner(config, _bars(301)))
+        return concurrent, again, extended
+
+    before = BACKTEST_CACHE_LOOKUPS.get(result="hit")
+    concurrent, again, extended = asyncio.run(scenario())
+
+    assert runs == [300, 301]
+    assert [cached for _, cached in concurrent] == [False, True, True]
+    assert again[1] is True and again[0] == concurrent[0][0]
+    assert extended[1] is False and extended[0]["trading_days"] == 301
+    assert BACKTEST_CACHE_LOOKUPS.get(result="hit") == before + 1
+
+
+def test_endpoint_serves_repeat_runs_from_cache():
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+    import server
+
+    client = TestClient(server.app)
+    body = {"symbol": "INFY", "strategy": "rsi", "parameters": {"period": 14}}
+    first = client.post("/api/backtest/run", json=body)
+    second = client.post("/api/backtest/run", json={**body, "parameters": {"period": 14.0, "oversold": 30}})
+    assert first.status_code == 200 and first.headers["X-Backtest-Cache"] == "miss"
+    assert second.headers["X-Backtest-Cache"] == "hit"
+    assert second.json() == first.json()
+
+    start = first.json()["equity_curve"][100]["date"]
+    ranged = client.post("/api/backtest/run", json={**body, "start_date": start})
+    assert ranged.headers["X-Backtest-Cache"] == "miss"
+    assert ranged.json()["start_date"] == start
+
+    assert client.post("/api/backtest/run", json={**body, "end_date": "tomorrow"}).status_code == 400
+
+
+def test_abandoned_computation_is_cancelled():
+    cache = BacktestResultCache(ttl_seconds=60)
+    state = {"cancelled": False}
+
+    async def slow():
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    async def scenario():
+        config, bars = _config(), _bars()
+        first = asyncio.ensure_future(cache.get_or_run(config, bars, slow))
+        second = asyncio.ensure_future(cache.get_or_run(config, bars, slow))
+        await asyncio.sleep(0.05)
+        # One caller leaving does not stop the work the other still waits for
+        first.cancel()
+        await asyncio.sleep(0.05)
+        shared_alive = not state["cancelled"]
+        second.cancel()
+        await asyncio.gather(first, second, return_exceptions=True)
+        await asyncio.sleep(0)
+        return shared_alive
+
+    assert asyncio.run(scenario())
+    assert state["cancelled"]
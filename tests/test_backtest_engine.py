@@ -0,0 +1,378 @@
+"""
+Backtest engine tests.
+
+Vectorized signals and the position simulator are checked against the
+original bar-by-bar strategies and trade executor, kept below as the
+reference. The reference equity curve used the final position for every
+bar; the simulator marks to market per bar and is checked separately.
+benchmarks/backtest_engine.py times the two.
+"""
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from models.backtest_models import StrategyType, Trade, TradeType  # noqa: E402
+from services import backtesting_service as bt  # noqa: E402
+from services.backtesting_service import (  # noqa: E402
+    calculate_bollinger_bands, calculate_macd, calculate_rsi, calculate_sma,
+)
+from tests.conftest import price_history  # noqa: E402
+
+REFERENCE_STRATEGIES = {}
+
+
+# ---- Reference implementations (bar-by-bar backtesting_service) ----
+
+def run_sma_crossover(
+    prices: List[Dict],
+    short_period: int = 20,
+    long_period: int = 50
+) -> List[Dict[str, Any]]:
+    """Run SMA Crossover strategy"""
+    closes = [p["close"] for p in prices]
+    short_sma = calculate_sma(closes, short_period)
+    long_sma = calculate_sma(closes, long_period)
+    
+    signals = []
+    position = 0  # 0 = no position, 1 = long
+    
+    for i in range(1, len(prices)):
+        if short_sma[i] is None or long_sma[i] is None:
+            continue
+        if short_sma[i - 1] is None or long_sma[i - 1] is None:
+            continue
+        
+        # Buy signal: short crosses above long
+        if short_sma[i - 1] <= long_sma[i - 1] and short_sma[i] > long_sma[i] and position == 0:
+            signals.append({
+                "date": prices[i]["date"],
+                "type": "buy",
+                "price": closes[i],
+                "signal": f"SMA{short_period} crossed above SMA{long_period}"
+            })
+            position = 1
+        
+        # Sell signal: short crosses below long
+        elif short_sma[i - 1] >= long_sma[i - 1] and short_sma[i] < long_sma[i] and position == 1:
+            signals.append({
+                "date": prices[i]["date"],
+                "type": "sell",
+                "price": closes[i],
+                "signal": f"SMA{short_period} crossed below SMA{long_period}"
+            })
+            position = 0
+    
+    return signals
+
+
+def run_rsi_strategy(
+    prices: List[Dict],
+    period: int = 14,
+    oversold: int = 30,
+    overbought: int = 70
+) -> List[Dict[str, Any]]:
+    """Run RSI strategy"""
+    closes = [p["close"] for p in prices]
+    rsi = calculate_rsi(closes, period)
+    
+    signals = []
+    position = 0
+    
+    for i in range(1, len(prices)):
+        if rsi[i] is None or rsi[i - 1] is None:
+            continue
+        
+        # Buy when RSI crosses above oversold
+        if rsi[i - 1] <= oversold and rsi[i] > oversold and position == 0:
+            signals.append({
+                "date": prices[i]["date"],
+                "type": "buy",
+                "price": closes[i],
+                "signal": f"RSI crossed above {oversold} (oversold)"
+            })
+            position = 1
+        
+        # Sell when RSI crosses above overbought
+        elif rsi[i - 1] <= overbought and rsi[i] > overbought and position == 1:
+            signals.append({
+                "date": prices[i]["date"],
+                "type": "sell",
+                "price": closes[i],
+                "signal": f"RSI crossed above {overbought} (overbought)"
+            })
+            position = 0
+    
+    return signals
+
+
+def run_macd_strategy(
+    prices: List[Dict],
+    fast_period: int = 12,
+    slow_period: int = 26,
+    signal_period: int = 9
+) -> List[Dict[str, Any]]:
+    """Run MACD strategy"""
+    closes = [p["close"] for p in prices]
+    macd, signal_line, histogram = calculate_macd(closes, fast_period, slow_period, signal_period)
+    
+    signals = []
+    position = 0
+    
+    for i in range(1, len(prices)):
+        if macd[i] is None or signal_line[i] is None:
+            continue
+        if macd[i - 1] is None or signal_line[i - 1] is None:
+            continue
+        
+        # Buy when MACD crosses above signal
+        if macd[i - 1] <= signal_line[i - 1] and macd[i] > signal_line[i] and position == 0:
+            signals.append({
+                "date": prices[i]["date"],
+                "type": "buy",
+                "price": closes[i],
+                "signal": "MACD crossed above signal line"
+            })
+            position = 1
+        
+        # Sell when MACD crosses below signal
+        elif macd[i - 1] >= signal_line[i - 1] and macd[i] < signal_line[i] and position == 1:
+            signals.append({
+                "date": prices[i]["date"],
+                "type": "sell",
+                "price": closes[i],
+                "signal": "MACD crossed below signal line"
+            })
+            position = 0
+    
+    return signals
+
+
+def run_bollinger_strategy(
+    prices: List[Dict],
+    period: int = 20,
+    std_dev: float = 2.0
+) -> List[Dict[str, Any]]:
+    """Run Bollinger Bands strategy"""
+    closes = [p["close"] for p in prices]
+    middle, upper, lower = calculate_bollinger_bands(closes, period, std_dev)
+    
+    signals = []
+    position = 0
+    
+    for i in range(1, len(prices)):
+        if lower[i] is None or upper[i] is None:
+            continue
+        
+        # Buy when price touches lower band
+        if closes[i] <= lower[i] and position == 0:
+            signals.append({
+                "date": prices[i]["date"],
+                "type": "buy",
+                "price": closes[i],
+                "signal": "Price touched lower Bollinger Band"
+            })
+            position = 1
+        
+        # Sell when price touches upper band
+        elif closes[i] >= upper[i] and position == 1:
+            signals.append({
+                "date": prices[i]["date"],
+                "type": "sell",
+                "price": closes[i],
+                "signal": "Price touched upper Bollinger Band"
+            })
+            position = 0
+    
+    return signals
+
+
+def run_momentum_strategy(
+    prices: List[Dict],
+    period: int = 14,
+    threshold: float = 2.0
+) -> List[Dict[str, Any]]:
+    """Run Momentum strategy"""
+    closes = [p["close"] for p in prices]
+    
+    signals = []
+    position = 0
+    
+    for i in range(period, len(prices)):
+        momentum = ((closes[i] - closes[i - period]) / closes[i - period]) * 100
+        prev_momentum = ((closes[i - 1] - closes[i - period - 1]) / closes[i - period - 1]) * 100
+        
+        # Buy when momentum crosses above threshold
+        if prev_momentum <= threshold and momentum > threshold and position == 0:
+            signals.append({
+                "date": prices[i]["date"],
+                "type": "buy",
+                "price": closes[i],
+                "signal": f"Momentum crossed above {threshold}%"
+            })
+            position = 1
+        
+        # Sell when momentum crosses below negative threshold
+        elif prev_momentum >= -threshold and momentum < -threshold and position == 1:
+            signals.append({
+                "date": prices[i]["date"],
+                "type": "sell",
+                "price": closes[i],
+                "signal": f"Momentum crossed below -{threshold}%"
+            })
+            position = 0
+    
+    return signals
+
+
+def execute_trades(
+    signals: List[Dict],
+    initial_capital: float,
+    prices: List[Dict]
+) -> Tuple[List[Trade], List[Dict[str, Any]]]:
+    """Execute trades based on signals and calculate results"""
+    trades = []
+    equity_curve = []
+    
+    cash = initial_capital
+    position = 0
+    shares = 0
+    
+    for signal in signals:
+        price = signal["price"]
+        
+        if signal["type"] == "buy" and position == 0:
+            # Buy with all cash
+            shares = int(cash / price)
+            if shares > 0:
+                cost = shares * price
+                cash -= cost
+                position = 1
+                
+                portfolio_value = cash + (shares * price)
+                trades.append(Trade(
+                    date=signal["date"],
+                    type=TradeType.BUY,
+                    price=price,
+                    quantity=shares,
+                    value=cost,
+                    signal=signal["signal"],
+                    portfolio_value=portfolio_value
+                ))
+        
+        elif signal["type"] == "sell" and position == 1:
+            # Sell all shares
+            proceeds = shares * price
+            cash += proceeds
+            position = 0
+            
+            portfolio_value = cash
+            trades.append(Trade(
+                date=signal["date"],
+                type=TradeType.SELL,
+                price=price,
+                quantity=shares,
+                value=proceeds,
+                signal=signal["signal"],
+                portfolio_value=portfolio_value
+            ))
+            shares = 0
+    
+    # Build equity curve
+    for p in prices:
+        current_price = p["close"]
+        if position == 1:
+            value = cash + (shares * current_price)
+        else:
+            value = cash
+        
+        equity_curve.append({
+            "date": p["date"],
+            "value": round(value, 2),
+            "price": current_price
+        })
+    
+    return trades, equity_curve
+
+
+REFERENCE_STRATEGIES.update({
+    StrategyType.SMA_CROSSOVER: run_sma_crossover,
+    StrategyType.RSI: run_rsi_strategy,
+    StrategyType.MACD: run_macd_strategy,
+    StrategyType.BOLLINGER_BANDS: run_bollinger_strategy,
+    StrategyType.MOMENTUM: run_momentum_strategy,
+})
+
+
+# ---- Tests ----
+
+def _prices(bars: int) -> List[Dict[str, Any]]:
+    prices = price_history(bars, seed=11, drift=0.0003, start=1500)
+    # The reference momentum strategy's first bar compared against closes[-1]
+    # (a negative index); a flat start keeps that bar quiet in both engines
+    for row in prices[1:20]:
+        row["close"] = prices[0]["close"]
+    return prices
+
+
+PARAMETERS = [
+    (StrategyType.SMA_CROSSOVER, {"short_period": 10, "long_period": 40}),
+    (StrategyType.RSI, {"period": 14, "oversold": 30, "overbought": 70}),
+    (StrategyType.MACD, {"fast_period": 12, "slow_period": 26, "signal_period": 9}),
+    (StrategyType.BOLLINGER_BANDS, {"period": 20, "std_dev": 1.5}),
+    (StrategyType.MOMENTUM, {"period": 10, "threshold": 3.0}),
+]
+
+
+def _trade_tuples(trades: List[Trade]) -> List[Tuple]:
+    return [(t.date, t.type, t.price, t.quantity, round(t.value, 6), round(t.portfolio_value, 6), t.signal)
+            for t in trades]
+
+
+@pytest.mark.parametrize("strategy,params", PARAMETERS)
+def test_trades_match_reference_strategies(strategy, params):
+    prices = _prices(2000)
+    expected, _ = execute_trades(REFERENCE_STRATEGIES[strategy](prices, **params), 100000, prices)
+
+    closes = np.array([p["close"] for p in prices])
+    signals = bt.STRATEGY_SIGNALS[strategy](closes, **params)
+    sim = bt.simulate_positions(closes, signals.entries, signals.exits, 100000)
+    actual = bt.build_trades(sim, signals, [p["date"] for p in prices])
+
+    assert len(expected) > 4
+    assert _trade_tuples(actual) == _trade_tuples(expected)
+
+
+def test_equity_is_marked_to_market_every_bar():
+    closes = np.array([100.0, 100, 110, 120, 90, 95, 100])
+    entries = np.array([0, 1, 0, 0, 0, 1, 0], dtype=bool)
+    exits = np.array([0, 0, 0, 1, 0, 0, 0], dtype=bool)
+    sim = bt.simulate_positions(closes, entries, exits, 1000)
+
+    # 10 shares bought at 100, sold at 120; 12 shares bought at 95 with 1200 cash
+    np.testing.assert_allclose(sim.equity, [1000, 1000, 1100, 1200, 1200, 1200, 1260])
+    assert sim.trade_quantities.tolist() == [10, 10, 12]
+    assert sim.trade_is_buy.tolist() == [True, False, True]
+
+
+def test_entry_and_exit_on_the_same_bar_flip_the_position():
+    entries = np.array([0, 1, 1, 0, 1], dtype=bool)
+    exits = np.array([0, 0, 1, 1, 0], dtype=bool)
+    bars, is_buy = bt.position_changes(entries, exits)
+    assert bars.tolist() == [1, 2, 4]
+    assert is_buy.tolist() == [True, False, True]
+
+
+def test_unaffordable_buy_skips_the_round_trip():
+    closes = np.array([500.0, 500, 600, 400])
+    entries = np.array([0, 1, 0, 1], dtype=bool)
+    exits = np.array([0, 0, 1, 0], dtype=bool)
+    sim = bt.simulate_positions(closes, entries, exits, 450)
+    assert sim.trade_bars.tolist() == [3]
+    np.testing.assert_allclose(sim.equity, [450, 450, 450, 450])
+
@@ -0,0 +1,98 @@
+"""
+Backtest response format tests.
+
+benchmarks/backtest_format.py compares payload size and serialization time
+of a 10-year backtest in each format.
+"""
+
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from models.backtest_models import BacktestConfig, StrategyType  # noqa: E402
+from services.backtest_format import format_backtest_result, lttb_indices, to_columns  # noqa: E402
+from services.backtesting_service import backtest_result  # noqa: E402
+
+
+def _result(bars: int = 2520, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    closes = 1000 * np.cumprod(1 + rng.normal(0.0003, 0.015, bars))
+    start = datetime(2014, 1, 1)
+    history = [
+        {"date": (start + timedelta(days=i)).strftime("%Y-%m-%d"), "close": float(c)} for i, c in enumerate(closes)
+    ]
+    config = BacktestConfig(symbol="TEST", strategy=StrategyType.RSI)
+    return backtest_result(config, history).model_dump(mode="json")
+
+
+def test_lttb_keeps_the_ends_and_the_extremes():
+    values = np.zeros(1000)
+    values[137], values[642] = 50.0, -80.0
+    keep = lttb_indices(values, 20)
+    assert len(keep) == 20 and keep[0] == 0 and keep[-1] == 999
+    assert np.all(np.diff(keep) > 0)
+    assert {137, 642} <= set(keep.tolist())
+
+    assert lttb_indices(values[:10], 20).tolist() == list(range(10))
+    assert lttb_indices(values[:10], 10).tolist() == list(range(10))
+
+
+def test_lttb_follows_a_random_walk():
+    walk = np.cumsum(np.random.default_rng(0).normal(size=5000))
+    keep = lttb_indices(walk, 500)
+    # Each bucket keeps a point inside it, and the kept points span the range
+    assert len(set(keep.tolist())) == 500
+    kept = walk[keep]
+    assert kept.max() - kept.min() >= 0.95 * (walk.max() - walk.min())
+
+
+def test_columnar_layout_round_trips():
+    result = _result(600)
+    columnar = format_backtest_result(result, columnar=True)
+    curve, trades = columnar["equity_curve"], columnar["trades"]
+    assert set(curve) == {"date", "value", "price"}
+    rows = [dict(zip(curve, values)) for values in zip(*curve.values())]
+    assert rows == result["equity_curve"]
+    assert [dict(zip(trades, values)) for values in zip(*trades.values())] == result["trades"]
+    assert to_columns([], ("date", "value")) == {"date": [], "value": []}
+
+    # Metrics are untouched by downsampling
+    sampled = format_backtest_result(result, points=100)
+    assert len(sampled["equity_curve"]) == 100
+    assert sampled["max_drawdown"] == result["max_drawdown"] and sampled["trades"] == result["trades"]
+
+
+def test_downsampled_columnar_payload_is_ten_times_smaller():
+    result = _result()
+    full = len(json.dumps(result, separators=(",", ":")))
+    compact = len(json.dumps(format_backtest_result(result, points=250, columnar=True), separators=(",", ":")))
+    assert full / compact >= 10
+
+
+def test_endpoint_formats():
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+    import server
+
+    client = TestClient(server.app)
+    body = {"symbol": "HDFCBANK", "strategy": "macd"}
+    rows = client.post("/api/backtest/run", json=body)
+    columnar = client.post("/api/backtest/run?points=50&format=columnar", json=body)
+    assert rows.status_code == 200 and columnar.status_code == 200
+    assert columnar.headers["X-Backtest-Cache"] == "hit"
+
+    full, sampled = rows.json(), columnar.json()
+    assert len(sampled["equity_curve"]["date"]) == 50
+    assert sampled["equity_curve"]["date"][0] == full["equity_curve"][0]["date"]
+    assert sampled["trades"]["date"] == [t["date"] for t in full["trades"]]
+    assert sampled["final_value"] == full["final_value"]
+
+    assert client.post("/api/backtest/run?points=2", json=body).status_code == 422
+    assert client.post("/api/backtest/run?format=csv", json=body).status_code == 422
+
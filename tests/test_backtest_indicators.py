@@ -0,0 +1,172 @@
+"""
+Indicator kernel tests.
+
+The NumPy kernels in backtesting_service are checked against the original
+pure-Python indicator implementations, kept below as the reference.
+benchmarks/indicators.py times the two.
+"""
+
+import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from services import backtesting_service as bt  # noqa: E402
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+# ---- Reference implementations (pre-NumPy backtesting_service) ----
+
+def ref_sma(prices: List[float], period: int) -> List[Optional[float]]:
+    """Calculate Simple Moving Average"""
+    sma = [None] * len(prices)
+    for i in range(period - 1, len(prices)):
+        sma[i] = sum(prices[i - period + 1:i + 1]) / period
+    return sma
+
+
+def ref_ema(prices: List[float], period: int) -> List[Optional[float]]:
+    """Calculate Exponential Moving Average"""
+    ema = [None] * len(prices)
+    multiplier = 2 / (period + 1)
+    
+    # First EMA is SMA
+    if len(prices) >= period:
+        ema[period - 1] = sum(prices[:period]) / period
+        
+        for i in range(period, len(prices)):
+            ema[i] = (prices[i] * multiplier) + (ema[i - 1] * (1 - multiplier))
+    
+    return ema
+
+
+def ref_rsi(prices: List[float], period: int = 14) -> List[Optional[float]]:
+    """Calculate Relative Strength Index"""
+    rsi = [None] * len(prices)
+    
+    if len(prices) < period + 1:
+        return rsi
+    
+    gains = []
+    losses = []
+    
+    for i in range(1, len(prices)):
+        change = prices[i] - prices[i - 1]
+        gains.append(max(change, 0))
+        losses.append(abs(min(change, 0)))
+    
+    for i in range(period, len(prices)):
+        avg_gain = sum(gains[i - period:i]) / period
+        avg_loss = sum(losses[i - period:i]) / period
+        
+        if avg_loss == 0:
+            rsi[i] = 100
+        else:
+            rs = avg_gain / avg_loss
+            rsi[i] = 100 - (100 / (1 + rs))
+    
+    return rsi
+
+
+def ref_macd(
+    prices: List[float],
+    fast: int = 12,
+    slow: int = 26,
+    signal: int = 9
+) -> Tuple[List[Optional[float]], List[Optional[float]], List[Optional[float]]]:
+    """Calculate MACD, Signal, and Histogram"""
+    fast_ema = ref_ema(prices, fast)
+    slow_ema = ref_ema(prices, slow)
+    
+    macd = [None] * len(prices)
+    for i in range(len(prices)):
+        if fast_ema[i] is not None and slow_ema[i] is not None:
+            macd[i] = fast_ema[i] - slow_ema[i]
+    
+    # Calculate signal line (EMA of MACD)
+    macd_values = [m for m in macd if m is not None]
+    signal_line = [None] * len(prices)
+    
+    if len(macd_values) >= signal:
+        first_valid = next(i for i, m in enumerate(macd) if m is not None)
+        signal_ema = ref_ema(macd_values, signal)
+        
+        for i, s in enumerate(signal_ema):
+            if s is not None:
+                signal_line[first_valid + i] = s
+    
+    # Calculate histogram
+    histogram = [None] * len(prices)
+    for i in range(len(prices)):
+        if macd[i] is not None and signal_line[i] is not None:
+            histogram[i] = macd[i] - signal_line[i]
+    
+    return macd, signal_line, histogram
+
+
+def ref_bollinger_bands(
+    prices: List[float],
+    period: int = 20,
+    std_dev: float = 2.0
+) -> Tuple[List[Optional[float]], List[Optional[float]], List[Optional[float]]]:
+    """Calculate Bollinger Bands (middle, upper, lower)"""
+    middle = ref_sma(prices, period)
+    upper = [None] * len(prices)
+    lower = [None] * len(prices)
+    
+    for i in range(period - 1, len(prices)):
+        std = np.std(prices[i - period + 1:i + 1])
+        if middle[i] is not None:
+            upper[i] = middle[i] + (std_dev * std)
+            lower[i] = middle[i] - (std_dev * std)
+    
+    return middle, upper, lower
+
+
+# ---- Tests ----
+
+def _series(years: int, seed: int = 7) -> List[float]:
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0004, 0.015, years * TRADING_DAYS_PER_YEAR)
+    return (2500 * np.exp(np.cumsum(returns))).tolist()
+
+
+def _assert_matches(actual: List[Optional[float]], expected: List[Optional[float]], rtol=1e-9, atol=1e-9):
+    assert len(actual) == len(expected)
+    assert [v is None for v in actual] == [v is None for v in expected]
+    pairs = [(a, e) for a, e in zip(actual, expected) if e is not None]
+    np.testing.assert_allclose([a for a, _ in pairs], [e for _, e in pairs], rtol=rtol, atol=atol)
+
+
+@pytest.mark.parametrize("period", [1, 5, 20, 200])
+def test_moving_averages_match_reference(period):
+    closes = _series(20)
+    _assert_matches(bt.calculate_sma(closes, period), ref_sma(closes, period))
+    _assert_matches(bt.calculate_ema(closes, period), ref_ema(closes, period))
+
+
+@pytest.mark.parametrize("period", [2, 14, 28])
+def test_rsi_matches_reference_including_flat_stretches(period):
+    closes = _series(10)
+    closes[100:140] = [closes[100]] * 40  # no losses: RSI pinned at 100
+    _assert_matches(bt.calculate_rsi(closes, period), ref_rsi(closes, period), atol=1e-7)
+
+
+def test_macd_and_bollinger_match_reference():
+    closes = _series(20)
+    for actual, expected in zip(bt.calculate_macd(closes, 12, 26, 9), ref_macd(closes, 12, 26, 9)):
+        _assert_matches(actual, expected, atol=1e-7)
+    for actual, expected in zip(bt.calculate_bollinger_bands(closes, 20, 2.5), ref_bollinger_bands(closes, 20, 2.5)):
+        _assert_matches(actual, expected, atol=1e-7)
+
+
+def test_short_series_are_all_warm_up():
+    assert bt.calculate_sma([1.0, 2.0], 5) == [None, None]
+    assert bt.calculate_ema([1.0, 2.0], 5) == [None, None]
+    assert bt.calculate_rsi([1.0, 2.0, 3.0], 14) == [None, None, None]
+
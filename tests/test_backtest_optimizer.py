@@ -0,0 +1,143 @@
+"""
+Parameter sweep tests.
+
+benchmarks/backtest_optimizer.py times a full grid in-process and over the worker pool.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from models.backtest_models import BacktestConfig, OptimizeConfig, StrategyType  # noqa: E402
+from services.backtest_optimizer import (  # noqa: E402
+    build_combinations, build_heatmap, rank_results, run_sweep,
+)
+from services.backtest_pool import BacktestPool  # noqa: E402
+from services.backtesting_service import run_backtest  # noqa: E402
+from tests.conftest import price_history  # noqa: E402
+
+
+def _prices(bars: int = 500):
+    return price_history(bars, seed=7)
+
+
+def _config(**overrides):
+    return OptimizeConfig(symbol="TEST", strategy=StrategyType.SMA_CROSSOVER, **overrides)
+
+
+def test_grid_and_random_combinations():
+    grid = build_combinations(_config(parameter_grid={"short_period": [5, 10, 60], "long_period": [20, 50]}))
+    # short >= long is dropped
+    assert {(c["short_period"], c["long_period"]) for c in grid} == {(5, 20), (10, 20), (5, 50), (10, 50)}
+
+    # Parameters without explicit values are swept over their declared range
+    derived = build_combinations(OptimizeConfig(symbol="TEST", strategy=StrategyType.BOLLINGER_BANDS))
+    assert sorted({c["std_dev"] for c in derived}) == [1.5, 1.8, 2.1, 2.4, 2.7, 3.0]
+
+    sampled = build_combinations(_config(search="random", samples=25, seed=3))
+    assert len(sampled) == 25
+    assert len({tuple(c.values()) for c in sampled}) == 25
+    assert all(5 <= c["short_period"] < c["long_period"] <= 200 for c in sampled)
+    assert sampled == build_combinations(_config(search="random", samples=25, seed=3))
+
+    with pytest.raises(ValueError):
+        build_combinations(_config(parameter_grid={"period": [5]}))
+    with pytest.raises(ValueError):
+        build_combinations(_config(parameter_grid={"short_period": list(range(1, 100)), "long_period": list(range(100))}))
+    with pytest.raises(ValueError):
+        build_combinations(_config(heatmap_axes=["short_period"]))
+
+
+def test_ranking_and_heatmap():
+    rows = [
+        {"parameters": {"a": a, "b": b, "c": c}, "sharpe_ratio": a * b - c, "total_return_percent": a + b,
+         "max_drawdown": float(c), "total_trades": 1}
+        for a in (1, 2) for b in (10, 20) for c in (0, 5)
+    ]
+    ranked = rank_results(rows, "sharpe", 2)
+    assert [r["parameters"] for r in ranked] == [{"a": 2, "b": 20, "c": 0}, {"a": 2, "b": 20, "c": 5}]
+    assert ranked[0]["rank"] == 1 and ranked[0]["objective_value"] == 40
+    assert rank_results(rows, "drawdown", 1)[0]["max_drawdown"] == 0
+
+    heatmap = build_heatmap(rows, "sharpe", ["a", "b", "c"])
+    assert (heatmap["x"], heatmap["y"]) == ("a", "b")
+    # Best over the free parameter c
+    assert heatmap["values"] == [[10, 20], [20, 40]]
+
+    one_axis = build_heatmap([r for r in rows if r["parameters"]["b"] == 10 and r["parameters"]["c"] == 0],
+                             "return", ["a", "b", "c"])
+    assert one_axis["y"] is None and one_axis["values"] == [[11, 12]]
+
+
+def test_sweep_over_pool_matches_single_backtests():
+    prices = _prices()
+    closes = [p["close"] for p in prices]
+    config = _config(parameter_grid={"short_period": [5, 10, 20], "long_period": [30, 50]}, top_n=3)
+    combos = build_combinations(config)
+    pool = BacktestPool(workers=1)
+
+    async def run():
+        return [event async for event in run_sweep(closes, config, combos, pool=pool, chunk_size=2)]
+
+    try:
+        events = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    progress = [data for event, data in events if event == "progress"]
+    # Chunks finishing together are reported in one progress event
+    completed = [p["completed"] for p in progress]
+    assert completed == sorted(set(completed)) and completed[-1] == 6
+    assert all(count % 2 == 0 for count in completed)
+    assert events[-1][0] == "result"
+    result = events[-1][1]
+    assert result["evaluated"] == 6 and len(result["ranked"]) == 3
+    assert len(result["heatmap"]["values"]) == 2 and len(result["heatmap"]["values"][0]) == 3
+
+    best = result["ranked"][0]
+    single = asyncio.run(run_backtest(
+        BacktestConfig(symbol="TEST", strategy=StrategyType.SMA_CROSSOVER, parameters=best["parameters"]),
+        prices,
+    ))
+    assert best["total_return_percent"] == single.total_return_percent
+    assert best["max_drawdown"] == single.max_drawdown
+    assert best["total_trades"] == single.total_trades
+
+
+def test_optimize_endpoint_streams_progress_and_result(monkeypatch):
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+    import server
+
+    monkeypatch.setattr(server, "backtest_pool", BacktestPool(workers=1))
+    client = TestClient(server.app)
+    body = {
+        "symbol": "TCS", "strategy": "rsi", "objective": "return",
+        "parameter_grid": {"period": [7, 14], "oversold": [25, 30], "overbought": [70]},
+    }
+    try:
+        response = client.post("/api/backtest/optimize", json=body)
+    finally:
+        server.backtest_pool.shutdown()
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = []
+    for block in response.text.strip().split("\n\n")[1:]:
+        event, data = (line.split(": ", 1)[1] for line in block.splitlines())
+        events.append((event, json.loads(data)))
+    assert events[-1][0] == "result"
+    assert events[-2][1]["completed"] == 4
+    result = events[-1][1]
+    assert result["symbol"] == "TCS" and result["objective"] == "return"
+    assert [r["rank"] for r in result["ranked"]] == [1, 2, 3, 4]
+
+    bad = client.post("/api/backtest/optimize", json={**body, "parameter_grid": {"fast_period": [8]}})
+    assert bad.status_code == 400
+    assert client.post("/api/backtest/optimize", json={**body, "symbol": "NOPE"}).status_code == 404
+
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from services import state_backend
+from services.backtest_pool import (
+    BACKTEST_ABORTED, BACKTEST_POOL_QUEUE_DEPTH, BACKTEST_TIMEOUTS, BacktestPool, BacktestTimeout,
+)
+from services.state_backend import InProcessStateBackend
+
+
+def test_timeout_restarts_the_pool():
+    pool = BacktestPool(workers=1, timeout=30)
+
+    async def scenario():
+        await pool.start()
+        with pytest.raises(BacktestTimeout):
+            await pool.run(time.sleep, 5, timeout=0.5)
+        # The stuck worker was terminated; the next task gets a fresh one
+        return await pool.run(sum, [1, 2])
+
+    before = BACKTEST_TIMEOUTS.get()
+    try:
+        started = time.perf_counter()
+        assert asyncio.run(scenario()) == 3
+        assert time.perf_counter() - started < 4
+    finally:
+        pool.shutdown()
+    assert pool.restarts == 1
+    assert BACKTEST_TIMEOUTS.get() == before + 1
+
+
+def test_queue_depth_counts_tasks_waiting_for_a_worker():
+    pool = BacktestPool(workers=1)
+
+    async def scenario():
+        futures = [pool.submit(time.sleep, 0.2) for _ in range(3)]
+        queued = BACKTEST_POOL_QUEUE_DEPTH.get()
+        await pool.gather(futures)
+        return queued
+
+    try:
+        assert asyncio.run(scenario()) == 2
+    finally:
+        pool.shutdown()
+    assert BACKTEST_POOL_QUEUE_DEPTH.get() == 0
+    assert pool.get_status()["in_flight"] == 0 and pool.tasks == 3
+
+
+def test_client_disconnect_cancels_the_backtest(monkeypatch):
+    pytest.importorskip("fastapi")
+    import server
+    from services.admission import admission_controllers
+
+    previous = state_backend.get_state_backend()
+    state_backend.set_state_backend(InProcessStateBackend())
+    calls = {"cancelled": False}
+
+    async def slow_backtest(config, price_history, pool):
+        calls["started"].set()
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            calls["cancelled"] = True
+            raise
+
+    monkeypatch.setattr(server, "run_backtest_in_pool", slow_backtest)
+    sent = []
+    body = json.dumps({"symbol": "WIPRO", "strategy": "macd"}).encode()
+
+    async def run():
+        calls["started"] = asyncio.Event()
+        requests = [{"type": "http.request", "body": body, "more_body": False}]
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            await calls["started"].wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "POST", "scheme": "http", "path": "/api/backtest/run",
+            "raw_path": b"/api/backtest/run", "query_string": b"",
+            "root_path": "", "headers": [(b"content-type", b"application/json")],
+            "client": ("test", 1), "server": ("test", 80),
+        }
+        await asyncio.wait_for(server.app(scope, receive, send), timeout=5)
+
+    before = BACKTEST_ABORTED.get(mode="single", reason="disconnected")
+    try:
+        asyncio.run(run())
+    finally:
+        state_backend.set_state_backend(previous)
+
+    assert calls["cancelled"]
+    assert BACKTEST_ABORTED.get(mode="single", reason="disconnected") == before + 1
+    assert admission_controllers["backtest"].in_flight == 0
+    assert sent[0]["status"] == 499
@@ -0,0 +1,134 @@
+"""
+Batch backtest tests.
+
+benchmarks/batch_backtest.py compares sequential single-symbol backtests
+with one batch run on the worker pool.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from models.backtest_models import BacktestConfig, BatchBacktestConfig, StrategyType  # noqa: E402
+from services import state_backend  # noqa: E402
+from services.backtest_pool import BacktestPool  # noqa: E402
+from services.backtesting_service import run_backtest  # noqa: E402
+from services.batch_backtest import equal_weight_curve, run_batch_backtest  # noqa: E402
+from services.state_backend import InProcessStateBackend  # noqa: E402
+from tests.conftest import price_history  # noqa: E402
+
+
+def test_equal_weight_curve_aligns_dates():
+    dates = {"A": ["d1", "d2", "d3"], "B": ["d2", "d4"]}
+    equity = {"A": np.array([100.0, 110.0, 120.0]), "B": np.array([90.0, 80.0])}
+    curve_dates, curve = equal_weight_curve(dates, equity, allocation=100.0)
+    assert curve_dates == ["d1", "d2", "d3", "d4"]
+    # B holds cash before its first bar and carries its value over d3
+    assert curve.tolist() == [200.0, 200.0, 210.0, 200.0]
+
+
+def test_batch_matches_single_backtests_per_symbol():
+    histories = {
+        "AAA": price_history(400, 1), "BBB": price_history(400, 2), "CCC": price_history(300, 3, first_day=100),
+    }
+    config = BatchBacktestConfig(symbols=list(histories), strategy=StrategyType.MACD, initial_capital=300000)
+    pool = BacktestPool(workers=1)
+    try:
+        result = asyncio.run(run_batch_backtest(config, histories, pool=pool))
+    finally:
+        pool.shutdown()
+
+    rows = {row["symbol"]: row for row in result["symbols"]}
+    assert set(rows) == set(histories)
+    for symbol, history in histories.items():
+        single = asyncio.run(run_backtest(
+            BacktestConfig(symbol=symbol, strategy=StrategyType.MACD, initial_capital=100000), history
+        ))
+        assert rows[symbol]["final_value"] == single.final_value
+        assert rows[symbol]["max_drawdown"] == single.max_drawdown
+        assert rows[symbol]["total_trades"] == single.total_trades
+
+    portfolio = result["portfolio"]
+    assert portfolio["final_value"] == pytest.approx(sum(row["final_value"] for row in rows.values()), abs=0.05)
+    assert len(portfolio["equity_curve"]) == 400
+    returns = sorted(row["total_return_percent"] for row in rows.values())
+    assert result["cross_section"]["total_return_percent"]["median"] == returns[1]
+    assert result["cross_section"]["best"]["total_return_percent"] == returns[-1]
+    assert result["skipped"] == []
+
+
+def test_symbols_without_history_are_reported_as_skipped():
+    histories = {"AAA": price_history(300, 1), "EMPTY": [], "BBB": price_history(300, 2)}
+    config = BatchBacktestConfig(symbols=list(histories), strategy=StrategyType.RSI)
+    pool = BacktestPool(workers=1)
+    try:
+        result = asyncio.run(run_batch_backtest(config, histories, pool=pool))
+        with pytest.raises(ValueError):
+            asyncio.run(run_batch_backtest(config, {"EMPTY": []}, pool=pool))
+    finally:
+        pool.shutdown()
+
+    assert {row["symbol"] for row in result["symbols"]} == {"AAA", "BBB"}
+    assert result["skipped"] == ["EMPTY"]
+    assert result["allocation_per_symbol"] == round(config.initial_capital / 2, 2)
+
+
+def test_bulk_history_downloads_only_uncached_symbols(monkeypatch):
+    from services import market_data_service
+
+    previous = state_backend.get_state_backend()
+    state_backend.set_state_backend(InProcessStateBackend())
+    downloads = []
+
+    async def fake_download(symbols, period, interval):
+        downloads.append(list(symbols))
+        return {s: [{"date": "2024-01-02", "close": 1.0}] for s in symbols if s != "GONE"}
+
+    monkeypatch.setattr(market_data_service, "_fetch_bulk_historical_data", fake_download)
+
+    async def run():
+        first = await market_data_service.get_bulk_historical_data(["TCS", "INFY", "GONE"], period="2y")
+        second = await market_data_service.get_bulk_historical_data(["TCS", "INFY", "WIPRO", "HCLTECH"], period="2y")
+        return first, second
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        state_backend.set_state_backend(previous)
+
+    assert downloads == [["TCS", "INFY", "GONE"], ["WIPRO", "HCLTECH"]]
+    assert set(first) == {"TCS", "INFY"}
+    assert set(second) == {"TCS", "INFY", "WIPRO", "HCLTECH"}
+
+
+def test_batch_endpoint_runs_a_sector(monkeypatch):
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+    import server
+
+    pool = BacktestPool(workers=1)
+    monkeypatch.setattr(server, "backtest_pool", pool)
+    client = TestClient(server.app)
+    try:
+        sector = client.post("/api/backtest/batch", json={"sector": "it", "strategy": "sma_crossover"})
+        listed = client.post("/api/backtest/batch", json={"symbols": ["tcs", "NOPE"], "strategy": "rsi"})
+    finally:
+        pool.shutdown()
+
+    assert sector.status_code == 200
+    body = sector.json()
+    stocks = asyncio.run(server.get_cached_stocks())
+    assert {row["symbol"] for row in body["symbols"]} == {s for s, v in stocks.items() if v["sector"] == "IT"}
+    assert body["allocation_per_symbol"] == round(100000 / len(body["symbols"]), 2)
+
+    assert listed.status_code == 200
+    assert [row["symbol"] for row in listed.json()["symbols"]] == ["TCS"]
+    assert listed.json()["skipped"] == ["NOPE"]
+
+    assert client.post("/api/backtest/batch", json={"strategy": "rsi"}).status_code == 400
+
@@ -0,0 +1,119 @@
+"""
+Cold-start checks for the API process.
+
+Imports the server in a fresh interpreter, recording wall time and resident
+memory added by each top-level module, and fails when a heavy optional
+integration is imported eagerly again. The wall-time and memory budget
+depends on the machine, so it is only enforced with COLD_START_ENFORCE=true.
+
+benchmarks/cold_start.py prints the per-module table.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+# Budgets are wall-clock and RSS limits, too noisy on shared CI runners to enforce by default
+COLD_START_ENFORCE = os.environ.get("COLD_START_ENFORCE", "false").lower() == "true"
+# Eager yfinance/pandas/reportlab/aiohttp put startup near 1.5s; tighten via env as needed
+COLD_START_BUDGET_MS = float(os.environ.get("COLD_START_BUDGET_MS", "1000"))
+COLD_START_RSS_BUDGET_MB = float(os.environ.get("COLD_START_RSS_BUDGET_MB", "120"))
+
+# Imported in the order server.py pulls them in; "server" covers whatever remains
+MODULES = [
+    "fastapi",
+    "motor.motor_asyncio",
+    "pydantic",
+    "services.metrics",
+    "services.mock_data",
+    "services.scoring_engine",
+    "services.llm_service",
+    "services.market_data_service",
+    "services.websocket_manager",
+    "services.alerts_service",
+    "services.backtesting_service",
+    "server",
+]
+
+_CHILD = """
+import importlib, json, resource, sys, time
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+modules = json.loads(sys.argv[1])
+heavy = json.loads(sys.argv[2])
+baseline = rss_mb()
+rows = []
+start = time.perf_counter()
+for name in modules:
+    before_t, before_m = time.perf_counter(), rss_mb()
+    importlib.import_module(name)
+    rows.append({
+        "module": name,
+        "ms": (time.perf_counter() - before_t) * 1000,
+        "rss_mb": rss_mb() - before_m,
+    })
+print(json.dumps({
+    "total_ms": (time.perf_counter() - start) * 1000,
+    "baseline_rss_mb": baseline,
+    "rss_mb": rss_mb(),
+    "modules": rows,
+    "heavy_loaded": [m for m in heavy if m in sys.modules],
+}))
+"""
+
+
+def measure_cold_start() -> dict:
+    """Import the server in a fresh interpreter and return the measurements"""
+    from services.lazy_imports import HEAVY_MODULES
+
+    env = dict(os.environ, PYTHONPATH=str(BACKEND_DIR), LOOP_WATCHDOG_ENABLED="false")
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD, json.dumps(MODULES), json.dumps(list(HEAVY_MODULES))],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_heavy_integrations_are_not_imported_at_startup():
+    report = measure_cold_start()
+    assert report["heavy_loaded"] == []
+
+
+@pytest.mark.skipif(not COLD_START_ENFORCE, reason="set COLD_START_ENFORCE=true to enforce the cold-start budget")
+def test_cold_start_within_budget():
+    report = measure_cold_start()
+    assert report["total_ms"] <= COLD_START_BUDGET_MS, _format(report)
+    assert report["rss_mb"] <= COLD_START_RSS_BUDGET_MB, _format(report)
+
+
+def _format(report: dict) -> str:
+    lines = [f"{'module':<32}{'ms':>10}{'rss MB':>10}"]
+    for row in report["modules"]:
+        lines.append(f"{row['module']:<32}{row['ms']:>10.1f}{row['rss_mb']:>10.1f}")
+    lines.append(
+        f"{'total':<32}{report['total_ms']:>10.1f}{report['rss_mb']:>10.1f}"
+        f"  (budget {COLD_START_BUDGET_MS:.0f}ms / {COLD_START_RSS_BUDGET_MB:.0f}MB)"
+    )
+    if report["heavy_loaded"]:
+        lines.append(f"eagerly imported: {', '.join(report['heavy_loaded'])}")
+    return "\n".join(lines)
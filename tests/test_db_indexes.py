@@ -0,0 +1,149 @@
+"""
+Checks for the startup index bootstrapper.
+
+The spec and bootstrap tests run against an in-memory stand-in for the
+database. The explain-plan checks require a reachable MongoDB (MONGO_URL,
+default mongodb://localhost:27017) and are skipped otherwise; they run
+against a throwaway database.
+"""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+from pymongo.errors import OperationFailure, ServerSelectionTimeoutError
+
+motor_asyncio = pytest.importorskip("motor.motor_asyncio")
+
+from services.db_indexes import INDEX_SPECS, bootstrap_indexes, ensure_indexes
+
+MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+
+# (collection, filter) pairs issued on hot request paths
+HOT_QUERIES = [
+    ("watchlist", {"symbol": "TCS"}),
+    ("portfolio", {"symbol": "TCS"}),
+    ("alerts", {"id": "alert_000000000000"}),
+    ("alerts", {"status": "active"}),
+    ("alerts", {"status": "active", "symbol": "TCS"}),
+    ("alerts", {"symbol": "TCS"}),
+    ("stock_data", {"symbol": "TCS"}),
+]
+
+
+def _stages(plan):
+    """Yield every stage name in a (possibly nested) query plan"""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _stages(item)
+
+
+class FakeCollection:
+    """Records create_index calls, or fails with error (hangs when error is "hang")"""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.indexes = []
+
+    async def create_index(self, keys, **options):
+        if self.error == "hang":
+            await asyncio.sleep(3600)
+        if self.error is not None:
+            raise self.error
+        self.indexes.append((keys, options))
+        return options.get("name", str(keys))
+
+
+class FakeDatabase(dict):
+    def __init__(self, errors=None):
+        super().__init__()
+        self.errors = errors or {}
+
+    def __missing__(self, name):
+        collection = self[name] = FakeCollection(self.errors.get(name))
+        return collection
+
+
+def test_index_specs_are_well_formed():
+    for collection, specs in INDEX_SPECS.items():
+        names = [options["name"] for _, options in specs]
+        assert len(names) == len(set(names)), collection
+        for keys, options in specs:
+            assert keys and all(isinstance(field, str) and direction in (1, -1) for field, direction in keys)
+            assert options["name"] != "_id_"
+
+
+def test_bootstrap_creates_every_declared_index():
+    db = FakeDatabase({"alerts": OperationFailure("duplicate key")})
+    created = asyncio.run(ensure_indexes(db))
+
+    # A conflicting collection is skipped; the rest are created as declared
+    assert "alerts" not in created
+    for collection, specs in INDEX_SPECS.items():
+        if collection != "alerts":
+            assert created[collection] == [options["name"] for _, options in specs]
+            assert db[collection].indexes == specs
+    # The data extraction collections are bootstrapped alongside
+    assert db["price_history"].indexes
+
+
+def test_unreachable_server_does_not_stall_startup():
+    first = next(iter(INDEX_SPECS))
+    assert asyncio.run(ensure_indexes(FakeDatabase({first: ServerSelectionTimeoutError("no servers")}))) == {}
+
+    async def run():
+        start = asyncio.get_running_loop().time()
+        created = await bootstrap_indexes(FakeDatabase({first: "hang"}), timeout=0.1)
+        return created, asyncio.get_running_loop().time() - start
+
+    created, elapsed = asyncio.run(run())
+    assert created == {} and elapsed < 1
+
+
+@pytest.fixture(scope="module")
+def db():
+    client = motor_asyncio.AsyncIOMotorClient(MONGO_URL, serverSelectionTimeoutMS=1500)
+    try:
+        asyncio.run(client.admin.command("ping"))
+    except Exception:
+        client.close()
+        pytest.skip(f"MongoDB not reachable at {MONGO_URL}")
+
+    name = f"stockpulse_test_{uuid.uuid4().hex[:8]}"
+    yield client[name]
+    asyncio.run(client.drop_database(name))
+    client.close()
+
+
+def test_bootstrap_is_idempotent(db):
+    first = asyncio.run(ensure_indexes(db))
+    second = asyncio.run(ensure_indexes(db))
+
+    assert first == second
+    for collection, specs in INDEX_SPECS.items():
+        assert len(first[collection]) == len(specs)
+
+
+@pytest.mark.parametrize("collection,query", HOT_QUERIES)
+def test_hot_queries_use_index_scan(db, collection, query):
+    async def explain():
+        await ensure_indexes(db)
+        # A few documents so the planner has something to choose between
+        batch = uuid.uuid4().hex[:6]
+        await db[collection].insert_many([
+            {"symbol": f"SYM{batch}{i}", "id": f"alert_{batch}{i}", "status": "triggered"}
+            for i in range(5)
+        ])
+        return await db[collection].find(query).explain()
+
+    plan = asyncio.run(explain())["queryPlanner"]["winningPlan"]
+    stages = list(_stages(plan))
+
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from services import llm_service, state_backend
+from services.state_backend import InProcessStateBackend
+
+
+def _stock(symbol):
+    return {
+        "symbol": symbol, "name": f"{symbol} Ltd", "sector": "IT", "current_price": 1000.0,
+        "fundamentals": {"roe": 20}, "analysis": {"long_term_score": 70, "verdict": "BUY"},
+    }
+
+
+@pytest.fixture
+def fake_complete(monkeypatch):
+    previous = state_backend.get_state_backend()
+    state_backend.set_state_backend(InProcessStateBackend())
+    monkeypatch.setenv("EMERGENT_LLM_KEY", "test-key")
+    calls = []
+
+    async def complete(api_key, session_id, system_message, prompt):
+        calls.append(prompt)
+        symbols = [line[2:].split(":")[0] for line in prompt.splitlines() if line.startswith("- ")]
+        # Answer all but the last symbol, with markdown noise around the headings
+        return "Overview first.\n\n" + "\n".join(
+            f"### **{s}** - review\nThesis for {s}.\n" for s in symbols[:-1]
+        )
+
+    monkeypatch.setattr(llm_service, "_complete", complete)
+    yield calls
+    state_backend.set_state_backend(previous)
+
+
+def test_pack_batches_respects_budget_and_order():
+    summaries = {f"S{i}": "x" * 100 for i in range(6)}
+    assert llm_service.pack_batches(summaries, char_budget=100_000) == [summaries]
+
+    overhead = len(llm_service.build_batch_prompt({}))
+    batches = llm_service.pack_batches(summaries, char_budget=overhead + 250)
+    assert [list(b) for b in batches] == [["S0", "S1"], ["S2", "S3"], ["S4", "S5"]]
+
+
+def test_batch_insights_use_one_call_and_parse_sections(fake_complete):
+    stocks = [_stock(s) for s in ("TCS", "INFY", "WIPRO")]
+    insights = asyncio.run(llm_service.generate_batch_insights(stocks))
+
+    assert len(fake_complete) == 1
+    assert insights["TCS"] == "Thesis for TCS."
+    assert insights["INFY"] == "Thesis for INFY."
+    assert insights["WIPRO"] == "AI insight not available for this stock."
+
+
+def test_batches_over_budget_run_concurrently_within_limit(fake_complete, monkeypatch):
+    monkeypatch.setattr(llm_service, "BATCH_CONCURRENCY", 2)
+    active, peak = [0], [0]
+    complete = llm_service._complete
+
+    async def slow_complete(*args):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+        return await complete(*args)
+
+    monkeypatch.setattr(llm_service, "_complete", slow_complete)
+    overhead = len(llm_service.build_batch_prompt({}))
+    monkeypatch.setattr(llm_service, "BATCH_PROMPT_CHAR_BUDGET", overhead + 10)
+
+    stocks = [_stock(f"S{i}") for i in range(5)]
+    insights = asyncio.run(llm_service.generate_batch_insights(stocks))
+
+    assert len(fake_complete) == 5
+    assert peak[0] == 2
+    assert set(insights) == {f"S{i}" for i in range(5)}
+
+
+def test_pdf_reports_use_one_batched_call(fake_complete, monkeypatch):
+    pytest.importorskip("fastapi")
+    import server
+
+    rendered = {}
+
+    async def fake_render(report_type, data, timeout=None):
+        rendered[report_type] = data
+        return b"%PDF-1.4 report"
+
+    monkeypatch.setattr(server.pdf_render_pool, "render", fake_render)
+
+    async def run():
+        stocks = await server.get_cached_stocks()
+        comparison = await server._render_pdf_report("comparison", [stocks["TCS"], stocks["INFY"]])
+        portfolio = {"holdings": [{"symbol": "WIPRO"}, {"symbol": "HDFCBANK"}, {"symbol": "GONE"}]}
+        health = await server._render_pdf_report("portfolio_health", portfolio)
+        return comparison, health
+
+    (_, comparison_cacheable), (_, health_cacheable) = asyncio.run(run())
+
+    assert len(fake_complete) == 2
+    assert [s["llm_insight"] for s in rendered["comparison"]] == [
+        "Thesis for TCS.", "AI insight not available for this stock."
+    ]
+    assert rendered["portfolio_health"]["insights"]["WIPRO"] == "Thesis for WIPRO."
+    assert set(rendered["portfolio_health"]["insights"]) == {"WIPRO", "HDFCBANK"}
+    assert comparison_cacheable and health_cacheable
+
+    pytest.importorskip("reportlab")
+    from services.pdf_service import generate_comparison_pdf, generate_portfolio_health_pdf
+
+    assert generate_comparison_pdf(rendered["comparison"]).startswith(b"%PDF")
+    assert generate_portfolio_health_pdf(rendered["portfolio_health"]).startswith(b"%PDF")
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+from services import state_backend
+from services.llm_cache import LLM_CACHE_LOOKUPS, LLMCache, cache_key
+from services.state_backend import InProcessStateBackend
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    previous = state_backend.get_state_backend()
+    state_backend.set_state_backend(InProcessStateBackend())
+    yield
+    state_backend.set_state_backend(previous)
+
+
+def test_key_covers_model_system_message_and_prompt():
+    base = cache_key("openai", "gpt-4o", "system", "prompt")
+    assert base == cache_key("openai", "gpt-4o", "system", "prompt")
+    assert base != cache_key("openai", "gpt-4o-mini", "system", "prompt")
+    assert base != cache_key("openai", "gpt-4o", "other system", "prompt")
+    assert base != cache_key("openai", "gpt-4o", "system", "prompt!")
+
+
+def test_identical_concurrent_calls_share_one_completion():
+    cache = LLMCache(ttl_seconds=60)
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "insight"
+
+    async def run():
+        results = await asyncio.gather(*[
+            cache.get_or_generate("k1", generate, operation="unit") for _ in range(5)
+        ])
+        again = await cache.get_or_generate("k1", generate, operation="unit")
+        return results, again
+
+    before_miss = LLM_CACHE_LOOKUPS.get(operation="unit", result="miss")
+    results, again = asyncio.run(run())
+
+    assert results == ["insight"] * 5 and again == "insight"
+    assert len(calls) == 1
+    assert LLM_CACHE_LOOKUPS.get(operation="unit", result="miss") == before_miss + 1
+    assert cache.get_stats()["unit"]["hit_rate"] > 0.8
+
+
+def test_failures_are_not_cached():
+    cache = LLMCache(ttl_seconds=60)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream timeout")
+        return "ok"
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await cache.get_or_generate("k2", flaky)
+        return await cache.get_or_generate("k2", flaky)
+
+    assert asyncio.run(run()) == "ok"
+    assert len(attempts) == 2
+
+
+def test_workers_wait_for_a_slow_completion_up_to_the_llm_timeout(monkeypatch):
+    from services import llm_cache as llm_cache_module
+
+    # Scaled down: the lock outlives any call the timeout lets finish
+    monkeypatch.setattr(llm_cache_module, "LLM_TIMEOUT_SECONDS", 0.4)
+    monkeypatch.setattr(llm_cache_module, "LLM_LOCK_MARGIN_SECONDS", 0.1)
+    first, second = LLMCache(ttl_seconds=60), LLMCache(ttl_seconds=60)
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.3)
+        return "insight"
+
+    async def run():
+        results = await asyncio.gather(
+            first.get_or_generate("k4", slow, operation="slow"),
+            second.get_or_generate("k4", slow, operation="slow"),
+        )
+        with pytest.raises(asyncio.TimeoutError):
+            await first.get_or_generate("k5", lambda: asyncio.sleep(1, result="late"), operation="slow")
+        return results
+
+    assert asyncio.run(run()) == ["insight", "insight"]
+    assert len(calls) == 1
+
+
+def test_persistent_tier_survives_a_restart():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    db = mongomock_motor.AsyncMongoMockClient()["llm_cache_test"]
+
+    async def run():
+        first = LLMCache(ttl_seconds=60)
+        first.attach_db(db)
+        await first.get_or_generate("k3", lambda: asyncio.sleep(0, result="stored"))
+
+        # New process: empty memory tier, same database
+        state_backend.set_state_backend(InProcessStateBackend())
+        second = LLMCache(ttl_seconds=60)
+        second.attach_db(db)
+
+        async def never():
+            raise AssertionError("should be served from MongoDB")
+
+        return await second.get_or_generate("k3", never, operation="restart")
+
+    assert asyncio.run(run()) == "stored"
+    assert LLM_CACHE_LOOKUPS.get(operation="restart", result="persistent") == 1
+
+
+def test_stock_insight_reuses_cached_completion(monkeypatch):
+    from services import llm_service
+
+    calls = []
+
+    async def fake_complete(api_key, session_id, system_message, prompt):
+        calls.append(prompt)
+        return f"analysis of {len(prompt)} chars"
+
+    monkeypatch.setenv("EMERGENT_LLM_KEY", "test-key")
+    monkeypatch.setattr(llm_service, "_complete", fake_complete)
+    stock = {"symbol": "TCS", "name": "Tata Consultancy", "current_price": 3500.0}
+
+    async def run():
+        first = await llm_service.generate_stock_insight(stock, "full")
+        second = await llm_service.generate_stock_insight(stock, "full")
+        other = await llm_service.generate_stock_insight(stock, "risk_assessment")
+        return first, second, other
+
+    first, second, other = asyncio.run(run())
+    assert first == second
+    assert other != first
+    assert len(calls) == 2
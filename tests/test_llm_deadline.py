@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from services import llm_service, state_backend
+from services.llm_cache import llm_cache
+from services.state_backend import InProcessStateBackend
+
+
+def _stock():
+    from services.mock_data import get_all_stocks
+    from services.scoring_engine import generate_analysis
+
+    stock = next(s for s in get_all_stocks() if s["symbol"] == "TCS")
+    stock["analysis"] = generate_analysis(stock)
+    return stock
+
+
+@pytest.fixture
+def slow_llm(monkeypatch):
+    previous = state_backend.get_state_backend()
+    state_backend.set_state_backend(InProcessStateBackend())
+    monkeypatch.setenv("EMERGENT_LLM_KEY", "test-key")
+    monkeypatch.setattr(llm_cache, "collection", None)
+    calls = []
+
+    async def complete(api_key, session_id, system_message, prompt):
+        calls.append(prompt)
+        await asyncio.sleep(0.2)
+        return "LLM insight"
+
+    monkeypatch.setattr(llm_service, "_complete", complete)
+    yield calls
+    state_backend.set_state_backend(previous)
+
+
+def test_deadline_serves_rule_based_insight_and_fills_cache_in_background(slow_llm):
+    stock = _stock()
+
+    async def run():
+        first = await llm_service.generate_stock_insight_within_deadline(stock, deadline=0.02)
+        await asyncio.gather(*llm_service._background_calls)
+        second = await llm_service.generate_stock_insight_within_deadline(stock, deadline=0.02)
+        return first, second
+
+    (text, source), second = asyncio.run(run())
+
+    assert source == "rule_based"
+    assert stock["analysis"]["verdict"] in text
+    assert text == llm_service.build_rule_based_insight(stock)
+    assert second == ("LLM insight", "llm")
+    assert len(slow_llm) == 1
+
+
+def test_rule_based_insight_renders_in_pdf():
+    pytest.importorskip("reportlab")
+    from services.pdf_service import generate_single_stock_pdf
+
+    stock = _stock()
+    stock["analysis"]["triggered_deal_breakers"]["long_term"] = [
+        {"description": "D1: Interest Coverage < 2.0x - Cannot service debt"}
+    ]
+    stock["llm_insight"] = llm_service.build_rule_based_insight(stock)
+    assert "Deal-breaker D1" in stock["llm_insight"]
+    assert generate_single_stock_pdf(stock).startswith(b"%PDF")
@@ -0,0 +1,117 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from services import llm_service, state_backend
+from services.llm_cache import llm_cache
+from services.state_backend import InProcessStateBackend
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    previous = state_backend.get_state_backend()
+    state_backend.set_state_backend(InProcessStateBackend())
+    monkeypatch.setenv("EMERGENT_LLM_KEY", "test-key")
+    # No MongoDB here: keep the cache in the memory tier only
+    monkeypatch.setattr(llm_cache, "collection", None)
+    calls = {"count": 0, "closed": False}
+
+    async def fake_stream(api_key, session_id, system_message, prompt):
+        calls["count"] += 1
+        try:
+            for chunk in ["**Thesis** ", "strong ", "moat."]:
+                yield chunk
+                await asyncio.sleep(calls.get("delay", 0))
+        finally:
+            calls["closed"] = True
+
+    monkeypatch.setattr(llm_service, "_stream_complete", fake_stream)
+    yield calls
+    state_backend.set_state_backend(previous)
+
+
+def _events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_sends_tokens_then_replays_from_cache(fake_llm):
+    from fastapi.testclient import TestClient
+    import server
+
+    client = TestClient(server.app)
+    first = client.get("/api/stocks/TCS/llm-insight/stream")
+    assert first.status_code == 200
+    assert first.headers["content-type"].startswith("text/event-stream")
+    assert first.text.startswith(": stream open")
+
+    events = _events(first.text)
+    assert [e for e, _ in events] == ["token", "token", "token", "done"]
+    text = "".join(d["text"] for e, d in events if e == "token")
+    assert text == "**Thesis** strong moat."
+
+    # The completed stream was cached: replayed in one event without calling upstream
+    second = _events(client.get("/api/stocks/TCS/llm-insight/stream").text)
+    assert second[0] == ("token", {"text": text})
+    assert fake_llm["count"] == 1
+
+    assert client.get("/api/stocks/NOPE/llm-insight/stream").status_code == 404
+
+
+def test_client_disconnect_cancels_upstream_and_frees_slot(fake_llm):
+    import server
+    from services.admission import admission_controllers
+
+    fake_llm["delay"] = 5
+    sent = []
+
+    async def run():
+        disconnected = asyncio.Event()
+
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+            if message.get("body", b"").startswith(b"event: token"):
+                disconnected.set()
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": "/api/stocks/INFY/llm-insight/stream",
+            "raw_path": b"/api/stocks/INFY/llm-insight/stream", "query_string": b"",
+            "root_path": "", "headers": [], "client": ("test", 1), "server": ("test", 80),
+        }
+        await asyncio.wait_for(server.app(scope, receive, send), timeout=2)
+
+    asyncio.run(run())
+
+    assert fake_llm["closed"]
+    assert admission_controllers["llm"].in_flight == 0
+    assert not any(b"event: done" in m.get("body", b"") for m in sent)
+
+
+def test_identical_streams_share_one_upstream_call(fake_llm):
+    fake_llm["delay"] = 0.05
+    stock = {"symbol": "TCS", "name": "Tata Consultancy", "current_price": 3500.0}
+
+    async def collect(delay):
+        await asyncio.sleep(delay)
+        return [chunk async for chunk in llm_service.stream_stock_insight(stock)]
+
+    async def run():
+        # The late follower joins mid-stream and still gets every chunk
+        return await asyncio.gather(collect(0), collect(0), collect(0.07))
+
+    results = asyncio.run(run())
+    assert results == [["**Thesis** ", "strong ", "moat."]] * 3
+    assert fake_llm["count"] == 1
+    assert not llm_service._inflight_streams
@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+from services.loop_watchdog import LoopWatchdog, LOOP_BLOCK_SECONDS
+
+
+def blocking_helper():
+    time.sleep(0.3)
+
+
+def test_blocking_call_is_attributed_to_its_function():
+    watchdog = LoopWatchdog(interval_ms=20, threshold_ms=100)
+
+    async def run():
+        await watchdog.start()
+        await asyncio.sleep(0.1)
+        blocking_helper()
+        await asyncio.sleep(0.1)
+        await watchdog.stop()
+
+    asyncio.run(run())
+
+    blocks = watchdog.get_recent_blocks()
+    assert len(blocks) == 1
+    assert blocks[0]["function"] == "test_loop_watchdog.py:blocking_helper"
+    assert blocks[0]["duration_ms"] >= 200
+    assert any("blocking_helper" in line for line in blocks[0]["stack"])
+    assert LOOP_BLOCK_SECONDS.get_count(function=blocks[0]["function"]) >= 1
+
+
+def test_cooperative_code_records_no_blocks():
+    watchdog = LoopWatchdog(interval_ms=20, threshold_ms=100)
+
+    async def run():
+        await watchdog.start()
+        for _ in range(10):
+            await asyncio.sleep(0.02)
+        await watchdog.stop()
+
+    asyncio.run(run())
+
+    assert watchdog.get_recent_blocks() == []
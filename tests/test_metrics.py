@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from services.metrics import MetricsRegistry, MetricsMiddleware, HTTP_REQUESTS
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    hist = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    hist.observe(0.05, route="/a")
+    hist.observe(0.5, route="/a")
+    hist.observe(5.0, route="/a")
+
+    text = registry.render()
+
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/a"} 3' in text
+
+
+def test_counter_escapes_label_values():
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events", ("name",))
+    counter.inc(name='say "hi"')
+    counter.inc(2, name='say "hi"')
+
+    assert 'events_total{name="say \\"hi\\""} 3' in registry.render()
+
+
+def test_registering_same_name_with_different_shape_fails():
+    registry = MetricsRegistry()
+    registry.counter("things_total", "Things", ("a",))
+    assert registry.counter("things_total", "Things", ("a",)) is registry.get("things_total")
+    with pytest.raises(ValueError):
+        registry.gauge("things_total", "Things", ("a",))
+
+
+def test_middleware_labels_by_route_template():
+    fastapi = pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+
+    app = fastapi.FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        return {"id": item_id}
+
+    app.add_middleware(MetricsMiddleware)
+    client = TestClient(app)
+
+    before = HTTP_REQUESTS.get(method="GET", route="/items/{item_id}", status="200")
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/nowhere")
+
+    assert HTTP_REQUESTS.get(method="GET", route="/items/{item_id}", status="200") == before + 2
+    assert HTTP_REQUESTS.get(method="GET", route="unmatched", status="404") >= 1
+
+
+def test_concurrent_cache_misses_share_one_fetch():
+    from services import market_data_service as mds
+    from services.metrics import MARKET_CACHE_COALESCED
+
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"price": 1}
+
+    async def run():
+        return await asyncio.gather(*[
+            mds._single_flight("quote_TEST", "test", 1, fetch) for _ in range(5)
+        ])
+
+    before = MARKET_CACHE_COALESCED.get(cache="test")
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert results == [{"price": 1}] * 5
+    assert MARKET_CACHE_COALESCED.get(cache="test") == before + 4
+    assert "quote_TEST" not in mds._inflight
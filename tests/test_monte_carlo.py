@@ -0,0 +1,120 @@
+"""
+Monte Carlo bootstrap tests.
+
+benchmarks/monte_carlo.py times 10,000 paths over a 500-bar backtest.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from models.backtest_models import BacktestConfig, MonteCarloConfig, StrategyType, WalkForwardConfig  # noqa: E402
+from services import monte_carlo  # noqa: E402
+from services.backtest_cache import backtest_cache_key  # noqa: E402
+from services.backtest_pool import BacktestPool  # noqa: E402
+from services.backtesting_service import run_backtest, run_backtest_in_pool  # noqa: E402
+from services.monte_carlo import bootstrap_blocks, monte_carlo_bands, path_statistics  # noqa: E402
+from tests.conftest import price_history, random_walk  # noqa: E402
+
+
+def _prices(bars: int = 500):
+    return price_history(bars, seed=8, vol=0.018)
+
+
+def _equity(bars: int = 500):
+    return random_walk(bars, seed=2, drift=0.0004, vol=0.01, start=100000)
+
+
+def test_blocks_are_consecutive_runs_of_returns():
+    returns = np.arange(10, dtype=float)
+    sample = bootstrap_blocks(returns, 50, 4, np.random.default_rng(1))
+    assert sample.shape == (50, 10)
+    # Within a block every step advances one bar, wrapping past the end
+    steps = (np.diff(sample, axis=1) % 10).reshape(50, -1)
+    assert np.all(steps[:, [0, 1, 2, 4, 5, 6]] == 1)
+
+
+def test_full_length_blocks_only_rotate_the_path():
+    equity = _equity()
+    config = MonteCarloConfig(simulations=500, block_size=len(equity), seed=4)
+    bands = monte_carlo_bands(config, equity, np.array([]), 100000)
+    # A rotation compounds the same returns, so every path ends at the backtest's final value
+    assert set(bands["final_value"].values()) == {round(float(equity[-1]), 2)}
+    assert bands["block_size"] == 500 and bands["steps"] == 500
+
+
+def test_path_statistics():
+    returns = np.array([[0.1, -0.5, 0.2], [0.0, 0.0, 0.0]])
+    final_value, max_drawdown, sharpe = path_statistics(returns.copy(), 100.0, 252)
+    assert final_value == pytest.approx([66.0, 100.0])
+    assert max_drawdown == pytest.approx([50.0, 0.0])
+    assert sharpe[1] == 0.0 and sharpe[0] < 0
+
+
+def test_trade_resampling_and_chunking(monkeypatch):
+    config = MonteCarloConfig(simulations=1000, method="trades", seed=9)
+    trade_returns = np.array([0.05, -0.02, 0.03, -0.04, 0.01])
+    whole = monte_carlo_bands(config, _equity(), trade_returns, 100000)
+
+    monkeypatch.setattr(monte_carlo, "MONTE_CARLO_CHUNK_ELEMENTS", 60)
+    chunked = monte_carlo_bands(config, _equity(), trade_returns, 100000)
+    assert chunked["final_value"]["p50"] == pytest.approx(whole["final_value"]["p50"], rel=0.02)
+
+    bands = whole["final_value"]
+    assert bands["p5"] <= bands["p25"] <= bands["p50"] <= bands["p75"] <= bands["p95"]
+    assert whole["steps"] == 5 and whole["block_size"] is None
+    assert 0 < whole["probability_of_loss"] < 100
+
+    with pytest.raises(ValueError):
+        monte_carlo_bands(config, _equity(), np.array([]), 100000)
+
+
+def test_backtest_reports_bands():
+    base = BacktestConfig(symbol="TEST", strategy=StrategyType.SMA_CROSSOVER, parameters={"short_period": 10, "long_period": 30})
+    config = base.model_copy(update={"monte_carlo": MonteCarloConfig(simulations=2000, seed=1)})
+    plain = asyncio.run(run_backtest(base, _prices()))
+    result = asyncio.run(run_backtest(config, _prices()))
+
+    assert plain.monte_carlo is None
+    assert result.final_value == plain.final_value
+    bands = result.monte_carlo
+    assert bands["simulations"] == 2000 and bands["method"] == "block_bootstrap"
+    assert bands["max_drawdown"]["p5"] <= result.max_drawdown <= bands["max_drawdown"]["p95"]
+    assert asyncio.run(run_backtest(config, _prices())).monte_carlo == bands
+    assert backtest_cache_key(config, "data") != backtest_cache_key(base, "data")
+
+
+def test_bands_are_computed_in_the_pool_for_every_mode():
+    monte_carlo_config = MonteCarloConfig(simulations=1000, seed=3)
+    walk_forward = WalkForwardConfig(
+        in_sample_bars=200, out_of_sample_bars=100, parameter_grid={"short_period": [5, 10], "long_period": [30]}
+    )
+    configs = [
+        BacktestConfig(symbol="TEST", strategy=StrategyType.SMA_CROSSOVER, monte_carlo=monte_carlo_config),
+        BacktestConfig(
+            symbol="TEST", strategy=StrategyType.SMA_CROSSOVER, monte_carlo=monte_carlo_config, walk_forward=walk_forward
+        ),
+    ]
+    pool = BacktestPool(workers=1)
+
+    async def main():
+        return [
+            (await run_backtest_in_pool(config, _prices(), pool), await run_backtest(config, _prices(), pool=pool))
+            for config in configs
+        ]
+
+    try:
+        runs = asyncio.run(main())
+    finally:
+        pool.shutdown()
+    # Seeded bands from the worker match the in-process result
+    for pooled, direct in runs:
+        assert direct.monte_carlo is not None
+        assert pooled["monte_carlo"] == direct.monte_carlo
+    assert pool.tasks >= 4
+
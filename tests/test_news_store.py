@@ -0,0 +1,77 @@
+import pytest
+
+from services.news_store import NewsStore
+
+
+def _item(i, symbol="TCS", sentiment="POSITIVE", minute=0, title=None):
+    return {
+        "id": f"news_{i}",
+        "title": title or f"Story {i}",
+        "summary": "Summary",
+        "source": "Mint",
+        "url": f"https://example.com/news/{i}",
+        "published_date": f"2024-01-01 10:{minute:02d}",
+        "sentiment": sentiment,
+        "sentiment_score": 0.5,
+        "related_stocks": [symbol],
+    }
+
+
+def test_ingest_dedupes_by_content_and_keeps_counts():
+    store = NewsStore()
+    assert store.ingest([_item(1), _item(2, sentiment="NEGATIVE")]) == 2
+    # Same story re-published under a new id and url is a duplicate
+    duplicate = dict(_item(1), id="news_99", url="https://example.com/other")
+    assert store.ingest([duplicate, _item(3, sentiment="NEUTRAL")]) == 1
+
+    assert len(store) == 3
+    assert store.sentiment_counts() == {"POSITIVE": 1, "NEGATIVE": 1, "NEUTRAL": 1}
+
+
+def test_query_filters_and_paginates_newest_first():
+    store = NewsStore()
+    items = [
+        _item(i, symbol="TCS" if i % 2 else "INFY", sentiment="POSITIVE" if i % 3 else "NEGATIVE",
+              minute=i)
+        for i in range(30)
+    ]
+    store.ingest(reversed(items))
+
+    expected = [i for i in reversed(range(30)) if i % 2 and i % 3]
+    seen, cursor = [], None
+    while True:
+        page, cursor = store.query(symbol="tcs", sentiment="positive", limit=4, cursor=cursor)
+        seen.extend(int(n["title"].split()[1]) for n in page)
+        if cursor is None:
+            break
+    assert seen == expected
+
+    latest, _ = store.query(limit=3)
+    assert [n["title"] for n in latest] == ["Story 29", "Story 28", "Story 27"]
+    assert store.query(symbol="UNKNOWN") == ([], None)
+
+    with pytest.raises(ValueError):
+        store.query(cursor="not-a-cursor")
+
+
+def test_eviction_drops_oldest_from_every_index():
+    store = NewsStore(max_items=5)
+    store.ingest(_item(i, minute=i) for i in range(8))
+
+    page, _ = store.query(symbol="TCS", limit=10)
+    assert [n["title"] for n in page] == [f"Story {i}" for i in (7, 6, 5, 4, 3)]
+    assert store.sentiment_counts()["POSITIVE"] == 5
+
+
+def test_ids_follow_content_not_the_feed():
+    store = NewsStore()
+    # The feed reuses news_1 for a different story on the next refresh
+    store.ingest([_item(1)])
+    store.ingest([_item(1, title="Another story")])
+    ids = {n["title"]: n["id"] for n in store.query(limit=10)[0]}
+    assert len(set(ids.values())) == 2
+
+    # The same story keeps its id when the feed re-publishes it under another
+    again = NewsStore()
+    again.ingest([dict(_item(1), id="news_42")])
+    assert again.query(limit=1)[0][0]["id"] == ids["Story 1"]
@@ -0,0 +1,66 @@
+import pytest
+
+pytest.importorskip("fastapi")
+
+from services.pdf_cache import PDF_CACHE_LOOKUPS, PDFCache, report_cache_key, snapshot_hash
+
+
+def test_key_covers_type_symbols_data_and_day():
+    from datetime import date
+
+    data_hash = snapshot_hash({"symbol": "TCS", "price": 1})
+    base = report_cache_key("single_stock", ["tcs"], data_hash, date(2024, 1, 1))
+    assert base == report_cache_key("single_stock", ["TCS"], data_hash, date(2024, 1, 1))
+    assert base != report_cache_key("comparison", ["TCS"], data_hash, date(2024, 1, 1))
+    assert base != report_cache_key("single_stock", ["TCS"], snapshot_hash({"symbol": "TCS", "price": 2}),
+                                     date(2024, 1, 1))
+    assert base != report_cache_key("single_stock", ["TCS"], data_hash, date(2024, 1, 2))
+
+
+def test_eviction_keeps_total_under_budget_least_recently_used_first(tmp_path):
+    cache = PDFCache(tmp_path, max_bytes=250)
+    for key in ("a", "b"):
+        cache.put(key, b"x" * 100)
+    assert cache.get("a") is not None  # "b" is now least recently used
+    cache.put("c", b"x" * 100)
+
+    assert cache.get("b") is None
+    assert cache.get("a").read_bytes() == b"x" * 100
+    assert cache.get_status()["bytes"] == 200
+
+    # A fresh index over the same directory sees the surviving files
+    assert PDFCache(tmp_path, max_bytes=250).get_status()["entries"] == 2
+
+
+def test_repeat_download_is_served_from_cache_with_etag(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    import server
+
+    renders = []
+
+    async def fake_render(report_type, data, timeout=None):
+        renders.append(report_type)
+        return b"%PDF-1.4 report"
+
+    monkeypatch.delenv("EMERGENT_LLM_KEY", raising=False)
+    monkeypatch.setattr(server, "PDF_EXPORT_AVAILABLE", True)
+    monkeypatch.setattr(server, "pdf_cache", PDFCache(tmp_path))
+    monkeypatch.setattr(server.pdf_render_pool, "render", fake_render)
+    client = TestClient(server.app)
+    body = {"report_type": "comparison", "symbols": ["TCS", "INFY"]}
+
+    first = client.post("/api/reports/generate-pdf", json=body)
+    hits = PDF_CACHE_LOOKUPS.get(result="hit")
+    second = client.post("/api/reports/generate-pdf", json=body)
+
+    assert first.status_code == second.status_code == 200
+    assert second.content == first.content == b"%PDF-1.4 report"
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.headers["content-length"] == str(len(first.content))
+    assert PDF_CACHE_LOOKUPS.get(result="hit") == hits + 1
+    assert renders == ["comparison"]
+
+    not_modified = client.post("/api/reports/generate-pdf", json=body,
+                               headers={"If-None-Match": first.headers["etag"]})
+    assert not_modified.status_code == 304
+    assert renders == ["comparison"]
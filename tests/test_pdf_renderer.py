@@ -0,0 +1,65 @@
+"""
+PDF render pool tests.
+
+benchmarks/pdf_renderer.py compares concurrent report throughput and
+event-loop stalls for in-thread rendering versus the process pool.
+"""
+
+import asyncio
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("reportlab")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from services.pdf_renderer import PDFRenderPool, PDFRenderTimeout, to_render_payload  # noqa: E402
+
+
+def _stock(symbol="TCS"):
+    from services.mock_data import get_all_stocks
+    from services.scoring_engine import generate_analysis
+
+    stock = next(s for s in get_all_stocks() if s["symbol"] == symbol)
+    stock["analysis"] = generate_analysis(stock)
+    return stock
+
+
+def test_payload_is_reduced_to_plain_data():
+    payload = to_render_payload("portfolio_health", {"at": datetime(2024, 1, 2), "values": (1, 2)})
+    assert payload == {"at": "2024-01-02 00:00:00", "values": [1, 2]}
+
+    stock = to_render_payload("single_stock", _stock())
+    assert "price_history" not in stock
+    assert "investment_checklists" not in stock["analysis"]
+    assert stock["analysis"]["verdict"]
+
+
+def test_pool_renders_reports_and_recovers_from_timeout():
+    pool = PDFRenderPool(workers=2, timeout=20)
+
+    async def run():
+        pdfs = await asyncio.gather(
+            pool.render("single_stock", _stock("TCS")),
+            pool.render("comparison", [_stock("TCS"), _stock("INFY")]),
+        )
+        with pytest.raises(PDFRenderTimeout):
+            await pool.run(time.sleep, 10, timeout=0.5)
+        # The stuck worker was replaced; the pool keeps serving
+        again = await pool.render("single_stock", _stock("INFY"))
+        return pdfs, again
+
+    try:
+        pdfs, again = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    assert all(pdf.startswith(b"%PDF") for pdf in pdfs + [again])
+    assert pool.restarts == 1
+    with pytest.raises(ValueError):
+        asyncio.run(pool.render("unknown", {}))
+
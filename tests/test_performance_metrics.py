@@ -0,0 +1,117 @@
+"""
+Performance metrics tests.
+
+Equity statistics are checked against the original loop-based
+calculate_metrics, kept below as the reference; benchmarks/performance_metrics.py
+times the two.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from services.performance_metrics import (  # noqa: E402
+    drawdown_series, equity_metrics, max_drawdown_duration, performance_metrics, round_trips,
+)
+from tests.conftest import random_walk  # noqa: E402
+
+
+def _reference_equity_metrics(values, initial_capital):
+    """Drawdown, volatility and Sharpe as the loop-based calculate_metrics computed them"""
+    peak, max_drawdown = initial_capital, 0
+    for value in values:
+        if value > peak:
+            peak = value
+        max_drawdown = max(max_drawdown, (peak - value) / peak * 100)
+
+    daily_returns = [(values[i] - values[i - 1]) / values[i - 1] for i in range(1, len(values)) if values[i - 1] > 0]
+    volatility = np.std(daily_returns) * np.sqrt(252) * 100
+    sharpe_ratio = np.mean(daily_returns) * 252 / (volatility / 100) if volatility > 0 else 0
+    return {"max_drawdown": round(max_drawdown, 2), "volatility": round(volatility, 2), "sharpe_ratio": round(sharpe_ratio, 2)}
+
+
+def _equity(bars=750):
+    return random_walk(bars, seed=5, drift=0.0004, vol=0.012, start=100000)
+
+
+def test_equity_metrics_match_the_loop_implementation():
+    equity = _equity()
+    metrics = equity_metrics(equity, 100000)
+    for key, value in _reference_equity_metrics(equity.tolist(), 100000).items():
+        assert metrics[key] == pytest.approx(value, abs=0.011)
+
+    years = len(equity) / 252
+    assert metrics["annualized_return"] == round(((equity[-1] / 100000) ** (1 / years) - 1) * 100, 2)
+    assert metrics["calmar_ratio"] == pytest.approx(metrics["annualized_return"] / metrics["max_drawdown"], abs=0.01)
+    # Only losing bars count against Sortino, so it exceeds Sharpe on a rising curve
+    assert metrics["sortino_ratio"] > metrics["sharpe_ratio"] > 0
+
+
+def test_drawdown_duration_counts_bars_below_the_peak():
+    equity = np.array([100, 110, 105, 100, 108, 111, 109, 112, 90, 95], dtype=float)
+    drawdown = drawdown_series(equity, 100)
+    assert drawdown[1] == 0 and drawdown[3] == pytest.approx(100 / 11)
+    # Bars 2-4 sit below the 110 peak, bars 8-9 below 112
+    assert max_drawdown_duration(drawdown) == 3
+    assert max_drawdown_duration(drawdown_series(np.array([99.0, 98.0, 101.0]), 100)) == 2
+
+    flat = equity_metrics(np.full(10, 100.0), 100)
+    assert flat["max_drawdown"] == 0 and flat["max_drawdown_duration"] == 0
+    assert flat["sharpe_ratio"] == flat["sortino_ratio"] == flat["calmar_ratio"] == 0
+
+
+def test_round_trips_pair_each_exit_with_its_entry():
+    # sell with nothing open, buy/sell, buy/partial sell, buy left open at the end
+    bars = np.array([1, 3, 5, 7, 9, 12])
+    is_buy = np.array([False, True, False, True, False, True])
+    quantities = np.array([10, 10, 10, 20, 10, 5])
+    values = np.array([500.0, 1000.0, 1200.0, 2000.0, 900.0, 600.0])
+
+    trips = round_trips(bars, is_buy, quantities, values)
+    assert trips.entry_bars.tolist() == [3, 7]
+    assert trips.exit_bars.tolist() == [5, 9]
+    assert trips.pnl.tolist() == [200.0, -100.0]
+
+    equity = np.full(15, 1000.0)
+    metrics = performance_metrics(equity, bars, is_buy, quantities, values, 1000.0)
+    assert metrics["total_trades"] == 2 and metrics["win_rate"] == 50.0
+    assert metrics["profit_factor"] == 2.0 and metrics["avg_loss"] == 100.0
+    # Held over bars 3-4, 7-8 and 12-14
+    assert metrics["exposure_percent"] == round(7 / 15 * 100, 2)
+    assert metrics["turnover"] == round(values.sum() / 1000.0, 2)
+
+
+def test_no_trades():
+    metrics = performance_metrics(
+        np.full(20, 5000.0), np.array([], dtype=int), np.array([], dtype=bool),
+        np.array([], dtype=int), np.array([], dtype=float), 5000.0,
+    )
+    assert metrics["total_trades"] == 0 and metrics["exposure_percent"] == 0 and metrics["turnover"] == 0
+    assert metrics["total_return"] == 0 and metrics["profit_factor"] == 0
+
+
+@pytest.mark.parametrize("capital", [0, -1000])
+def test_non_positive_capital_is_rejected(capital):
+    from pydantic import ValidationError
+    from models.backtest_models import BacktestConfig, BatchBacktestConfig, OptimizeConfig
+
+    for model in (BacktestConfig, BatchBacktestConfig, OptimizeConfig):
+        with pytest.raises(ValidationError):
+            model(symbol="TCS", symbols=["TCS"], strategy="rsi", initial_capital=capital)
+
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+    import server
+
+    client = TestClient(server.app)
+    for path, body in (
+        ("/api/backtest/run", {"symbol": "TCS", "strategy": "rsi"}),
+        ("/api/backtest/batch", {"symbols": ["TCS"], "strategy": "rsi"}),
+        ("/api/backtest/optimize", {"symbol": "TCS", "strategy": "rsi"}),
+    ):
+        assert client.post(path, json={**body, "initial_capital": capital}).status_code == 422
+
@@ -0,0 +1,100 @@
+import time
+
+import pytest
+
+from services.profiling import ProfileStore, ProfilingMiddleware, collapse_tree
+
+fastapi = pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+
+def _busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def _make_client(store, **kwargs):
+    app = fastapi.FastAPI()
+
+    @app.get("/slow")
+    async def slow_endpoint():
+        _busy_wait(0.1)
+        return {"ok": True}
+
+    @app.get("/fast")
+    async def fast_endpoint():
+        return {"ok": True}
+
+    app.add_middleware(ProfilingMiddleware, store=store, interval_ms=1, admin_token="secret", **kwargs)
+    return TestClient(app)
+
+
+FORCE = {"X-Profile": "1", "X-Admin-Token": "secret"}
+
+
+def test_header_forces_profile_with_call_tree():
+    store = ProfileStore(maxlen=5)
+    client = _make_client(store, sample_rate=0, slow_threshold_ms=10_000)
+
+    client.get("/fast")
+    assert store.list() == []
+
+    client.get("/slow", headers=FORCE)
+    summaries = store.list()
+    assert len(summaries) == 1
+    assert summaries[0]["route"] == "/slow"
+    assert summaries[0]["trigger"] == "header"
+    assert "tree" not in summaries[0]
+
+    profile = store.get(summaries[0]["id"])
+    assert profile["sample_count"] > 10
+    assert "_busy_wait" in collapse_tree(profile["tree"])
+
+
+def test_sampled_requests_kept_only_when_slow():
+    store = ProfileStore(maxlen=5)
+    client = _make_client(store, sample_rate=1.0, slow_threshold_ms=50)
+
+    client.get("/fast")
+    client.get("/slow")
+
+    routes = [p["route"] for p in store.list()]
+    assert routes == ["/slow"]
+
+
+def test_ring_buffer_is_bounded():
+    store = ProfileStore(maxlen=2)
+    client = _make_client(store, sample_rate=0, slow_threshold_ms=10_000)
+
+    for _ in range(4):
+        client.get("/fast", headers=FORCE)
+
+    assert len(store.list()) == 2
+
+
+def test_header_needs_the_admin_token():
+    store = ProfileStore(maxlen=5)
+    client = _make_client(store, sample_rate=0, slow_threshold_ms=10_000)
+
+    client.get("/fast", headers={"X-Profile": "1"})
+    client.get("/fast", headers={"X-Profile": "1", "X-Admin-Token": "guess"})
+    assert store.list() == []
+
+    client.get("/fast", headers=FORCE)
+    assert len(store.list()) == 1
+
+
+def test_admin_endpoints_require_the_token(monkeypatch):
+    import server
+    from services import admin_auth
+
+    client = TestClient(server.app)
+    monkeypatch.setattr(admin_auth, "ADMIN_TOKEN", "")
+    assert client.get("/api/admin/admission", headers={"X-Admin-Token": ""}).status_code == 503
+
+    monkeypatch.setattr(admin_auth, "ADMIN_TOKEN", "secret")
+    for path in ("/api/admin/profiles", "/api/admin/profiles/prof_1", "/api/admin/loop-blocks", "/api/admin/admission"):
+        assert client.get(path).status_code == 403
+        assert client.get(path, headers={"X-Admin-Token": "guess"}).status_code == 403
+    assert client.get("/api/admin/admission", headers={"X-Admin-Token": "secret"}).status_code == 200
@@ -0,0 +1,234 @@
+import asyncio
+import io
+import json
+import zipfile
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from services import state_backend
+from services.report_jobs import ReportJobQueue
+from services.state_backend import InProcessStateBackend
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    previous = state_backend.get_state_backend()
+    state_backend.set_state_backend(InProcessStateBackend())
+    yield
+    state_backend.set_state_backend(previous)
+
+
+def test_job_renders_in_parallel_and_zip_streams_in_completion_order(tmp_path):
+    queue = ReportJobQueue(concurrency=2, directory=tmp_path)
+    active, peak = [0], [0]
+
+    def render(name, delay, fail=False):
+        async def run():
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(delay)
+            active[0] -= 1
+            if fail:
+                raise RuntimeError("render failed")
+            return f"{name}.pdf", f"%PDF {name}".encode()
+        return name, run
+
+    async def run():
+        job = await queue.submit([
+            render("slow", 0.08), render("fast", 0.01), render("broken", 0.01, fail=True),
+            render("dup", 0.02), render("dup", 0.03),
+        ])
+        assert job.to_dict()["status"] in ("queued", "running")
+
+        chunks, progress = [], []
+        async for chunk in queue.stream_zip(job.job_id):
+            chunks.append(chunk)
+            progress.append(job.processed)
+        return job, b"".join(chunks), progress
+
+    job, data, progress = asyncio.run(run())
+
+    assert peak[0] == 2
+    # Entries were sent before the whole job had finished
+    assert progress[0] < len(job.items)
+    status = job.to_dict()
+    assert status["status"] == "completed_with_errors"
+    assert (status["processed_reports"], status["failed_reports"]) == (5, 1)
+
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        names = archive.namelist()
+        assert names == ["fast.pdf", "dup.pdf", "dup_2.pdf", "slow.pdf", "manifest.json"]
+        assert archive.read("slow.pdf") == b"%PDF slow"
+        manifest = json.loads(archive.read("manifest.json"))
+    assert [i["error"] for i in manifest["items"] if i["status"] == "failed"] == ["render failed"]
+
+
+def test_report_job_api(tmp_path, monkeypatch):
+    httpx = pytest.importorskip("httpx")
+    import server
+
+    async def fake_render(report_type, data, timeout=None):
+        await asyncio.sleep(0.01)
+        return b"%PDF-1.4 " + report_type.encode()
+
+    monkeypatch.setattr(server, "PDF_EXPORT_AVAILABLE", True)
+    monkeypatch.setattr(server, "PDF_CACHE_ENABLED", False)
+    monkeypatch.setattr(server, "report_job_queue", ReportJobQueue(directory=tmp_path))
+    monkeypatch.setattr(server.pdf_render_pool, "render", fake_render)
+    monkeypatch.delenv("EMERGENT_LLM_KEY", raising=False)
+
+    async def run():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            submitted = await client.post("/api/reports/jobs", json={"reports": [
+                {"report_type": "single_stock", "symbols": ["TCS"]},
+                {"report_type": "comparison", "symbols": ["TCS", "INFY"]},
+                {"report_type": "single_stock", "symbols": ["NOPE"]},
+            ]})
+            assert submitted.status_code == 202
+            job_id = submitted.json()["job_id"]
+
+            download = await client.get(submitted.json()["download_url"])
+            status = (await client.get(f"/api/reports/jobs/{job_id}")).json()
+            missing = await client.get("/api/reports/jobs/unknown")
+            empty = await client.post("/api/reports/jobs", json={"reports": []})
+            return download, status, missing, empty
+
+    download, status, missing, empty = asyncio.run(run())
+
+    assert download.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(download.content)) as archive:
+        pdfs = sorted(n for n in archive.namelist() if n.endswith(".pdf"))
+    assert [n.split("_")[0] for n in pdfs] == ["TCS", "comparison"]
+    assert status["progress_percent"] == 100.0
+    assert status["failed_reports"] == 1
+    assert "404" in status["items"][2]["error"]
+    assert missing.status_code == 404
+    assert empty.status_code == 400
+
+
+def test_another_worker_reports_progress_and_streams_the_download(tmp_path, monkeypatch):
+    from services import report_jobs
+
+    monkeypatch.setattr(report_jobs, "REPORT_JOB_POLL_SECONDS", 0.01)
+    owner, other = ReportJobQueue(directory=tmp_path), ReportJobQueue(directory=tmp_path)
+
+    def render(name, delay):
+        async def run():
+            await asyncio.sleep(delay)
+            return f"{name}.pdf", f"%PDF {name}".encode()
+        return name, run
+
+    async def run():
+        job = await owner.submit([render("a", 0.01), render("b", 0.05)])
+        queued = await other.get_state(job.job_id)
+        data = b"".join([chunk async for chunk in other.stream_zip(job.job_id)])
+        return queued, data, await other.get_state(job.job_id), await other.get_state("unknown")
+
+    queued, data, finished, missing = asyncio.run(run())
+
+    assert queued["total_reports"] == 2 and queued["finished_at"] is None
+    assert finished["status"] == "completed" and finished["progress_percent"] == 100.0
+    assert missing is None
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.namelist() == ["a.pdf", "b.pdf", "manifest.json"]
+        assert archive.read("b.pdf") == b"%PDF b"
+        assert "directory" not in json.loads(archive.read("manifest.json"))
+
+
+def test_download_marks_a_missing_file_failed_instead_of_truncating(tmp_path):
+    queue = ReportJobQueue(directory=tmp_path)
+
+    def render(name):
+        async def run():
+            return f"{name}.pdf", f"%PDF {name}".encode()
+        return name, run
+
+    async def run():
+        job = await queue.submit([render("a"), render("b")])
+        while not job.done:
+            await job.wait_for_change()
+        (job.directory / "a.pdf").unlink()
+        return b"".join([chunk async for chunk in queue.stream_zip(job.job_id)])
+
+    data = asyncio.run(run())
+
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == ["b.pdf", "manifest.json"]
+        items = {item["label"]: item for item in json.loads(archive.read("manifest.json"))["items"]}
+    assert items["a"]["status"] == "failed" and "unavailable" in items["a"]["error"]
+    assert items["b"]["status"] == "completed"
+
+
+class _FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self, length):
+        return self.documents[:length]
+
+
+class _FakeCollection:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, *args):
+        return _FakeCursor(self.documents)
+
+
+def test_bundles_over_the_limit_are_rejected(tmp_path, monkeypatch):
+    import server
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(server, "PDF_EXPORT_AVAILABLE", True)
+    monkeypatch.setattr(server, "REPORT_JOB_MAX_ITEMS", 3)
+    monkeypatch.setattr(server, "report_job_queue", ReportJobQueue(directory=tmp_path))
+    monkeypatch.setattr("services.report_jobs.REPORT_JOB_MAX_ITEMS", 3)
+    holdings = [{"symbol": symbol} for symbol in ("TCS", "INFY", "WIPRO", "HDFCBANK")]
+    db = type("FakeDatabase", (), {"portfolio": _FakeCollection(holdings), "watchlist": _FakeCollection(holdings)})
+    monkeypatch.setattr(server, "db", db)
+    client = TestClient(server.app)
+    for bundle in ("watchlist", "portfolio"):
+        response = client.post("/api/reports/jobs", json={"bundle": bundle})
+        assert response.status_code == 400
+        assert "limited to 3 reports" in response.json()["detail"]
+
+
+def test_job_insights_hold_an_llm_admission_slot(monkeypatch):
+    import server
+    from services import llm_service
+    from services.admission import AdmissionController
+
+    llm = AdmissionController("llm", max_concurrent=1, max_queue=0, queue_timeout=0.1)
+    seen = []
+
+    async def fake_complete(api_key, session_id, system_message, prompt):
+        seen.append(llm.in_flight)
+        return "Model insight."
+
+    async def fake_render(report_type, data, timeout=None):
+        return data["llm_insight"].encode()
+
+    monkeypatch.setenv("EMERGENT_LLM_KEY", "test-key")
+    monkeypatch.setattr(llm_service, "_complete", fake_complete)
+    monkeypatch.setattr(server, "PDF_CACHE_ENABLED", False)
+    monkeypatch.setattr(server.pdf_render_pool, "render", fake_render)
+    request = server.ReportRequest(report_type="single_stock", symbols=["TCS"])
+
+    async def run():
+        admitted = await server.build_pdf_report(request, llm)
+        # With the only slot taken, a job report falls back instead of queueing behind it
+        async with llm.slot():
+            refused = await server.build_pdf_report(
+                server.ReportRequest(report_type="single_stock", symbols=["INFY"]), llm
+            )
+        return admitted, refused
+
+    (_, admitted), (_, refused) = asyncio.run(run())
+
+    assert seen == [1]
+    assert admitted == b"Model insight."
+    assert refused and refused != admitted
@@ -0,0 +1,198 @@
+import asyncio
+
+import pytest
+
+from services import state_backend
+from services.state_backend import (
+    InProcessStateBackend, RedisStateBackend, STATE_BACKEND_ERRORS, fetch_shared
+)
+
+
+def _fake_redis_server():
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis, fakeredis.FakeServer()
+
+
+def _make_backend(kind):
+    if kind == "memory":
+        return InProcessStateBackend()
+    fakeredis, server = _fake_redis_server()
+    return RedisStateBackend(client=fakeredis.FakeAsyncRedis(server=server), prefix="test:")
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    return _make_backend(request.param)
+
+
+@pytest.fixture
+def shared_backend():
+    """Swap the module-level backend for a fresh in-process one"""
+    previous = state_backend.get_state_backend()
+    yield state_backend.set_state_backend(InProcessStateBackend())
+    state_backend.set_state_backend(previous)
+
+
+def test_get_set_expire_and_clear(backend):
+    async def run():
+        await backend.set("market:a", {"price": 1.5})
+        await backend.set("market:b", [1, 2], ttl=0.05)
+        await backend.set("other:c", "x")
+        assert await backend.get("market:a") == {"price": 1.5}
+        assert await backend.get_many(["market:a", "market:b", "missing"]) == {
+            "market:a": {"price": 1.5}, "market:b": [1, 2]
+        }
+
+        await asyncio.sleep(0.1)
+        assert await backend.get("market:b") is None
+
+        assert await backend.set_if_absent("lock", "one", ttl=5)
+        assert not await backend.set_if_absent("lock", "two", ttl=5)
+        assert await backend.get("lock") == "one"
+
+        await backend.clear("market:")
+        assert await backend.get("market:a") is None
+        assert await backend.get("other:c") == "x"
+
+    asyncio.run(run())
+
+
+def test_capped_list_keeps_newest(backend):
+    async def run():
+        for i in range(5):
+            await backend.list_push("log", {"n": i}, max_length=3)
+        assert await backend.list_range("log", 10) == [{"n": 2}, {"n": 3}, {"n": 4}]
+        assert await backend.list_range("log", 2) == [{"n": 3}, {"n": 4}]
+
+    asyncio.run(run())
+
+
+def test_delete_if_equals_only_deletes_a_matching_value(backend):
+    if isinstance(backend, RedisStateBackend):
+        # fakeredis runs Lua scripts through lupa
+        pytest.importorskip("lupa")
+
+    async def run():
+        await backend.set("lock", "token-a", ttl=10)
+        assert not await backend.delete_if_equals("lock", "token-b")
+        assert await backend.get("lock") == "token-a"
+        assert await backend.delete_if_equals("lock", "token-a")
+        assert await backend.get("lock") is None
+        assert not await backend.delete_if_equals("lock", "token-a")
+
+    asyncio.run(run())
+
+
+def test_fetch_shared_keeps_a_lock_taken_over_by_another_worker(shared_backend):
+    async def fetch():
+        # Our lock expires mid-fetch and another worker takes it
+        await shared_backend.set("lock:quote", "other-worker", ttl=10)
+        return {"price": 42}
+
+    async def run():
+        assert await fetch_shared("quote", 60, fetch) == {"price": 42}
+        return await shared_backend.get("lock:quote")
+
+    assert asyncio.run(run()) == "other-worker"
+
+
+def test_workers_sharing_redis_fetch_once():
+    fakeredis, server = _fake_redis_server()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"price": 42}
+
+    async def worker():
+        # Each worker process has its own client to the same server
+        backend = RedisStateBackend(client=fakeredis.FakeAsyncRedis(server=server), prefix="t:")
+        state_backend.set_state_backend(backend)
+        return await fetch_shared("market:quote_X", 60, fetch, poll_interval=0.01)
+
+    async def run():
+        previous = state_backend.get_state_backend()
+        try:
+            return await asyncio.gather(*[worker() for _ in range(4)])
+        finally:
+            state_backend.set_state_backend(previous)
+
+    assert asyncio.run(run()) == [{"price": 42}] * 4
+    assert len(calls) == 1
+
+
+def test_redis_errors_degrade_to_misses():
+    class BrokenClient:
+        def __getattr__(self, name):
+            async def fail(*args, **kwargs):
+                raise ConnectionError("redis down")
+            return fail
+
+    backend = RedisStateBackend(client=BrokenClient())
+    before = STATE_BACKEND_ERRORS.get(operation="get")
+
+    async def run():
+        await backend.set("k", 1)
+        assert await backend.get("k") is None
+        # A failed lock attempt lets the caller fetch instead of waiting
+        assert await backend.set_if_absent("lock", "t", ttl=1)
+
+    asyncio.run(run())
+    assert STATE_BACKEND_ERRORS.get(operation="get") == before + 1
+
+
+def test_notifications_round_trip_through_backend(shared_backend):
+    from models.alert_models import Alert, AlertCondition
+    from services.alerts_service import AlertsService
+
+    class FakeCollection:
+        async def update_one(self, *args, **kwargs):
+            pass
+
+    class FakeDb:
+        alerts = FakeCollection()
+
+    service = AlertsService(FakeDb())
+    alert = Alert(
+        id="alert_1", symbol="TCS", condition=AlertCondition.PRICE_ABOVE, target_value=100,
+    )
+
+    async def run():
+        await service.trigger_alert(alert, 105.0)
+        return await service.get_recent_notifications()
+
+    notifications = asyncio.run(run())
+    assert [n.alert_id for n in notifications] == ["alert_1"]
+    assert notifications[0].current_price == 105.0
+
+
+def test_unread_expired_keys_are_swept_on_write():
+    backend = InProcessStateBackend(sweep_interval=0)
+
+    async def run():
+        await backend.set("ws_price:TCS", 1.0, ttl=0.01)
+        await backend.set("market:kept", 2.0, ttl=60)
+        await asyncio.sleep(0.05)
+        await backend.set("market:other", 3.0)
+
+    asyncio.run(run())
+    assert set(backend._data) == {"market:kept", "market:other"}
+    assert set(backend._expiry) == {"market:kept"}
+
+
+def test_stock_snapshots_do_not_accumulate(shared_backend):
+    pytest.importorskip("fastapi")
+    import server
+
+    async def run():
+        for _ in range(3):
+            await server.get_cached_stocks()
+            # The generation expires; the next call publishes a new snapshot
+            await shared_backend.delete("stock_snapshot:generation")
+        return await server.get_cached_stocks()
+
+    stocks = asyncio.run(run())
+    data_keys = [k for k in shared_backend._data if k.startswith("stock_snapshot:data:")]
+    assert data_keys == [f"stock_snapshot:data:{server._stock_cache_generation}"]
+    assert shared_backend._data[data_keys[0]] is stocks
@@ -0,0 +1,130 @@
+"""
+Walk-forward analysis tests.
+
+benchmarks/walk_forward.py shows how walk-forward cost grows with history length.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from models.backtest_models import (  # noqa: E402
+    BacktestConfig, MonteCarloConfig, StrategyType, TradeType, WalkForwardConfig,
+)
+from services import walk_forward  # noqa: E402
+from services.backtest_pool import BacktestPool, SharedArray  # noqa: E402
+from services.backtesting_service import run_backtest, run_backtest_in_pool  # noqa: E402
+from services.walk_forward import WINDOW_END_SIGNAL, Window, build_windows, score_windows  # noqa: E402
+from tests.conftest import price_history  # noqa: E402
+
+GRID = {"short_period": [5, 10, 20], "long_period": [30, 60]}
+
+
+def _prices(bars: int = 700):
+    return price_history(bars, seed=11, drift=0.0004)
+
+
+def _config(**walk_forward):
+    settings = {"in_sample_bars": 250, "out_of_sample_bars": 100, "parameter_grid": GRID, **walk_forward}
+    return BacktestConfig(
+        symbol="TEST", strategy=StrategyType.SMA_CROSSOVER, walk_forward=WalkForwardConfig(**settings)
+    )
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = BacktestPool(workers=1)
+    monkeypatch.setattr(walk_forward, "backtest_pool", pool)
+    yield pool
+    pool.shutdown()
+
+
+def test_windows_roll_by_the_out_of_sample_length():
+    assert build_windows(700, 250, 100) == [
+        Window(0, 250, 250, 350),
+        Window(100, 350, 350, 450),
+        Window(200, 450, 450, 550),
+        Window(300, 550, 550, 650),
+        Window(400, 650, 650, 700),
+    ]
+    with pytest.raises(ValueError):
+        build_windows(250, 250, 100)
+
+
+def test_walk_forward_picks_in_sample_best_and_stitches_out_of_sample(pool):
+    prices = _prices()
+    closes = np.array([p["close"] for p in prices])
+    result = asyncio.run(run_backtest(_config(), prices))
+
+    windows = build_windows(len(prices), 250, 100)
+    combos = [{"short_period": s, "long_period": lg} for s in GRID["short_period"] for lg in GRID["long_period"]]
+    with SharedArray(closes) as shared:
+        scores = np.array(score_windows(shared.spec, "sma_crossover", combos, windows, 100000, "sharpe_ratio"))
+
+    report = result.walk_forward
+    assert report["combinations"] == 6 and len(report["windows"]) == 5
+    assert [w["parameters"] for w in report["windows"]] == [combos[i] for i in scores.argmax(axis=0)]
+    assert result.parameters == report["windows"][-1]["parameters"]
+
+    # Only out-of-sample bars are reported, compounding from window to window
+    assert result.trading_days == 450 and result.start_date == "d00250" and result.end_date == "d00699"
+    growth = np.prod([1 + w["out_of_sample_return_percent"] / 100 for w in report["windows"]])
+    assert result.final_value == pytest.approx(100000 * growth, rel=1e-3)
+
+    # Every window starts flat and ends flat
+    for w in report["windows"]:
+        inside = [t for t in result.trades if w["out_of_sample_start"] <= t.date <= w["out_of_sample_end"]]
+        assert [t.type for t in inside] == [TradeType.BUY, TradeType.SELL] * (len(inside) // 2)
+    assert any(t.signal == WINDOW_END_SIGNAL for t in result.trades)
+
+
+def test_drawdown_objective_minimizes(pool):
+    result = asyncio.run(run_backtest(_config(objective="drawdown"), _prices()))
+    assert all(w["in_sample_objective"] >= 0 for w in result.walk_forward["windows"])
+
+    windows = build_windows(700, 250, 100)
+    closes = np.array([p["close"] for p in _prices()])
+    combos = [{"short_period": s, "long_period": lg} for s in GRID["short_period"] for lg in GRID["long_period"]]
+    with SharedArray(closes) as shared:
+        scores = np.array(score_windows(shared.spec, "sma_crossover", combos, windows, 100000, "max_drawdown"))
+    assert [w["in_sample_objective"] for w in result.walk_forward["windows"]] == scores.min(axis=0).tolist()
+
+
+def test_event_loop_stays_responsive_during_a_walk_forward_run(pool):
+    config = _config(in_sample_bars=252, out_of_sample_bars=63).model_copy(
+        update={"monte_carlo": MonteCarloConfig(simulations=20000, seed=1)}
+    )
+    prices = _prices(2500)
+
+    async def main():
+        await pool.start()
+        gaps, done = [], asyncio.Event()
+
+        async def ticker():
+            last = time.perf_counter()
+            while not done.is_set():
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        ticks = asyncio.ensure_future(ticker())
+        started = time.perf_counter()
+        result = await run_backtest_in_pool(config, prices, pool)
+        elapsed = time.perf_counter() - started
+        done.set()
+        await ticks
+        return result, elapsed, max(gaps)
+
+    result, elapsed, longest_gap = asyncio.run(main())
+    assert result["monte_carlo"]["simulations"] == 20000
+    assert result["trading_days"] == 2500 - 252
+    # The stitching and Monte Carlo stage ran in the worker, not on the loop
+    assert longest_gap < 0.2 < elapsed
+